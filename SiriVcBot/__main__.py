@@ -1,5 +1,6 @@
 import asyncio
 import importlib
+import time
 
 from pyrogram import idle
 from pytgcalls.exceptions import NoActiveGroupCall
@@ -7,38 +8,72 @@ from pytgcalls.exceptions import NoActiveGroupCall
 import config
 from SiriVcBot import LOGGER, app, userbot
 from SiriVcBot.core.call import VasudevKrishna
+from SiriVcBot.core.userbot import assistants
 from SiriVcBot.misc import sudo
 from SiriVcBot.plugins import ALL_MODULES
-from SiriVcBot.utils.database import get_banned_users, get_gbanned
+from SiriVcBot.utils.database import (
+    ensure_indexes,
+    flush_writes,
+    iter_banned_users,
+    iter_gbanned,
+    load_served,
+    preload_settings,
+)
+from SiriVcBot.utils.stream.cache import media_cache
+from SiriVcBot.utils.stream.persist import queue_store
+from SiriVcBot.utils.stream.speed import speed_engine
+from SiriVcBot.utils.thumbnails import thumb_cache
 from config import BANNED_USERS
 
 
 async def init():
-    if (
-        not config.STRING1
-        and not config.STRING2
-        and not config.STRING3
-        and not config.STRING4
-        and not config.STRING5
-    ):
+    if not config.STRING_SESSIONS:
         LOGGER(__name__).error("Assistant client variables not defined, exiting...")
         exit()
+    timings = []
+    started = clock = time.monotonic()
+
+    def phase(name):
+        nonlocal clock
+        now = time.monotonic()
+        timings.append(f"{name} {now - clock:.2f}s")
+        clock = now
+
     await sudo()
     try:
-        users = await get_gbanned()
-        for user_id in users:
+        async for user_id in iter_gbanned():
             BANNED_USERS.add(user_id)
-        users = await get_banned_users()
-        for user_id in users:
+        async for user_id in iter_banned_users():
             BANNED_USERS.add(user_id)
     except:
         pass
+    phase("sudoers")
+    await ensure_indexes()
+    phase("indexes")
+    await preload_settings(config.SETTINGS_PRELOAD_TIME)
+    await load_served(config.SETTINGS_PRELOAD_TIME)
+    phase("preload")
+    media_cache.load()
+    if not queue_store.enabled:
+        # Saved queues may still point at some of these, they are swept once
+        # the queues are loaded.
+        media_cache.sweep()
+    speed_engine.load()
+    thumb_cache.load()
+    phase("media cache")
     await app.start()
+    phase("bot")
     for all_module in ALL_MODULES:
         importlib.import_module("SiriVcBot.plugins" + all_module)
     LOGGER("SiriVcBot.plugins").info("Successfully Imported Modules...")
+    phase("plugins")
     await userbot.start()
+    phase("assistants")
     await VasudevKrishna.start()
+    phase("calls")
+    if not assistants:
+        LOGGER(__name__).error("No assistant could be started, exiting...")
+        exit()
     try:
         await VasudevKrishna.stream_call("https://te.legra.ph/file/29f784eb49d230ab62e9e.mp4")
     except NoActiveGroupCall:
@@ -48,11 +83,17 @@ async def init():
         exit()
     except:
         pass
+    phase("stream check")
     await VasudevKrishna.decorators()
+    LOGGER(__name__).info(
+        f"Startup took {time.monotonic() - started:.2f}s ({', '.join(timings)})"
+    )
     LOGGER("SiriVcBot").info(
         "\x41\x6e\x6f\x6e\x58\x20\x4d\x75\x73\x69\x63\x20\x42\x6f\x74\x20\x53\x74\x61\x72\x74\x65\x64\x20\x53\x75\x63\x63\x65\x73\x73\x66\x75\x6c\x6c\x79\x2e\n\n\x44\x6f\x6e'\x74\x20\x66\x6f\x72\x67\x65\x74\x20\x74\x6f\x20\x76\x69\x73\x69\x74\x20\x40\x46\x61\x6c\x6c\x65\x6e\x41\x73\x73\x6f\x63\x69\x61\x74\x69\x6f\x6e"
     )
     await idle()
+    await queue_store.flush()
+    await flush_writes()
     await app.stop()
     LOGGER("SiriVcBot").info("Stopping SiriVcBot Music Bot...")
 
@@ -1,9 +1,10 @@
 import asyncio
-import os
+import time
 from datetime import datetime, timedelta
 from typing import Union
 
 from pyrogram import Client
+from pyrogram.errors import FloodWait
 from pyrogram.types import InlineKeyboardMarkup
 from pytgcalls import PyTgCalls, StreamType
 from pytgcalls.exceptions import (
@@ -17,11 +18,14 @@ from pytgcalls.types.input_stream.quality import HighQualityAudio, MediumQuality
 from pytgcalls.types.stream import StreamAudioEnded
 
 import config
-from SiriVcBot import LOGGER, YouTube, app
+from SiriVcBot import LOGGER, YouTube, app, userbot
+from SiriVcBot.core.userbot import assistants
 from SiriVcBot.misc import db
 from SiriVcBot.utils.database import (
     add_active_chat,
     add_active_video_chat,
+    forget_assistant,
+    get_assistant_number,
     get_lang,
     get_loop,
     group_assistant,
@@ -32,9 +36,15 @@ from SiriVcBot.utils.database import (
     set_loop,
 )
 from SiriVcBot.utils.exceptions import AssistantErr
-from SiriVcBot.utils.formatters import check_duration, seconds_to_min, speed_converter
+from SiriVcBot.utils.formatters import seconds_to_min, time_to_seconds
 from SiriVcBot.utils.inline.play import stream_markup
+from SiriVcBot.utils.scheduler import assistant_scheduler
 from SiriVcBot.utils.stream.autoclear import auto_clean
+from SiriVcBot.utils.stream.clock import get_played, start_clock, stop_clock
+from SiriVcBot.utils.stream.latency import report_first_audio
+from SiriVcBot.utils.stream.lazy import lazy_resolver
+from SiriVcBot.utils.stream.queue import ChatQueue, localize, prefetch
+from SiriVcBot.utils.stream.speed import speed_engine, tempo_params
 from SiriVcBot.utils.thumbnails import get_thumb
 from strings import get_string
 
@@ -43,63 +53,29 @@ counter = {}
 
 
 async def _clear_(chat_id):
-    db[chat_id] = []
+    for popped in db.get(chat_id) or []:
+        await auto_clean(popped)
+    db[chat_id] = ChatQueue()
+    stop_clock(chat_id)
+    assistant_scheduler.left(chat_id)
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
 
 
 class Call(PyTgCalls):
     def __init__(self):
-        self.userbot1 = Client(
-            name="VasudevKrishnaAssistant1",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING1),
-        )
-        self.one = PyTgCalls(
-            self.userbot1,
-            cache_duration=100,
-        )
-        self.userbot2 = Client(
-            name="VasudevKrishnaAssistant2",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING2),
-        )
-        self.two = PyTgCalls(
-            self.userbot2,
-            cache_duration=100,
-        )
-        self.userbot3 = Client(
-            name="VasudevKrishnaAssistant3",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING3),
-        )
-        self.three = PyTgCalls(
-            self.userbot3,
-            cache_duration=100,
-        )
-        self.userbot4 = Client(
-            name="VasudevKrishnaAssistant4",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING4),
-        )
-        self.four = PyTgCalls(
-            self.userbot4,
-            cache_duration=100,
-        )
-        self.userbot5 = Client(
-            name="VasudevKrishnaAssistant5",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING5),
-        )
-        self.five = PyTgCalls(
-            self.userbot5,
-            cache_duration=100,
-        )
+        self.clients = {
+            num: PyTgCalls(
+                Client(
+                    name=f"VasudevKrishnaAssistant{num}",
+                    api_id=config.API_ID,
+                    api_hash=config.API_HASH,
+                    session_string=str(session),
+                ),
+                cache_duration=100,
+            )
+            for num, session in sorted(config.STRING_SESSIONS.items())
+        }
 
     async def pause_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
@@ -117,32 +93,14 @@ class Call(PyTgCalls):
         except:
             pass
 
-    async def stop_stream_force(self, chat_id: int):
-        try:
-            if config.STRING1:
-                await self.one.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING2:
-                await self.two.leave_group_call(chat_id)
-        except:
-            pass
+    async def _leave(self, client, chat_id: int):
         try:
-            if config.STRING3:
-                await self.three.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING4:
-                await self.four.leave_group_call(chat_id)
-        except:
-            pass
-        try:
-            if config.STRING5:
-                await self.five.leave_group_call(chat_id)
+            await client.leave_group_call(chat_id)
         except:
             pass
+
+    async def stop_stream_force(self, chat_id: int):
+        await asyncio.gather(*[self._leave(x, chat_id) for x in self.clients.values()])
         try:
             await _clear_(chat_id)
         except:
@@ -150,78 +108,54 @@ class Call(PyTgCalls):
 
     async def speedup_stream(self, chat_id: int, file_path, speed, playing):
         assistant = await group_assistant(self, chat_id)
-        if str(speed) != str("1.0"):
-            base = os.path.basename(file_path)
-            chatdir = os.path.join(os.getcwd(), "playback", str(speed))
-            if not os.path.isdir(chatdir):
-                os.makedirs(chatdir)
-            out = os.path.join(chatdir, base)
-            if not os.path.isfile(out):
-                if str(speed) == str("0.5"):
-                    vs = 2.0
-                if str(speed) == str("0.75"):
-                    vs = 1.35
-                if str(speed) == str("1.5"):
-                    vs = 0.68
-                if str(speed) == str("2.0"):
-                    vs = 0.5
-                proc = await asyncio.create_subprocess_shell(
-                    cmd=(
-                        "ffmpeg "
-                        "-i "
-                        f"{file_path} "
-                        "-filter:v "
-                        f"setpts={vs}*PTS "
-                        "-filter:a "
-                        f"atempo={speed} "
-                        f"{out}"
-                    ),
-                    stdin=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                await proc.communicate()
-            else:
-                pass
+        rate = float(speed)
+        seconds = playing[0].old_second or playing[0].seconds
+        dur = time_to_seconds(playing[0].old_dur or playing[0].dur)
+        position = get_played(chat_id) * float(playing[0].speed or 1.0)
+        if playing[0].streamtype == "video" and rate != 1.0:
+            # The video pipe can't retime frames, so it plays a cached re-encode.
+            out = await speed_engine.transcode(file_path, speed)
+            params = tempo_params(int(position / rate), int(dur / rate))
         else:
             out = file_path
-        dur = await asyncio.get_event_loop().run_in_executor(None, check_duration, out)
-        dur = int(dur)
-        played, con_seconds = speed_converter(playing[0]["played"], speed)
-        duration = seconds_to_min(dur)
+            params = tempo_params(int(position), dur, speed)
+            if rate != 1.0:
+                speed_engine.live += 1
         stream = (
             AudioVideoPiped(
                 out,
                 audio_parameters=HighQualityAudio(),
                 video_parameters=MediumQualityVideo(),
-                additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
+                additional_ffmpeg_parameters=params,
             )
-            if playing[0]["streamtype"] == "video"
+            if playing[0].streamtype == "video"
             else AudioPiped(
                 out,
                 audio_parameters=HighQualityAudio(),
-                additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
+                additional_ffmpeg_parameters=params,
             )
         )
-        if str(db[chat_id][0]["file"]) == str(file_path):
+        if str(db[chat_id][0].file) == str(file_path):
             await assistant.change_stream(chat_id, stream)
         else:
             raise AssistantErr("Umm")
-        if str(db[chat_id][0]["file"]) == str(file_path):
-            exis = (playing[0]).get("old_dur")
+        if str(db[chat_id][0].file) == str(file_path):
+            exis = playing[0].old_dur
             if not exis:
-                db[chat_id][0]["old_dur"] = db[chat_id][0]["dur"]
-                db[chat_id][0]["old_second"] = db[chat_id][0]["seconds"]
-            db[chat_id][0]["played"] = con_seconds
-            db[chat_id][0]["dur"] = duration
-            db[chat_id][0]["seconds"] = dur
-            db[chat_id][0]["speed_path"] = out
-            db[chat_id][0]["speed"] = speed
+                db[chat_id][0].old_dur = db[chat_id][0].dur
+                db[chat_id][0].old_second = db[chat_id][0].seconds
+            start_clock(chat_id, position / rate)
+            db[chat_id][0].dur = seconds_to_min(dur / rate)
+            db[chat_id][0].seconds = int(seconds / rate)
+            db[chat_id][0].speed_path = out
+            db[chat_id][0].speed = speed
 
     async def force_stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         try:
             check = db.get(chat_id)
-            check.pop(0)
+            popped = check.pop()
+            await auto_clean(popped)
         except:
             pass
         await remove_active_video_chat(chat_id)
@@ -252,20 +186,21 @@ class Call(PyTgCalls):
             stream,
         )
 
-    async def seek_stream(self, chat_id, file_path, to_seek, duration, mode):
+    async def seek_stream(self, chat_id, file_path, to_seek, duration, mode, speed=None):
         assistant = await group_assistant(self, chat_id)
+        params = tempo_params(to_seek, duration, speed)
         stream = (
             AudioVideoPiped(
                 file_path,
                 audio_parameters=HighQualityAudio(),
                 video_parameters=MediumQualityVideo(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                additional_ffmpeg_parameters=params,
             )
             if mode == "video"
             else AudioPiped(
                 file_path,
                 audio_parameters=HighQualityAudio(),
-                additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                additional_ffmpeg_parameters=params,
             )
         )
         await assistant.change_stream(chat_id, stream)
@@ -317,10 +252,16 @@ class Call(PyTgCalls):
             raise AssistantErr(_["call_8"])
         except AlreadyJoinedError:
             raise AssistantErr(_["call_9"])
-        except TelegramServerError:
+        except TelegramServerError as e:
+            assistant_scheduler.failed(await get_assistant_number(chat_id), e)
             raise AssistantErr(_["call_10"])
+        except FloodWait as e:
+            assistant_scheduler.failed(await get_assistant_number(chat_id), e)
+            raise
+        assistant_scheduler.joined(chat_id, await get_assistant_number(chat_id))
         await add_active_chat(chat_id)
         await music_on(chat_id)
+        start_clock(chat_id)
         if video:
             await add_active_video_chat(chat_id)
         if await is_autoend():
@@ -335,11 +276,12 @@ class Call(PyTgCalls):
         loop = await get_loop(chat_id)
         try:
             if loop == 0:
-                popped = check.pop(0)
+                popped = check.pop()
             else:
                 loop = loop - 1
                 await set_loop(chat_id, loop)
             await auto_clean(popped)
+            await lazy_resolver.ready(check)
             if not check:
                 await _clear_(chat_id)
                 return await client.leave_group_call(chat_id)
@@ -350,22 +292,23 @@ class Call(PyTgCalls):
             except:
                 return
         else:
-            queued = check[0]["file"]
+            prefetch(chat_id)
+            queued = localize(check[0])
             language = await get_lang(chat_id)
             _ = get_string(language)
-            title = (check[0]["title"]).title()
-            user = check[0]["by"]
-            user_id = check[0]["user_id"]
-            original_chat_id = check[0]["chat_id"]
-            streamtype = check[0]["streamtype"]
-            videoid = check[0]["vidid"]
-            db[chat_id][0]["played"] = 0
-            exis = (check[0]).get("old_dur")
+            title = check[0].title.title()
+            user = check[0].by
+            user_id = check[0].user_id
+            original_chat_id = check[0].chat_id
+            streamtype = check[0].streamtype
+            videoid = check[0].vidid
+            start_clock(chat_id)
+            exis = check[0].old_dur
             if exis:
-                db[chat_id][0]["dur"] = exis
-                db[chat_id][0]["seconds"] = check[0]["old_second"]
-                db[chat_id][0]["speed_path"] = None
-                db[chat_id][0]["speed"] = 1.0
+                db[chat_id][0].dur = exis
+                db[chat_id][0].seconds = check[0].old_second
+                db[chat_id][0].speed_path = None
+                db[chat_id][0].speed = 1.0
             video = True if str(streamtype) == "video" else False
             if "live_" in queued:
                 n, link = await YouTube.video(videoid, True)
@@ -400,14 +343,15 @@ class Call(PyTgCalls):
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
                         title[:23],
-                        check[0]["dur"],
+                        check[0].dur,
                         user,
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id][0].mystic = run
+                db[chat_id][0].markup = "tg"
             elif "vid_" in queued:
+                started = time.monotonic()
                 mystic = await app.send_message(original_chat_id, _["call_7"])
                 try:
                     file_path, direct = await YouTube.download(
@@ -415,6 +359,7 @@ class Call(PyTgCalls):
                         mystic,
                         videoid=True,
                         video=True if str(streamtype) == "video" else False,
+                        progressive=True,
                     )
                 except:
                     return await mystic.edit_text(
@@ -438,6 +383,7 @@ class Call(PyTgCalls):
                         original_chat_id,
                         text=_["call_6"],
                     )
+                report_first_audio(chat_id, started, direct)
                 img = await get_thumb(videoid,user_id)
                 button = stream_markup(_, chat_id)
                 await mystic.delete()
@@ -447,13 +393,13 @@ class Call(PyTgCalls):
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
                         title[:23],
-                        check[0]["dur"],
+                        check[0].dur,
                         user,
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                db[chat_id][0].mystic = run
+                db[chat_id][0].markup = "stream"
             elif "index_" in queued:
                 stream = (
                     AudioVideoPiped(
@@ -478,8 +424,8 @@ class Call(PyTgCalls):
                     caption=_["stream_2"].format(user),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id][0].mystic = run
+                db[chat_id][0].markup = "tg"
             else:
                 if video:
                     stream = AudioVideoPiped(
@@ -507,24 +453,24 @@ class Call(PyTgCalls):
                         if str(streamtype) == "audio"
                         else config.TELEGRAM_VIDEO_URL,
                         caption=_["stream_1"].format(
-                            config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                            config.SUPPORT_CHAT, title[:23], check[0].dur, user
                         ),
                         reply_markup=InlineKeyboardMarkup(button),
                     )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
+                    db[chat_id][0].mystic = run
+                    db[chat_id][0].markup = "tg"
                 elif videoid == "soundcloud":
                     button = stream_markup(_, chat_id)
                     run = await app.send_photo(
                         chat_id=original_chat_id,
                         photo=config.SOUNCLOUD_IMG_URL,
                         caption=_["stream_1"].format(
-                            config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                            config.SUPPORT_CHAT, title[:23], check[0].dur, user
                         ),
                         reply_markup=InlineKeyboardMarkup(button),
                     )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
+                    db[chat_id][0].mystic = run
+                    db[chat_id][0].markup = "tg"
                 else:
                     img = await get_thumb(videoid,user_id)
                     button = stream_markup(_, chat_id)
@@ -534,69 +480,54 @@ class Call(PyTgCalls):
                         caption=_["stream_1"].format(
                             f"https://t.me/{app.username}?start=info_{videoid}",
                             title[:23],
-                            check[0]["dur"],
+                            check[0].dur,
                             user,
                         ),
                         reply_markup=InlineKeyboardMarkup(button),
                     )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "stream"
+                    db[chat_id][0].mystic = run
+                    db[chat_id][0].markup = "stream"
 
     async def ping(self):
-        pings = []
-        if config.STRING1:
-            pings.append(await self.one.ping)
-        if config.STRING2:
-            pings.append(await self.two.ping)
-        if config.STRING3:
-            pings.append(await self.three.ping)
-        if config.STRING4:
-            pings.append(await self.four.ping)
-        if config.STRING5:
-            pings.append(await self.five.ping)
+        pings = await asyncio.gather(*[self.clients[x].ping for x in assistants])
         return str(round(sum(pings) / len(pings), 3))
 
+    async def _start(self, num: int):
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(
+                self.clients[num].start(), config.ASSISTANT_START_TIMEOUT
+            )
+        except Exception as e:
+            LOGGER(__name__).error(
+                f"PyTgCalls client of assistant {num} failed to start, skipping it: {type(e).__name__}"
+            )
+            await userbot.drop(num)
+            forget_assistant(num)
+            return
+        LOGGER(__name__).info(
+            f"PyTgCalls client of assistant {num} started in {time.monotonic() - started:.2f}s"
+        )
+
     async def start(self):
         LOGGER(__name__).info("Starting PyTgCalls Client...\n")
-        if config.STRING1:
-            await self.one.start()
-        if config.STRING2:
-            await self.two.start()
-        if config.STRING3:
-            await self.three.start()
-        if config.STRING4:
-            await self.four.start()
-        if config.STRING5:
-            await self.five.start()
+        # Only assistants whose session came up get a call client.
+        await asyncio.gather(*[self._start(x) for x in list(assistants)])
 
     async def decorators(self):
-        @self.one.on_kicked()
-        @self.two.on_kicked()
-        @self.three.on_kicked()
-        @self.four.on_kicked()
-        @self.five.on_kicked()
-        @self.one.on_closed_voice_chat()
-        @self.two.on_closed_voice_chat()
-        @self.three.on_closed_voice_chat()
-        @self.four.on_closed_voice_chat()
-        @self.five.on_closed_voice_chat()
-        @self.one.on_left()
-        @self.two.on_left()
-        @self.three.on_left()
-        @self.four.on_left()
-        @self.five.on_left()
         async def stream_services_handler(_, chat_id: int):
             await self.stop_stream(chat_id)
 
-        @self.one.on_stream_end()
-        @self.two.on_stream_end()
-        @self.three.on_stream_end()
-        @self.four.on_stream_end()
-        @self.five.on_stream_end()
         async def stream_end_handler1(client, update: Update):
             if not isinstance(update, StreamAudioEnded):
                 return
             await self.change_stream(client, update.chat_id)
 
+        for client in self.clients.values():
+            client.on_kicked()(stream_services_handler)
+            client.on_closed_voice_chat()(stream_services_handler)
+            client.on_left()(stream_services_handler)
+            client.on_stream_end()(stream_end_handler1)
+
 
 VasudevKrishna = Call()
@@ -3,13 +3,18 @@ import os
 import re
 from typing import Union
 
-import yt_dlp
 from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
 from youtubesearchpython.__future__ import VideosSearch
 
-from SiriVcBot.utils.database import is_on_off
+import config
+from SiriVcBot.utils.database import get_yt_meta, is_on_off, save_yt_meta
 from SiriVcBot.utils.formatters import time_to_seconds
+from SiriVcBot.utils.singleflight import SingleFlight
+from SiriVcBot.utils.stream.cache import media_cache
+from SiriVcBot.utils.stream.queue import localize_queued
+from SiriVcBot.utils.ttlcache import TTLCache
+from SiriVcBot.utils.ytdl import extractors
 
 
 async def shell_cmd(cmd):
@@ -35,6 +40,17 @@ class YouTubeAPI:
         self.listbase = "https://youtube.com/playlist?list="
         self.reg = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
         self.cookies_path = '/home/ubuntu/sirivcbot/pragyancookies.txt'  # Set the cookies file path
+        self.flights = SingleFlight()
+        self.meta = TTLCache(config.YT_META_CACHE_TTL)
+        self.meta_flights = SingleFlight()
+        self.url_flights = SingleFlight()
+        self.streaming = {}
+        self.stream_opts = {
+            "format": "best[height<=?720][width<=?1280]",
+            "quiet": True,
+            "no_warnings": True,
+            "cookiefile": self.cookies_path,
+        }
 
     async def exists(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
@@ -68,21 +84,39 @@ class YouTubeAPI:
             return None
         return text[offset : offset + length]
 
+    async def search(self, link: str) -> dict:
+        result = self.meta.get(link)
+        if result is None:
+            result = await self.meta_flights.do(link, self._search, link)
+        return result
+
+    async def _search(self, link: str) -> dict:
+        result = None
+        if config.YT_META_PERSIST:
+            result = await get_yt_meta(link)
+        if result is None:
+            results = VideosSearch(link, limit=1)
+            result = (await results.next())["result"][0]
+            if config.YT_META_PERSIST:
+                await save_yt_meta(link, result)
+        self.meta.set(link, result)
+        self.meta.set(self.base + result["id"], result)
+        return result
+
     async def details(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-            vidid = result["id"]
-            if str(duration_min) == "None":
-                duration_sec = 0
-            else:
-                duration_sec = int(time_to_seconds(duration_min))
+        result = await self.search(link)
+        title = result["title"]
+        duration_min = result["duration"]
+        thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+        vidid = result["id"]
+        if str(duration_min) == "None":
+            duration_sec = 0
+        else:
+            duration_sec = int(time_to_seconds(duration_min))
         return title, duration_min, duration_sec, thumbnail, vidid
 
     async def title(self, link: str, videoid: Union[bool, str] = None):
@@ -90,51 +124,32 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-        return title
+        return (await self.search(link))["title"]
 
     async def duration(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            duration = result["duration"]
-        return duration
+        return (await self.search(link))["duration"]
 
     async def thumbnail(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        return thumbnail
+        result = await self.search(link)
+        return result["thumbnails"][0]["url"].split("?")[0]
 
     async def video(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        proc = await asyncio.create_subprocess_exec(
-            "yt-dlp",
-            "-g",
-            "-f",
-            "best[height<=?720][width<=?1280]",
-            "--cookies", self.cookies_path,
-            f"{link}",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-        if stdout:
-            return 1, stdout.decode().split("\n")[0]
-        else:
-            return 0, stderr.decode()
+        try:
+            return 1, await extractors.stream_url(self.stream_opts, link)
+        except Exception as e:
+            return 0, str(e)
 
     async def playlist(self, link, limit, user_id, videoid: Union[bool, str] = None):
         if videoid:
@@ -158,19 +173,14 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            duration_min = result["duration"]
-            vidid = result["id"]
-            yturl = result["link"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+        result = await self.search(link)
+        vidid = result["id"]
         track_details = {
-            "title": title,
-            "link": yturl,
+            "title": result["title"],
+            "link": result["link"],
             "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
+            "duration_min": result["duration"],
+            "thumb": result["thumbnails"][0]["url"].split("?")[0],
         }
         return track_details, vidid
 
@@ -183,34 +193,32 @@ class YouTubeAPI:
             "quiet": True,
             "cookies": self.cookies_path
         }
-        ydl = yt_dlp.YoutubeDL(ytdl_opts)
-        with ydl:
-            formats_available = []
-            r = ydl.extract_info(link, download=False)
-            for format in r["formats"]:
+        formats_available = []
+        r = await extractors.extract(ytdl_opts, link)
+        for format in r["formats"]:
+            try:
+                str(format["format"])
+            except:
+                continue
+            if not "dash" in str(format["format"]).lower():
                 try:
-                    str(format["format"])
+                    format["format"]
+                    format["filesize"]
+                    format["format_id"]
+                    format["ext"]
+                    format["format_note"]
                 except:
                     continue
-                if not "dash" in str(format["format"]).lower():
-                    try:
-                        format["format"]
-                        format["filesize"]
-                        format["format_id"]
-                        format["ext"]
-                        format["format_note"]
-                    except:
-                        continue
-                    formats_available.append(
-                        {
-                            "format": format["format"],
-                            "filesize": format["filesize"],
-                            "format_id": format["format_id"],
-                            "ext": format["ext"],
-                            "format_note": format["format_note"],
-                            "yturl": link,
-                        }
-                    )
+                formats_available.append(
+                    {
+                        "format": format["format"],
+                        "filesize": format["filesize"],
+                        "format_id": format["format_id"],
+                        "ext": format["ext"],
+                        "format_note": format["format_note"],
+                        "yturl": link,
+                    }
+                )
         return formats_available, link
 
     async def slider(
@@ -231,6 +239,12 @@ class YouTubeAPI:
         thumbnail = result[query_type]["thumbnails"][0]["url"].split("?")[0]
         return title, duration_min, thumbnail, vidid
 
+    def downloaded(self, key, future):
+        self.streaming.pop(key, None)
+        if future.cancelled() or future.exception():
+            return
+        localize_queued(os.path.splitext(os.path.basename(future.result()))[0])
+
     async def download(
         self,
         link: str,
@@ -241,116 +255,119 @@ class YouTubeAPI:
         songvideo: Union[bool, str] = None,
         format_id: Union[bool, str] = None,
         title: Union[bool, str] = None,
+        progressive: Union[bool, str] = None,
     ) -> str:
+        vidid = link if videoid else None
         if videoid:
             link = self.base + link
-        loop = asyncio.get_running_loop()
 
-        def audio_dl():
-            ydl_optssx = {
-                "format": "bestaudio[ext=m4a]",
-                "outtmpl": "downloads/%(id)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "cookies": self.cookies_path
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            info = x.extract_info(link, False)
-            xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
-            if os.path.exists(xyz):
-                return xyz
-            x.download([link])
+        async def fetch(mode, opts, info=None):
+            xyz = await extractors.download(opts, lambda x: cached_file(x, info))
+            media_cache.add(os.path.splitext(os.path.basename(xyz))[0], mode, xyz)
             return xyz
 
-        def video_dl():
-            ydl_optssx = {
-                "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
-                "outtmpl": "downloads/%(id)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "cookies": self.cookies_path
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            info = x.extract_info(link, False)
+        async def cached_dl(mode, opts):
+            xyz = media_cache.get(vidid, mode) if vidid else None
+            if xyz:
+                return xyz, True
+            key = (vidid or link, mode)
+            if progressive and config.PROGRESSIVE_PLAYBACK:
+                if key in self.streaming:
+                    return self.streaming[key], None
+                if key not in self.flights:
+                    # Play straight from the media url while the same extraction
+                    # keeps downloading into the cache for seeks and replays.
+                    # Concurrent plays share the extraction, and only the first
+                    # to get back starts the download.
+                    info = await self.url_flights.do(key, extractors.extract, opts, link)
+                    if key in self.streaming:
+                        return self.streaming[key], None
+                    if key not in self.flights and info.get("url"):
+                        self.streaming[key] = info["url"]
+                        self.flights.start(key, fetch, mode, opts, info).add_done_callback(
+                            lambda x: self.downloaded(key, x)
+                        )
+                        return info["url"], None
+            return await self.flights.do(key, fetch, mode, opts), True
+
+        def cached_file(x, info=None):
+            if info is None:
+                info = x.extract_info(link, False)
             xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
             if os.path.exists(xyz):
                 return xyz
-            x.download([link])
+            x.process_ie_result(info, download=True)
             return xyz
 
-        def song_video_dl():
-            formats = f"{format_id}+140"
-            fpath = f"downloads/{title}"
-            ydl_optssx = {
-                "format": formats,
-                "outtmpl": fpath,
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "prefer_ffmpeg": True,
-                "merge_output_format": "mp4",
-                "cookies": self.cookies_path
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            x.download([link])
+        audio_opts = {
+            "format": "bestaudio[ext=m4a]",
+            "outtmpl": "downloads/%(id)s.%(ext)s",
+            "geo_bypass": True,
+            "nocheckcertificate": True,
+            "quiet": True,
+            "no_warnings": True,
+            "cookies": self.cookies_path
+        }
 
-        def song_audio_dl():
-            fpath = f"downloads/{title}.%(ext)s"
-            ydl_optssx = {
-                "format": format_id,
-                "outtmpl": fpath,
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "prefer_ffmpeg": True,
-                "postprocessors": [
-                    {
-                        "key": "FFmpegExtractAudio",
-                        "preferredcodec": "mp3",
-                        "preferredquality": "192",
-                    }
-                ],
-                "cookies": self.cookies_path
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            x.download([link])
+        video_opts = {
+            "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
+            "outtmpl": "downloads/%(id)s.%(ext)s",
+            "geo_bypass": True,
+            "nocheckcertificate": True,
+            "quiet": True,
+            "no_warnings": True,
+            "cookies": self.cookies_path
+        }
+
+        song_video_opts = {
+            "format": f"{format_id}+140",
+            "outtmpl": f"downloads/{title}",
+            "geo_bypass": True,
+            "nocheckcertificate": True,
+            "quiet": True,
+            "no_warnings": True,
+            "prefer_ffmpeg": True,
+            "merge_output_format": "mp4",
+            "cookies": self.cookies_path
+        }
+
+        song_audio_opts = {
+            "format": format_id,
+            "outtmpl": f"downloads/{title}.%(ext)s",
+            "geo_bypass": True,
+            "nocheckcertificate": True,
+            "quiet": True,
+            "no_warnings": True,
+            "prefer_ffmpeg": True,
+            "postprocessors": [
+                {
+                    "key": "FFmpegExtractAudio",
+                    "preferredcodec": "mp3",
+                    "preferredquality": "192",
+                }
+            ],
+            "cookies": self.cookies_path
+        }
 
         if songvideo:
-            await loop.run_in_executor(None, song_video_dl)
+            await extractors.download(song_video_opts, lambda x: x.download([link]))
             fpath = f"downloads/{title}.mp4"
             return fpath
         elif songaudio:
-            await loop.run_in_executor(None, song_audio_dl)
+            await extractors.download(song_audio_opts, lambda x: x.download([link]))
             fpath = f"downloads/{title}.mp3"
             return fpath
         elif video:
             if await is_on_off(1):
-                direct = True
-                downloaded_file = await loop.run_in_executor(None, video_dl)
+                downloaded_file, direct = await cached_dl("video", video_opts)
             else:
-                proc = await asyncio.create_subprocess_exec(
-                    "yt-dlp",
-                    "-g",
-                    "-f",
-                    "best[height<=?720][width<=?1280]",
-                    "--cookies", self.cookies_path,
-                    f"{link}",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                stdout, stderr = await proc.communicate()
-                if stdout:
-                    downloaded_file = stdout.decode().split("\n")[0]
+                try:
+                    downloaded_file = await extractors.stream_url(
+                        self.stream_opts, link
+                    )
                     direct = None
-                else:
+                except Exception:
                     return
         else:
-            direct = True
-            downloaded_file = await loop.run_in_executor(None, audio_dl)
+            downloaded_file, direct = await cached_dl("audio", audio_opts)
         return downloaded_file, direct
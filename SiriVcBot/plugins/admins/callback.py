@@ -1,4 +1,5 @@
 import asyncio
+import time
 
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
@@ -6,6 +7,7 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from SiriVcBot import YouTube, app
 from SiriVcBot.core.call import VasudevKrishna
 from SiriVcBot.misc import SUDOERS, db
+from SiriVcBot.utils.admincache import admin_cache
 from SiriVcBot.utils.database import (
     get_active_chats,
     get_lang,
@@ -21,6 +23,10 @@ from SiriVcBot.utils.decorators.language import languageCB
 from SiriVcBot.utils.formatters import seconds_to_min
 from SiriVcBot.utils.inline import close_markup, stream_markup, stream_markup_timer
 from SiriVcBot.utils.stream.autoclear import auto_clean
+from SiriVcBot.utils.stream.clock import get_played, pause_clock, resume_clock, start_clock
+from SiriVcBot.utils.stream.latency import report_first_audio
+from SiriVcBot.utils.stream.lazy import lazy_resolver
+from SiriVcBot.utils.stream.queue import localize, prefetch
 from SiriVcBot.utils.thumbnails import get_thumb
 from config import (
     BANNED_USERS,
@@ -28,7 +34,6 @@ from config import (
     STREAM_IMG_URL,
     TELEGRAM_AUDIO_URL,
     TELEGRAM_VIDEO_URL,
-    adminlist,
     confirmer,
     votemode,
 )
@@ -86,9 +91,9 @@ async def del_back_playlist(client, CallbackQuery, _):
             except:
                 return await CallbackQuery.edit_message_text(f"ғᴀɪʟᴇᴅ.")
             try:
-                if current["vidid"] != exists["vidid"]:
+                if current.vidid != exists["vidid"]:
                     return await CallbackQuery.edit_message.text(_["admin_35"])
-                if current["file"] != exists["file"]:
+                if current.file != exists["file"]:
                     return await CallbackQuery.edit_message.text(_["admin_35"])
             except:
                 return await CallbackQuery.edit_message_text(_["admin_36"])
@@ -122,7 +127,7 @@ async def del_back_playlist(client, CallbackQuery, _):
         is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
         if not is_non_admin:
             if CallbackQuery.from_user.id not in SUDOERS:
-                admins = adminlist.get(CallbackQuery.message.chat.id)
+                admins = await admin_cache.admins(CallbackQuery.message.chat.id)
                 if not admins:
                     return await CallbackQuery.answer(_["admin_13"], show_alert=True)
                 else:
@@ -135,6 +140,7 @@ async def del_back_playlist(client, CallbackQuery, _):
             return await CallbackQuery.answer(_["admin_1"], show_alert=True)
         await CallbackQuery.answer()
         await music_off(chat_id)
+        pause_clock(chat_id)
         await VasudevKrishna.pause_stream(chat_id)
         await CallbackQuery.message.reply_text(
             _["admin_2"].format(mention), reply_markup=close_markup(_)
@@ -144,6 +150,7 @@ async def del_back_playlist(client, CallbackQuery, _):
             return await CallbackQuery.answer(_["admin_3"], show_alert=True)
         await CallbackQuery.answer()
         await music_on(chat_id)
+        resume_clock(chat_id)
         await VasudevKrishna.resume_stream(chat_id)
         await CallbackQuery.message.reply_text(
             _["admin_4"].format(mention), reply_markup=close_markup(_)
@@ -162,7 +169,7 @@ async def del_back_playlist(client, CallbackQuery, _):
             txt = f"➻ sᴛʀᴇᴀᴍ sᴋɪᴩᴩᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
             popped = None
             try:
-                popped = check.pop(0)
+                popped = check.pop()
                 if popped:
                     await auto_clean(popped)
                 if not check:
@@ -196,21 +203,31 @@ async def del_back_playlist(client, CallbackQuery, _):
         else:
             txt = f"➻ sᴛʀᴇᴀᴍ ʀᴇ-ᴘʟᴀʏᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
         await CallbackQuery.answer()
-        queued = check[0]["file"]
-        title = (check[0]["title"]).title()
-        user = check[0]["by"]
-        user_id = check[0]["user_id"]
-        duration = check[0]["dur"]
-        streamtype = check[0]["streamtype"]
-        videoid = check[0]["vidid"]
+        if not await lazy_resolver.ready(check):
+            await CallbackQuery.message.reply_text(
+                text=_["admin_6"].format(mention, CallbackQuery.message.chat.title),
+                reply_markup=close_markup(_),
+            )
+            try:
+                return await VasudevKrishna.stop_stream(chat_id)
+            except:
+                return
+        prefetch(chat_id)
+        queued = localize(check[0])
+        title = check[0].title.title()
+        user = check[0].by
+        user_id = check[0].user_id
+        duration = check[0].dur
+        streamtype = check[0].streamtype
+        videoid = check[0].vidid
         status = True if str(streamtype) == "video" else None
-        db[chat_id][0]["played"] = 0
-        exis = (check[0]).get("old_dur")
+        start_clock(chat_id)
+        exis = check[0].old_dur
         if exis:
-            db[chat_id][0]["dur"] = exis
-            db[chat_id][0]["seconds"] = check[0]["old_second"]
-            db[chat_id][0]["speed_path"] = None
-            db[chat_id][0]["speed"] = 1.0
+            db[chat_id][0].dur = exis
+            db[chat_id][0].seconds = check[0].old_second
+            db[chat_id][0].speed_path = None
+            db[chat_id][0].speed = 1.0
         if "live_" in queued:
             n, link = await YouTube.video(videoid, True)
             if n == 0:
@@ -238,10 +255,11 @@ async def del_back_playlist(client, CallbackQuery, _):
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "tg"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
         elif "vid_" in queued:
+            started = time.monotonic()
             mystic = await CallbackQuery.message.reply_text(
                 _["call_7"], disable_web_page_preview=True
             )
@@ -251,6 +269,7 @@ async def del_back_playlist(client, CallbackQuery, _):
                     mystic,
                     videoid=True,
                     video=status,
+                    progressive=True,
                 )
             except:
                 return await mystic.edit_text(_["call_6"])
@@ -262,6 +281,7 @@ async def del_back_playlist(client, CallbackQuery, _):
                 await VasudevKrishna.skip_stream(chat_id, file_path, video=status, image=image)
             except:
                 return await mystic.edit_text(_["call_6"])
+            report_first_audio(chat_id, started, direct)
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid,user_id)
             run = await CallbackQuery.message.reply_photo(
@@ -274,8 +294,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "stream"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
             await mystic.delete()
         elif "index_" in queued:
@@ -289,8 +309,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                 caption=_["stream_2"].format(user),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "tg"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
         else:
             if videoid == "telegram":
@@ -317,8 +337,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id][0].mystic = run
+                db[chat_id][0].markup = "tg"
             elif videoid == "soundcloud":
                 button = stream_markup(_, chat_id)
                 run = await CallbackQuery.message.reply_photo(
@@ -330,8 +350,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id][0].mystic = run
+                db[chat_id][0].markup = "tg"
             else:
                 button = stream_markup(_, chat_id)
                 img = await get_thumb(videoid,user_id)
@@ -345,8 +365,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                db[chat_id][0].mystic = run
+                db[chat_id][0].markup = "stream"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
 
 
@@ -360,11 +380,11 @@ async def markup_timer():
                 playing = db.get(chat_id)
                 if not playing:
                     continue
-                duration_seconds = int(playing[0]["seconds"])
+                duration_seconds = int(playing[0].seconds)
                 if duration_seconds == 0:
                     continue
                 try:
-                    mystic = playing[0]["mystic"]
+                    mystic = playing[0].mystic
                 except:
                     continue
                 try:
@@ -382,8 +402,8 @@ async def markup_timer():
                     buttons = stream_markup_timer(
                         _,
                         chat_id,
-                        seconds_to_min(playing[0]["played"]),
-                        playing[0]["dur"],
+                        seconds_to_min(get_played(chat_id)),
+                        playing[0].dur,
                     )
                     await mystic.edit_reply_markup(
                         reply_markup=InlineKeyboardMarkup(buttons)
@@ -6,6 +6,7 @@ from SiriVcBot.core.call import VasudevKrishna
 from SiriVcBot.utils.database import is_music_playing, music_off
 from SiriVcBot.utils.decorators import AdminRightsCheck
 from SiriVcBot.utils.inline import close_markup
+from SiriVcBot.utils.stream.clock import pause_clock
 from config import BANNED_USERS
 
 
@@ -15,6 +16,7 @@ async def pause_admin(cli, message: Message, _, chat_id):
     if not await is_music_playing(chat_id):
         return await message.reply_text(_["admin_1"])
     await music_off(chat_id)
+    pause_clock(chat_id)
     await VasudevKrishna.pause_stream(chat_id)
     await message.reply_text(
         _["admin_2"].format(message.from_user.mention), reply_markup=close_markup(_)
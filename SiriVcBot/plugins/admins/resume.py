@@ -6,6 +6,7 @@ from SiriVcBot.core.call import VasudevKrishna
 from SiriVcBot.utils.database import is_music_playing, music_on
 from SiriVcBot.utils.decorators import AdminRightsCheck
 from SiriVcBot.utils.inline import close_markup
+from SiriVcBot.utils.stream.clock import resume_clock
 from config import BANNED_USERS
 
 
@@ -15,6 +16,7 @@ async def resume_com(cli, message: Message, _, chat_id):
     if await is_music_playing(chat_id):
         return await message.reply_text(_["admin_3"])
     await music_on(chat_id)
+    resume_clock(chat_id)
     await VasudevKrishna.resume_stream(chat_id)
     await message.reply_text(
         _["admin_4"].format(message.from_user.mention), reply_markup=close_markup(_)
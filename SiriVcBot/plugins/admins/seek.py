@@ -6,6 +6,8 @@ from SiriVcBot.core.call import VasudevKrishna
 from SiriVcBot.misc import db
 from SiriVcBot.utils import AdminRightsCheck, seconds_to_min
 from SiriVcBot.utils.inline import close_markup
+from SiriVcBot.utils.stream.clock import get_played, start_clock
+from SiriVcBot.utils.stream.queue import localize
 from config import BANNED_USERS
 
 
@@ -24,13 +26,13 @@ async def seek_comm(cli, message: Message, _, chat_id):
     playing = db.get(chat_id)
     if not playing:
         return await message.reply_text(_["queue_2"])
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing[0].seconds)
     if duration_seconds == 0:
         return await message.reply_text(_["admin_22"])
-    file_path = playing[0]["file"]
-    duration_played = int(playing[0]["played"])
+    file_path = localize(playing[0])
+    duration_played = get_played(chat_id)
     duration_to_skip = int(query)
-    duration = playing[0]["dur"]
+    duration = playing[0].dur
     if message.command[0][-2] == "c":
         if (duration_played - duration_to_skip) <= 10:
             return await message.reply_text(
@@ -47,28 +49,32 @@ async def seek_comm(cli, message: Message, _, chat_id):
         to_seek = duration_played + duration_to_skip + 1
     mystic = await message.reply_text(_["admin_24"])
     if "vid_" in file_path:
-        n, file_path = await YouTube.video(playing[0]["vidid"], True)
+        n, file_path = await YouTube.video(playing[0].vidid, True)
         if n == 0:
             return await message.reply_text(_["admin_22"])
-    check = (playing[0]).get("speed_path")
+    seek_to, speed = seconds_to_min(to_seek), None
+    check = playing[0].speed_path
     if check:
+        if check == file_path and float(playing[0].speed or 1.0) != 1.0:
+            # Tempo is applied live, so seek in the untouched source instead.
+            speed = playing[0].speed
+            seek_to = seconds_to_min(to_seek * float(speed))
+            duration = playing[0].old_dur
         file_path = check
     if "index_" in file_path:
-        file_path = playing[0]["vidid"]
+        file_path = playing[0].vidid
     try:
         await VasudevKrishna.seek_stream(
             chat_id,
             file_path,
-            seconds_to_min(to_seek),
+            seek_to,
             duration,
-            playing[0]["streamtype"],
+            playing[0].streamtype,
+            speed,
         )
     except:
         return await mystic.edit_text(_["admin_26"], reply_markup=close_markup(_))
-    if message.command[0][-2] == "c":
-        db[chat_id][0]["played"] -= duration_to_skip
-    else:
-        db[chat_id][0]["played"] += duration_to_skip
+    start_clock(chat_id, to_seek)
     await mystic.edit_text(
         text=_["admin_25"].format(seconds_to_min(to_seek), message.from_user.mention),
         reply_markup=close_markup(_),
@@ -1,5 +1,3 @@
-import random
-
 from pyrogram import filters
 from pyrogram.types import Message
 
@@ -7,6 +5,7 @@ from SiriVcBot import app
 from SiriVcBot.misc import db
 from SiriVcBot.utils.decorators import AdminRightsCheck
 from SiriVcBot.utils.inline import close_markup
+from SiriVcBot.utils.stream.queue import prefetch
 from config import BANNED_USERS
 
 
@@ -18,16 +17,9 @@ async def admins(Client, message: Message, _, chat_id):
     check = db.get(chat_id)
     if not check:
         return await message.reply_text(_["queue_2"])
-    try:
-        popped = check.pop(0)
-    except:
-        return await message.reply_text(_["admin_15"], reply_markup=close_markup(_))
-    check = db.get(chat_id)
-    if not check:
-        check.insert(0, popped)
+    if not check.shuffle():
         return await message.reply_text(_["admin_15"], reply_markup=close_markup(_))
-    random.shuffle(check)
-    check.insert(0, popped)
+    prefetch(chat_id)
     await message.reply_text(
         _["admin_16"].format(message.from_user.mention), reply_markup=close_markup(_)
     )
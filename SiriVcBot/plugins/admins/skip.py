@@ -1,3 +1,5 @@
+import time
+
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardMarkup, Message
 
@@ -9,6 +11,10 @@ from SiriVcBot.utils.database import get_loop
 from SiriVcBot.utils.decorators import AdminRightsCheck
 from SiriVcBot.utils.inline import close_markup, stream_markup
 from SiriVcBot.utils.stream.autoclear import auto_clean
+from SiriVcBot.utils.stream.clock import start_clock
+from SiriVcBot.utils.stream.latency import report_first_audio
+from SiriVcBot.utils.stream.lazy import lazy_resolver
+from SiriVcBot.utils.stream.queue import localize, prefetch
 from SiriVcBot.utils.thumbnails import get_thumb
 from config import BANNED_USERS
 
@@ -34,7 +40,7 @@ async def skip(cli, message: Message, _, chat_id):
                         for x in range(state):
                             popped = None
                             try:
-                                popped = check.pop(0)
+                                popped = check.pop()
                             except:
                                 return await message.reply_text(_["admin_12"])
                             if popped:
@@ -64,7 +70,7 @@ async def skip(cli, message: Message, _, chat_id):
         check = db.get(chat_id)
         popped = None
         try:
-            popped = check.pop(0)
+            popped = check.pop()
             if popped:
                 await auto_clean(popped)
             if not check:
@@ -89,20 +95,30 @@ async def skip(cli, message: Message, _, chat_id):
                 return await VasudevKrishna.stop_stream(chat_id)
             except:
                 return
-    queued = check[0]["file"]
-    title = (check[0]["title"]).title()
-    user = check[0]["by"]
-    user_id = check[0]["user_id"]
-    streamtype = check[0]["streamtype"]
-    videoid = check[0]["vidid"]
+    if not await lazy_resolver.ready(check):
+        await message.reply_text(
+            text=_["admin_6"].format(message.from_user.mention, message.chat.title),
+            reply_markup=close_markup(_),
+        )
+        try:
+            return await VasudevKrishna.stop_stream(chat_id)
+        except:
+            return
+    prefetch(chat_id)
+    queued = localize(check[0])
+    title = check[0].title.title()
+    user = check[0].by
+    user_id = check[0].user_id
+    streamtype = check[0].streamtype
+    videoid = check[0].vidid
     status = True if str(streamtype) == "video" else None
-    db[chat_id][0]["played"] = 0
-    exis = (check[0]).get("old_dur")
+    start_clock(chat_id)
+    exis = check[0].old_dur
     if exis:
-        db[chat_id][0]["dur"] = exis
-        db[chat_id][0]["seconds"] = check[0]["old_second"]
-        db[chat_id][0]["speed_path"] = None
-        db[chat_id][0]["speed"] = 1.0
+        db[chat_id][0].dur = exis
+        db[chat_id][0].seconds = check[0].old_second
+        db[chat_id][0].speed_path = None
+        db[chat_id][0].speed = 1.0
     if "live_" in queued:
         n, link = await YouTube.video(videoid, True)
         if n == 0:
@@ -122,14 +138,15 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
                 title[:23],
-                check[0]["dur"],
+                check[0].dur,
                 user,
             ),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        db[chat_id][0].mystic = run
+        db[chat_id][0].markup = "tg"
     elif "vid_" in queued:
+        started = time.monotonic()
         mystic = await message.reply_text(_["call_7"], disable_web_page_preview=True)
         try:
             file_path, direct = await YouTube.download(
@@ -137,6 +154,7 @@ async def skip(cli, message: Message, _, chat_id):
                 mystic,
                 videoid=True,
                 video=status,
+                progressive=True,
             )
         except:
             return await mystic.edit_text(_["call_6"])
@@ -148,6 +166,7 @@ async def skip(cli, message: Message, _, chat_id):
             await VasudevKrishna.skip_stream(chat_id, file_path, video=status, image=image)
         except:
             return await mystic.edit_text(_["call_6"])
+        report_first_audio(chat_id, started, direct)
         button = stream_markup(_, chat_id)
         img = await get_thumb(videoid,user_id)
         run = await message.reply_photo(
@@ -155,13 +174,13 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
                 title[:23],
-                check[0]["dur"],
+                check[0].dur,
                 user,
             ),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "stream"
+        db[chat_id][0].mystic = run
+        db[chat_id][0].markup = "stream"
         await mystic.delete()
     elif "index_" in queued:
         try:
@@ -174,8 +193,8 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_2"].format(user),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        db[chat_id][0].mystic = run
+        db[chat_id][0].markup = "tg"
     else:
         if videoid == "telegram":
             image = None
@@ -197,12 +216,12 @@ async def skip(cli, message: Message, _, chat_id):
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
                 caption=_["stream_1"].format(
-                    config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                    config.SUPPORT_CHAT, title[:23], check[0].dur, user
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "tg"
         elif videoid == "soundcloud":
             button = stream_markup(_, chat_id)
             run = await message.reply_photo(
@@ -210,12 +229,12 @@ async def skip(cli, message: Message, _, chat_id):
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
                 caption=_["stream_1"].format(
-                    config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
+                    config.SUPPORT_CHAT, title[:23], check[0].dur, user
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "tg"
         else:
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid,user_id)
@@ -224,10 +243,10 @@ async def skip(cli, message: Message, _, chat_id):
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
                     title[:23],
-                    check[0]["dur"],
+                    check[0].dur,
                     user,
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "stream"
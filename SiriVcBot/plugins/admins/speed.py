@@ -5,10 +5,12 @@ from SiriVcBot import app
 from SiriVcBot.core.call import VasudevKrishna
 from SiriVcBot.misc import SUDOERS, db
 from SiriVcBot.utils import AdminRightsCheck
+from SiriVcBot.utils.admincache import admin_cache
 from SiriVcBot.utils.database import is_active_chat, is_nonadmin_chat
 from SiriVcBot.utils.decorators.language import languageCB
 from SiriVcBot.utils.inline import close_markup, speed_markup
-from config import BANNED_USERS, adminlist
+from SiriVcBot.utils.stream.queue import localize
+from config import BANNED_USERS
 
 checker = []
 
@@ -23,10 +25,10 @@ async def playback(cli, message: Message, _, chat_id):
     playing = db.get(chat_id)
     if not playing:
         return await message.reply_text(_["queue_2"])
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing[0].seconds)
     if duration_seconds == 0:
         return await message.reply_text(_["admin_27"])
-    file_path = playing[0]["file"]
+    file_path = localize(playing[0])
     if "downloads" not in file_path:
         return await message.reply_text(_["admin_27"])
     upl = speed_markup(_, chat_id)
@@ -48,7 +50,7 @@ async def del_back_playlist(client, CallbackQuery, _):
     is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
     if not is_non_admin:
         if CallbackQuery.from_user.id not in SUDOERS:
-            admins = adminlist.get(CallbackQuery.message.chat.id)
+            admins = await admin_cache.admins(CallbackQuery.message.chat.id)
             if not admins:
                 return await CallbackQuery.answer(_["admin_13"], show_alert=True)
             else:
@@ -57,13 +59,13 @@ async def del_back_playlist(client, CallbackQuery, _):
     playing = db.get(chat_id)
     if not playing:
         return await CallbackQuery.answer(_["queue_2"], show_alert=True)
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing[0].seconds)
     if duration_seconds == 0:
         return await CallbackQuery.answer(_["admin_27"], show_alert=True)
-    file_path = playing[0]["file"]
+    file_path = localize(playing[0])
     if "downloads" not in file_path:
         return await CallbackQuery.answer(_["admin_27"], show_alert=True)
-    checkspeed = (playing[0]).get("speed")
+    checkspeed = playing[0].speed
     if checkspeed:
         if str(checkspeed) == str(speed):
             if str(speed) == str("1.0"):
@@ -0,0 +1,25 @@
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.types import ChatMemberUpdated
+
+from SiriVcBot import app
+from SiriVcBot.utils.admincache import admin_cache
+
+ADMINS = (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER)
+
+
+def is_admin(member) -> bool:
+    return bool(member) and member.status in ADMINS
+
+
+@app.on_chat_member_updated()
+async def admin_changed(_, update: ChatMemberUpdated):
+    old = update.old_chat_member
+    new = update.new_chat_member
+    if not is_admin(old) and not is_admin(new):
+        return
+    # Promotions, demotions and edited rights all change who may control the
+    # stream, so the next check fetches a fresh list.
+    if getattr(old, "privileges", None) != getattr(new, "privileges", None) or (
+        is_admin(old) != is_admin(new)
+    ):
+        admin_cache.invalidate(update.chat.id)
@@ -1,33 +1,225 @@
 import asyncio
+import time
 
 from pyrogram import filters
-from pyrogram.enums import ChatMembersFilter
 from pyrogram.errors import FloodWait
 
+import config
 from SiriVcBot import app
+from SiriVcBot.logging import LOGGER
 from SiriVcBot.misc import SUDOERS
 from SiriVcBot.utils.database import (
-    get_active_chats,
-    get_authuser_names,
+    delete_broadcast_job,
+    get_broadcast_job,
     get_client,
-    get_served_chats,
-    get_served_users,
+    get_lang,
+    get_served_chats_count,
+    get_served_users_count,
+    iter_served_chats,
+    iter_served_users,
+    save_broadcast_job,
 )
 from SiriVcBot.utils.decorators.language import language
-from SiriVcBot.utils.formatters import alpha_to_int
-from config import adminlist
+from SiriVcBot.utils.formatters import get_readable_time
+from SiriVcBot.utils.ratelimit import TokenBucket, app_limiter
+from strings import get_string
 
 IS_BROADCASTING = False
+PAGE_SIZE = 100
+PROGRESS_INTERVAL = 10
+SEND_ATTEMPTS = 3
+
+running = {}
+
+
+class Broadcast:
+    def __init__(self, job: dict):
+        self.job = job
+        self.slots = asyncio.Semaphore(config.BROADCAST_WORKERS)
+        self.started = time.monotonic()
+        self.delivered = 0
+        self.total = 0
+
+    async def _send(self, client, limiter, chat_id):
+        job = self.job
+        for _ in range(SEND_ATTEMPTS):
+            await limiter.acquire()
+            try:
+                if job["message_id"]:
+                    return await client.forward_messages(
+                        chat_id, job["from_chat"], job["message_id"]
+                    )
+                return await client.send_message(chat_id, text=job["text"])
+            except FloodWait as fw:
+                if not limiter.pause(int(fw.value)):
+                    return None
+            except:
+                return None
+        return None
+
+    async def _deliver(self, chat_id, pin):
+        async with self.slots:
+            m = await self._send(app, app_limiter, chat_id)
+        if not m:
+            self.job["failed"] += 1
+            return
+        self.job[self.job["phase"]] += 1
+        self.delivered += 1
+        if pin:
+            try:
+                await m.pin(disable_notification=pin == "quiet")
+                self.job["pinned"] += 1
+            except:
+                pass
+
+    async def _phase(self, targets, pin=None):
+        page = []
+        async for chat_id in targets(after=self.job["cursor"]):
+            page.append(chat_id)
+            if len(page) >= PAGE_SIZE:
+                await self._page(page, pin)
+                page = []
+        if page:
+            await self._page(page, pin)
+
+    async def _page(self, page, pin):
+        await asyncio.gather(*[self._deliver(x, pin) for x in page])
+        # The cursor only moves past whole pages, so a restart resends at
+        # most the page that was in flight.
+        self.job["cursor"] = page[-1]
+        await self._save()
+
+    async def _next_phase(self, phase):
+        self.job["phase"] = phase
+        self.job["cursor"] = None
+        await self._save()
+
+    async def _save(self):
+        # A stop waits for the broadcast to end before deleting the job, so a
+        # save already on its way finishes first instead of reviving it.
+        saving = asyncio.ensure_future(save_broadcast_job(self.job))
+        try:
+            await asyncio.shield(saving)
+        except asyncio.CancelledError:
+            await saving
+            raise
+
+    async def _assistant(self, num):
+        client = await get_client(num)
+        limiter = TokenBucket(1 / 3, 1)
+        sent = 0
+        async for dialog in client.get_dialogs():
+            if await self._send(client, limiter, dialog.chat.id):
+                sent += 1
+                self.delivered += 1
+        return sent
+
+    async def _report(self):
+        while not await asyncio.sleep(PROGRESS_INTERVAL):
+            await self._edit(self.progress())
+
+    async def _edit(self, text):
+        try:
+            await app.edit_message_text(
+                self.job["status_chat"], self.job["status_id"], text
+            )
+        except:
+            pass
+
+    def progress(self) -> str:
+        job = self.job
+        took = time.monotonic() - self.started
+        text = (
+            f"» ʙʀᴏᴀᴅᴄᴀsᴛɪɴɢ ᴛᴏ {job['phase']}...\n\n"
+            f"<b>ᴄʜᴀᴛs :</b> <code>{job['chats']}</code>\n"
+            f"<b>ᴜsᴇʀs :</b> <code>{job['users']}</code>\n"
+            f"<b>ᴘɪɴs :</b> <code>{job['pinned']}</code>\n"
+            f"<b>ғᴀɪʟᴇᴅ :</b> <code>{job['failed']}</code>\n"
+        )
+        if self.total and job["phase"] in ("chats", "users"):
+            text += f"<b>ᴘʜᴀsᴇ ᴛᴏᴛᴀʟ :</b> <code>{self.total}</code>\n"
+        text += (
+            f"<b>sᴘᴇᴇᴅ :</b> <code>{self.delivered / took if took else 0:.2f} ᴍsɢs/s</code>\n"
+            f"<b>ᴇʟᴀᴘsᴇᴅ :</b> <code>{get_readable_time(int(took)) or '0s'}</code>\n"
+        )
+        wait = app_limiter.paused()
+        if wait:
+            text += f"\nғʟᴏᴏᴅᴡᴀɪᴛ, ʀᴇsᴜᴍɪɴɢ ɪɴ <code>{int(wait)}s</code>"
+        return text
+
+    async def run(self):
+        job = self.job
+        mode = job["mode"]
+        _ = get_string(job["lang"])
+        reporter = asyncio.create_task(self._report())
+        try:
+            if job["phase"] == "chats":
+                if "-nobot" not in mode:
+                    pin = None
+                    if "-pinloud" in mode:
+                        pin = "loud"
+                    elif "-pin" in mode:
+                        pin = "quiet"
+                    self.total = await get_served_chats_count()
+                    await self._phase(iter_served_chats, pin)
+                    await app.send_message(
+                        job["status_chat"],
+                        _["broad_3"].format(job["chats"], job["pinned"]),
+                    )
+                await self._next_phase("users")
+            if job["phase"] == "users":
+                if "-user" in mode:
+                    self.total = await get_served_users_count()
+                    await self._phase(iter_served_users)
+                    await app.send_message(
+                        job["status_chat"], _["broad_4"].format(job["users"])
+                    )
+                await self._next_phase("assistant")
+            if "-assistant" in mode:
+                from SiriVcBot.core.userbot import assistants
+
+                aw = await app.send_message(job["status_chat"], _["broad_5"])
+                counts = await asyncio.gather(*[self._assistant(x) for x in assistants])
+                text = _["broad_6"]
+                for num, sent in zip(assistants, counts):
+                    text += _["broad_7"].format(num, sent)
+                try:
+                    await aw.edit_text(text)
+                except:
+                    pass
+            await delete_broadcast_job()
+        finally:
+            reporter.cancel()
+        await self._edit(self.progress().replace("ʙʀᴏᴀᴅᴄᴀsᴛɪɴɢ", "ʙʀᴏᴀᴅᴄᴀsᴛᴇᴅ", 1))
+
+
+async def start_broadcast(job: dict):
+    global IS_BROADCASTING
+    IS_BROADCASTING = True
+    try:
+        await Broadcast(job).run()
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        LOGGER(__name__).error(f"Broadcast stopped, it will resume on restart: {e}")
+    finally:
+        IS_BROADCASTING = False
+        running.pop("broadcast", None)
 
 
 @app.on_message(filters.command("broadcast") & SUDOERS)
 @language
 async def braodcast_message(client, message, _):
-    global IS_BROADCASTING
+    if IS_BROADCASTING:
+        return await message.reply_text(
+            "» ᴀ ʙʀᴏᴀᴅᴄᴀsᴛ ɪs ᴀʟʀᴇᴀᴅʏ ʀᴜɴɴɪɴɢ, ᴜsᴇ /stopbroadcast ᴛᴏ ᴄᴀɴᴄᴇʟ ɪᴛ."
+        )
+    query = None
     if message.reply_to_message:
         x = message.reply_to_message.id
         y = message.chat.id
     else:
+        x = y = None
         if len(message.command) < 2:
             return await message.reply_text(_["broad_2"])
         query = message.text.split(None, 1)[1]
@@ -44,126 +236,58 @@ async def braodcast_message(client, message, _):
         if query == "":
             return await message.reply_text(_["broad_8"])
 
-    IS_BROADCASTING = True
-    await message.reply_text(_["broad_1"])
+    status = await message.reply_text(_["broad_1"])
+    job = {
+        "job": "broadcast",
+        "mode": message.text,
+        "from_chat": y,
+        "message_id": x,
+        "text": query,
+        "lang": await get_lang(message.chat.id),
+        "status_chat": status.chat.id,
+        "status_id": status.id,
+        "phase": "chats",
+        "cursor": None,
+        "chats": 0,
+        "users": 0,
+        "pinned": 0,
+        "failed": 0,
+    }
+    await save_broadcast_job(job)
+    running["broadcast"] = asyncio.create_task(start_broadcast(job))
 
-    if "-nobot" not in message.text:
-        sent = 0
-        pin = 0
-        chats = []
-        schats = await get_served_chats()
-        for chat in schats:
-            chats.append(int(chat["chat_id"]))
-        for i in chats:
-            try:
-                m = (
-                    await app.forward_messages(i, y, x)
-                    if message.reply_to_message
-                    else await app.send_message(i, text=query)
-                )
-                if "-pin" in message.text:
-                    try:
-                        await m.pin(disable_notification=True)
-                        pin += 1
-                    except:
-                        continue
-                elif "-pinloud" in message.text:
-                    try:
-                        await m.pin(disable_notification=False)
-                        pin += 1
-                    except:
-                        continue
-                sent += 1
-                await asyncio.sleep(0.2)
-            except FloodWait as fw:
-                flood_time = int(fw.value)
-                if flood_time > 200:
-                    continue
-                await asyncio.sleep(flood_time)
-            except:
-                continue
-        try:
-            await message.reply_text(_["broad_3"].format(sent, pin))
-        except:
-            pass
 
-    if "-user" in message.text:
-        susr = 0
-        served_users = []
-        susers = await get_served_users()
-        for user in susers:
-            served_users.append(int(user["user_id"]))
-        for i in served_users:
-            try:
-                m = (
-                    await app.forward_messages(i, y, x)
-                    if message.reply_to_message
-                    else await app.send_message(i, text=query)
-                )
-                susr += 1
-                await asyncio.sleep(0.2)
-            except FloodWait as fw:
-                flood_time = int(fw.value)
-                if flood_time > 200:
-                    continue
-                await asyncio.sleep(flood_time)
-            except:
-                pass
+@app.on_message(filters.command(["stopbroadcast", "cancelbroadcast"]) & SUDOERS)
+async def stop_broadcast(client, message):
+    task = running.get("broadcast")
+    if task:
+        task.cancel()
         try:
-            await message.reply_text(_["broad_4"].format(susr))
-        except:
+            await task
+        except asyncio.CancelledError:
             pass
+    await delete_broadcast_job()
+    await message.reply_text(
+        "» ʙʀᴏᴀᴅᴄᴀsᴛ sᴛᴏᴘᴘᴇᴅ." if task else "» ɴᴏ ʙʀᴏᴀᴅᴄᴀsᴛ ɪs ʀᴜɴɴɪɴɢ."
+    )
 
-    if "-assistant" in message.text:
-        aw = await message.reply_text(_["broad_5"])
-        text = _["broad_6"]
-        from SiriVcBot.core.userbot import assistants
 
-        for num in assistants:
-            sent = 0
-            client = await get_client(num)
-            async for dialog in client.get_dialogs():
-                try:
-                    await client.forward_messages(
-                        dialog.chat.id, y, x
-                    ) if message.reply_to_message else await client.send_message(
-                        dialog.chat.id, text=query
-                    )
-                    sent += 1
-                    await asyncio.sleep(3)
-                except FloodWait as fw:
-                    flood_time = int(fw.value)
-                    if flood_time > 200:
-                        continue
-                    await asyncio.sleep(flood_time)
-                except:
-                    continue
-            text += _["broad_7"].format(num, sent)
-        try:
-            await aw.edit_text(text)
-        except:
-            pass
-    IS_BROADCASTING = False
-
-
-async def auto_clean():
-    while not await asyncio.sleep(10):
-        try:
-            served_chats = await get_active_chats()
-            for chat_id in served_chats:
-                if chat_id not in adminlist:
-                    adminlist[chat_id] = []
-                    async for user in app.get_chat_members(
-                        chat_id, filter=ChatMembersFilter.ADMINISTRATORS
-                    ):
-                        if user.privileges.can_manage_video_chats:
-                            adminlist[chat_id].append(user.user.id)
-                    authusers = await get_authuser_names(chat_id)
-                    for user in authusers:
-                        user_id = await alpha_to_int(user)
-                        adminlist[chat_id].append(user_id)
-        except:
-            continue
+async def resume_broadcast():
+    try:
+        job = await get_broadcast_job()
+    except:
+        return
+    if not job or IS_BROADCASTING:
+        return
+    LOGGER(__name__).info(f"Resuming broadcast from {job['phase']} {job['cursor']}.")
+    try:
+        await app.send_message(
+            job["status_chat"],
+            f"» ʀᴇsᴜᴍɪɴɢ ʙʀᴏᴀᴅᴄᴀsᴛ ᴀғᴛᴇʀ ʀᴇsᴛᴀʀᴛ ({job['phase']})...",
+        )
+    except:
+        pass
+    running["broadcast"] = asyncio.create_task(start_broadcast(job))
 
 
-asyncio.create_task(auto_clean())
+asyncio.create_task(resume_broadcast())
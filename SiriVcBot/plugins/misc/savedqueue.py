@@ -0,0 +1,202 @@
+import asyncio
+import os
+
+from pyrogram import filters
+
+import config
+from SiriVcBot import YouTube, app
+from SiriVcBot.core.call import VasudevKrishna
+from SiriVcBot.logging import LOGGER
+from SiriVcBot.misc import SUDOERS, db
+from SiriVcBot.utils.admincache import admin_cache
+from SiriVcBot.utils.database import get_lang, is_active_chat, is_nonadmin_chat
+from SiriVcBot.utils.decorators.language import languageCB
+from SiriVcBot.utils.decorators.play import join_assistant
+from SiriVcBot.utils.formatters import seconds_to_min
+from SiriVcBot.utils.inline import saved_queue_markup
+from SiriVcBot.utils.stream.autoclear import auto_clean
+from SiriVcBot.utils.stream.cache import media_cache
+from SiriVcBot.utils.stream.clock import start_clock
+from SiriVcBot.utils.stream.lazy import lazy_resolver
+from SiriVcBot.utils.stream.persist import SNAPSHOT_INTERVAL, queue_store
+from SiriVcBot.utils.stream.queue import localize, prefetch
+from SiriVcBot.utils.stream.stream import stream
+from config import BANNED_USERS
+from strings import get_string
+
+
+async def queue_snapshotter():
+    while not await asyncio.sleep(SNAPSHOT_INTERVAL):
+        try:
+            await queue_store.snapshot(queue_store.rate)
+        except:
+            continue
+
+
+async def offer_saved_queues():
+    try:
+        chats = await queue_store.load()
+    except Exception as e:
+        media_cache.sweep()
+        return LOGGER(__name__).warning(f"Failed to load saved queues: {e}")
+    media_cache.sweep(
+        os.path.join(media_cache.path, os.path.basename(x.file))
+        for queue, _ in queue_store.pending.values()
+        for x in queue
+    )
+    for chat_id in chats:
+        queue, position = queue_store.pending[chat_id]
+        language = await get_lang(chat_id)
+        _ = get_string(language)
+        try:
+            await app.send_message(
+                queue[0].chat_id,
+                _["queue_9"].format(
+                    app.mention, len(queue), queue[0].title, seconds_to_min(position)
+                ),
+                reply_markup=saved_queue_markup(_, chat_id),
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"Couldn't offer the saved queue of {chat_id}: {e}")
+    if chats:
+        LOGGER(__name__).info(f"Offered {len(chats)} saved queues for resuming.")
+
+
+def saved_result(entry):
+    # The streamtype and result the play commands would hand to stream() for
+    # this track, so a resumed queue starts the same way a fresh play does.
+    file = entry.file
+    if "index_" in file:
+        return "index", entry.vidid
+    if "live_" in file:
+        return "live", {
+            "link": YouTube.base + entry.vidid,
+            "vidid": entry.vidid,
+            "title": entry.title,
+            "thumb": None,
+        }
+    if entry.vidid == "soundcloud":
+        return "soundcloud", {
+            "filepath": file,
+            "title": entry.title,
+            "duration_min": entry.dur,
+        }
+    if entry.vidid == "telegram":
+        return "telegram", {
+            "path": file,
+            "link": config.SUPPORT_CHAT,
+            "title": entry.title,
+            "dur": entry.dur,
+        }
+    return "youtube", {
+        "link": YouTube.base + entry.vidid,
+        "vidid": entry.vidid,
+        "title": entry.title,
+        "duration_min": entry.dur,
+        "thumb": None,
+    }
+
+
+async def seek_saved(chat_id: int, position: int):
+    # Same source selection as /seek.
+    playing = db[chat_id][0]
+    if position <= 10 or not playing.seconds or position >= int(playing.seconds) - 10:
+        return
+    file_path = localize(playing)
+    if "vid_" in file_path:
+        n, file_path = await YouTube.video(playing.vidid, True)
+        if n == 0:
+            return
+    try:
+        await VasudevKrishna.seek_stream(
+            chat_id,
+            file_path,
+            seconds_to_min(position),
+            playing.dur,
+            playing.streamtype,
+        )
+    except:
+        return
+    start_clock(chat_id, position)
+
+
+async def resume_stream(chat_id: int, queue, position: int, mystic, _):
+    head = queue[0]
+    streamtype, result = saved_result(head)
+    if streamtype in ("live", "index"):
+        position = 0
+    try:
+        chat = await app.get_chat(chat_id)
+        username = chat.username
+    except:
+        username = None
+    await join_assistant(chat_id, _, mystic.edit_text, username)
+    await stream(
+        _,
+        mystic,
+        head.user_id,
+        result,
+        chat_id,
+        head.by,
+        head.chat_id,
+        video=True if head.streamtype == "video" else None,
+        streamtype=streamtype,
+    )
+    # stream() queued its own entry for the head, the rest follows it.
+    await auto_clean(head)
+    for entry in list(queue)[1:]:
+        db[chat_id].enqueue(entry)
+    prefetch(chat_id)
+    await seek_saved(chat_id, position)
+
+
+@app.on_callback_query(filters.regex("SavedQueue") & ~BANNED_USERS)
+@languageCB
+async def saved_queue(client, CallbackQuery, _):
+    callback_data = CallbackQuery.data.strip()
+    command, chat = callback_data.split(None, 1)[1].split("|")
+    chat_id = int(chat)
+    if not await is_nonadmin_chat(CallbackQuery.message.chat.id):
+        if CallbackQuery.from_user.id not in SUDOERS:
+            admins = await admin_cache.admins(CallbackQuery.message.chat.id)
+            if CallbackQuery.from_user.id not in admins:
+                return await CallbackQuery.answer(_["admin_14"], show_alert=True)
+    if chat_id not in queue_store.pending:
+        await CallbackQuery.answer(_["queue_11"], show_alert=True)
+        return await CallbackQuery.message.delete()
+    if command == "Dismiss":
+        await queue_store.drop(chat_id)
+        return await CallbackQuery.edit_message_text(
+            _["queue_12"].format(CallbackQuery.from_user.mention)
+        )
+    if await is_active_chat(chat_id):
+        # Someone started a new stream meanwhile, that one wins.
+        await queue_store.drop(chat_id)
+        return await CallbackQuery.edit_message_text(_["queue_11"])
+    await CallbackQuery.answer()
+    mystic = await CallbackQuery.edit_message_text(_["queue_10"])
+    queue, position = queue_store.take(chat_id)
+    # A snapshot taken while the next track was being looked up saves it
+    # unresolved, and it hasn't played yet.
+    if queue[0].query is not None:
+        position = 0
+    if not await lazy_resolver.ready(queue):
+        queue_store.restore(chat_id, queue, position)
+        await queue_store.drop(chat_id)
+        return await CallbackQuery.edit_message_text(_["queue_11"])
+    try:
+        await resume_stream(chat_id, queue, position, mystic, _)
+    except Exception as e:
+        db.pop(chat_id, None)
+        queue_store.restore(chat_id, queue, position)
+        return await CallbackQuery.edit_message_text(
+            _["queue_13"].format(e), reply_markup=saved_queue_markup(_, chat_id)
+        )
+    try:
+        await mystic.delete()
+    except:
+        pass
+
+if config.PERSIST_QUEUES:
+    asyncio.create_task(queue_snapshotter())
+    asyncio.create_task(offer_saved_queues())
@@ -0,0 +1,34 @@
+from pyrogram import filters
+from pyrogram.types import Message
+
+from SiriVcBot import app
+from SiriVcBot.core.userbot import assistants
+from SiriVcBot.misc import SUDOERS
+from SiriVcBot.utils.database import assistantdict, get_client
+from SiriVcBot.utils.scheduler import assistant_scheduler
+
+
+@app.on_message(filters.command(["assistants", "assistantload"]) & SUDOERS)
+async def assistant_load(_, message: Message):
+    if not assistants:
+        return await message.reply_text("» ɴᴏ ᴀssɪsᴛᴀɴᴛs ᴀʀᴇ ʀᴜɴɴɪɴɢ.")
+    stats = assistant_scheduler.stats(assistants, assistantdict)
+    text = (
+        "<b><u>ᴀssɪsᴛᴀɴᴛ ʟᴏᴀᴅ :</u></b>\n\n"
+        f"<b>ᴀᴄᴛɪᴠᴇ ᴄᴀʟʟs :</b> <code>{sum(x['calls'] for x in stats)}</code>\n\n"
+    )
+    for x in stats:
+        client = await get_client(x["assistant"])
+        state = "ʜᴇᴀʟᴛʜʏ" if x["healthy"] else "ᴜɴʜᴇᴀʟᴛʜʏ"
+        text += (
+            f"<b>{x['assistant']}. {client.name}</b> [{state}]\n"
+            f"<b>ᴄᴀʟʟs :</b> <code>{x['calls']}</code> | "
+            f"<b>ʟᴏᴀᴅ :</b> <code>{x['load']}</code> | "
+            f"<b>ᴄʜᴀᴛs :</b> <code>{x['chats']}</code>\n"
+            f"<b>ᴇʀʀᴏʀs :</b> <code>{x['errors']}</code> | "
+            f"<b>ғʟᴏᴏᴅᴡᴀɪᴛs :</b> <code>{x['floodwaits']}</code>"
+        )
+        if x["flooded"]:
+            text += f" | <b>ᴡᴀɪᴛɪɴɢ :</b> <code>{x['flooded']}s</code>"
+        text += "\n\n"
+    await message.reply_text(text[:4096])
@@ -0,0 +1,210 @@
+import asyncio
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from SiriVcBot import YouTube, app
+from SiriVcBot.misc import SUDOERS
+from SiriVcBot.utils.stream.queue import ChatQueue, QueueEntry
+from SiriVcBot.utils.thumbnails import thumb_cache
+from SiriVcBot.utils.ytdl import extractors
+from thumbrender import compose, render_avatar, render_background
+
+BENCH_LINK = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+BENCH_RUNS = 3
+QUEUE_BENCH_SIZE = 20000
+THUMB_BENCH_SIZE = 10
+
+
+async def subprocess_url(link):
+    proc = await asyncio.create_subprocess_exec(
+        "yt-dlp",
+        "-g",
+        "-f",
+        YouTube.stream_opts["format"],
+        "--cookies",
+        YouTube.cookies_path,
+        link,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    if not stdout:
+        raise Exception(stderr.decode())
+    return stdout.decode().split("\n")[0]
+
+
+async def pooled_url(link):
+    return await extractors.stream_url(YouTube.stream_opts, link)
+
+
+async def timeit(func, link):
+    timings = []
+    for _ in range(BENCH_RUNS):
+        start = time.perf_counter()
+        await func(link)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+@app.on_message(filters.command(["ytbench"]) & SUDOERS)
+async def ytdl_benchmark(_, message: Message):
+    link = message.command[1] if len(message.command) > 1 else BENCH_LINK
+    mystic = await message.reply_text("» ʙᴇɴᴄʜᴍᴀʀᴋɪɴɢ ʏᴛ-ᴅʟᴘ, ᴘʟᴇᴀsᴇ ᴡᴀɪᴛ...")
+    try:
+        sub = await timeit(subprocess_url, link)
+        pool = await timeit(pooled_url, link)
+    except Exception as e:
+        return await mystic.edit_text(f"<code>{type(e).__name__}: {e}</code>"[:4000])
+    text = "<b><u>ʏᴛ-ᴅʟᴘ ᴜʀʟ ʀᴇsᴏʟᴜᴛɪᴏɴ :</u></b>\n\n"
+    for name, timings in (("sᴜʙᴘʀᴏᴄᴇss", sub), ("ᴘᴏᴏʟ", pool)):
+        text += (
+            f"<b>{name} :</b> <code>{' | '.join(f'{x:.2f}s' for x in timings)}</code>"
+            f" (ᴀᴠɢ <code>{sum(timings) / len(timings):.2f}s</code>)\n"
+        )
+    text += f"\n<b>sᴘᴇᴇᴅᴜᴘ :</b> <code>{sum(sub) / sum(pool):.1f}x</code>"
+    await mystic.edit_text(text)
+
+
+def queue_bench(size: int) -> dict:
+    fields = ("Title", "03:30", "audio", "User", -100, "downloads/x.m4a", "x", 207, 1)
+    legacy = [
+        {
+            "title": fields[0],
+            "dur": fields[1],
+            "streamtype": fields[2],
+            "by": fields[3],
+            "chat_id": fields[4],
+            "file": fields[5],
+            "vidid": fields[6],
+            "seconds": fields[7],
+            "user_id": fields[8],
+        }
+        for _ in range(size)
+    ]
+    queue = ChatQueue(QueueEntry(*fields) for _ in range(size))
+    start = time.perf_counter()
+    while len(legacy) > 1:
+        legacy.pop(0)
+    old_pop = time.perf_counter() - start
+    start = time.perf_counter()
+    while len(queue) > 1:
+        queue.pop()
+    new_pop = time.perf_counter() - start
+    return {
+        "old_entry": sys.getsizeof(legacy[0]),
+        "new_entry": sys.getsizeof(queue[0]),
+        "old_pop": old_pop,
+        "new_pop": new_pop,
+    }
+
+
+@app.on_message(filters.command(["queuebench"]) & SUDOERS)
+async def queue_benchmark(_, message: Message):
+    size = QUEUE_BENCH_SIZE
+    if len(message.command) > 1 and message.command[1].isnumeric():
+        size = max(2, int(message.command[1]))
+    mystic = await message.reply_text("» ʙᴇɴᴄʜᴍᴀʀᴋɪɴɢ ǫᴜᴇᴜᴇs, ᴘʟᴇᴀsᴇ ᴡᴀɪᴛ...")
+    result = await asyncio.get_running_loop().run_in_executor(None, queue_bench, size)
+    await mystic.edit_text(
+        f"<b><u>ǫᴜᴇᴜᴇ ᴏғ {size} ᴛʀᴀᴄᴋs :</u></b>\n\n"
+        f"<b>ᴅɪᴄᴛ ᴇɴᴛʀʏ :</b> <code>{result['old_entry']} ʙʏᴛᴇs</code>\n"
+        f"<b>sʟᴏᴛᴛᴇᴅ ᴇɴᴛʀʏ :</b> <code>{result['new_entry']} ʙʏᴛᴇs</code>\n\n"
+        f"<b>ʟɪsᴛ ᴘᴏᴘ(0) :</b> <code>{result['old_pop'] * 1000:.1f}ms</code>\n"
+        f"<b>ᴅᴇǫᴜᴇ ᴘᴏᴘ :</b> <code>{result['new_pop'] * 1000:.1f}ms</code>"
+    )
+
+
+def thumb_sources(path: str) -> tuple:
+    os.makedirs(path, exist_ok=True)
+    track = os.path.join(path, "track.jpg")
+    avatar = os.path.join(path, "avatar.jpg")
+    Image.fromarray(np.random.randint(0, 255, (720, 1280, 3), np.uint8)).save(track)
+    Image.fromarray(np.random.randint(0, 255, (640, 640, 3), np.uint8)).save(avatar)
+    return track, avatar
+
+
+def thumb_inline(path: str, track: str, avatar: str, size: int):
+    # What every play used to cost: the whole thumbnail drawn in one go.
+    for x in range(size):
+        background = render_background(
+            track, f"{path}/in_bg{x}.png", "Title", "Channel", "1M views", "3:30", "Bot"
+        )
+        overlay = render_avatar(avatar, f"{path}/in_av{x}.png")
+        compose(background, overlay, f"{path}/in_{x}.jpg")
+
+
+async def thumb_cold(path: str, track: str, avatar: str, x: int):
+    background, overlay = await asyncio.gather(
+        thumb_cache.render(
+            render_background,
+            track,
+            f"{path}/bg{x}.png",
+            "Title",
+            "Channel",
+            "1M views",
+            "3:30",
+            "Bot",
+        ),
+        thumb_cache.render(render_avatar, avatar, f"{path}/av{x}.png"),
+    )
+    await thumb_cache.render(compose, background, overlay, f"{path}/cold{x}.jpg")
+
+
+async def rate(coro, size: int) -> float:
+    start = time.perf_counter()
+    await coro
+    return size / (time.perf_counter() - start)
+
+
+@app.on_message(filters.command(["thumbbench"]) & SUDOERS)
+async def thumb_benchmark(_, message: Message):
+    size = THUMB_BENCH_SIZE
+    if len(message.command) > 1 and message.command[1].isnumeric():
+        size = max(1, int(message.command[1]))
+    mystic = await message.reply_text("» ʙᴇɴᴄʜᴍᴀʀᴋɪɴɢ ᴛʜᴜᴍʙɴᴀɪʟs, ᴘʟᴇᴀsᴇ ᴡᴀɪᴛ...")
+    path = thumb_cache.file("bench")
+    loop = asyncio.get_running_loop()
+    try:
+        track, avatar = await loop.run_in_executor(None, thumb_sources, path)
+        inline = await rate(
+            loop.run_in_executor(None, thumb_inline, path, track, avatar, size), size
+        )
+        cold = await rate(
+            asyncio.gather(*[thumb_cold(path, track, avatar, x) for x in range(size)]),
+            size,
+        )
+        # Another user playing a track that is already drawn only needs the
+        # avatar pasted on.
+        warm = await rate(
+            asyncio.gather(
+                *[
+                    thumb_cache.render(
+                        compose,
+                        f"{path}/bg0.png",
+                        f"{path}/av{x}.png",
+                        f"{path}/warm{x}.jpg",
+                    )
+                    for x in range(size)
+                ]
+            ),
+            size,
+        )
+    except Exception as e:
+        return await mystic.edit_text(f"<code>{type(e).__name__}: {e}</code>"[:4000])
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+    await mystic.edit_text(
+        f"<b><u>{size} ᴛʜᴜᴍʙɴᴀɪʟs :</u></b>\n\n"
+        f"<b>ɪɴʟɪɴᴇ :</b> <code>{inline:.1f} ʀᴇɴᴅᴇʀs/s</code>\n"
+        f"<b>ᴘᴏᴏʟ, ɴᴇᴡ ᴛʀᴀᴄᴋ :</b> <code>{cold:.1f} ʀᴇɴᴅᴇʀs/s</code>\n"
+        f"<b>ᴘᴏᴏʟ, ᴄᴀᴄʜᴇᴅ ᴛʀᴀᴄᴋ :</b> <code>{warm:.1f} ʀᴇɴᴅᴇʀs/s</code>\n\n"
+        f"<b>ᴘʀᴏᴄᴇssᴇs :</b> <code>{thumb_cache.workers}</code>"
+    )
@@ -0,0 +1,102 @@
+from pyrogram import filters
+from pyrogram.types import Message
+
+from SiriVcBot import YouTube, app
+from SiriVcBot.misc import SUDOERS
+from SiriVcBot.utils.admincache import admin_cache
+from SiriVcBot.utils.formatters import convert_bytes
+from SiriVcBot.utils.probe import media_probe
+from SiriVcBot.utils.stream.cache import media_cache
+from SiriVcBot.utils.stream.latency import first_audio_stats
+from SiriVcBot.utils.stream.lazy import lazy_resolver
+from SiriVcBot.utils.stream.persist import queue_store
+from SiriVcBot.utils.stream.prefetch import prefetcher
+from SiriVcBot.utils.stream.speed import speed_engine
+from SiriVcBot.utils.thumbnails import thumb_cache
+from SiriVcBot.utils.ytdl import extractors
+
+
+@app.on_message(filters.command(["cache", "cachestats"]) & SUDOERS)
+async def cache_stats(_, message: Message):
+    media = media_cache.stats()
+    flights = YouTube.flights.stats()
+    pool = extractors.stats()
+    meta = YouTube.meta.stats()
+    probe = media_probe.stats()
+    first = first_audio_stats()
+    ahead = prefetcher.stats()
+    lazy = lazy_resolver.stats()
+    tempo = speed_engine.stats()
+    admins = admin_cache.stats()
+    saved = queue_store.stats()
+    thumbs = thumb_cache.stats()
+    text = (
+        "<b><u>ᴍᴇᴅɪᴀ ᴄᴀᴄʜᴇ :</u></b>\n\n"
+        f"<b>ғɪʟᴇs :</b> <code>{media['files']}</code>\n"
+        f"<b>ᴘɪɴɴᴇᴅ :</b> <code>{media['pinned']}</code>\n"
+        f"<b>sɪᴢᴇ :</b> <code>{convert_bytes(media['size']) or '0 B'} / {convert_bytes(media['limit'])}</code>\n"
+        f"<b>ʜɪᴛs :</b> <code>{media['hits']}</code>\n"
+        f"<b>ᴍɪssᴇs :</b> <code>{media['misses']}</code>\n"
+        f"<b>ʜɪᴛ ʀᴀᴛɪᴏ :</b> <code>{media['ratio']}%</code>\n"
+        f"<b>ᴇᴠɪᴄᴛɪᴏɴs :</b> <code>{media['evictions']}</code>\n\n"
+        "<b><u>ᴅᴏᴡɴʟᴏᴀᴅs :</u></b>\n\n"
+        f"<b>ʀᴜɴɴɪɴɢ :</b> <code>{flights['running']}</code>\n"
+        f"<b>sᴛᴀʀᴛᴇᴅ :</b> <code>{flights['started']}</code>\n"
+        f"<b>ᴄᴏᴀʟᴇsᴄᴇᴅ :</b> <code>{flights['coalesced']}</code>\n\n"
+        "<b><u>ᴘʀᴇғᴇᴛᴄʜ :</u></b>\n\n"
+        f"<b>ᴅᴇᴘᴛʜ :</b> <code>{ahead['depth']}</code>\n"
+        f"<b>ʀᴜɴɴɪɴɢ :</b> <code>{ahead['running']}</code>\n"
+        f"<b>ғᴇᴛᴄʜᴇᴅ :</b> <code>{ahead['fetched']}</code>\n"
+        f"<b>ғᴀɪʟᴜʀᴇs :</b> <code>{ahead['failures']}</code>\n"
+        f"<b>ᴅɪsᴋ :</b> <code>{convert_bytes(ahead['used']) or '0 B'} / {convert_bytes(ahead['limit'])}</code>\n"
+        f"<b>ʟᴏᴏᴋᴜᴘs :</b> <code>{lazy['running']} ʀᴜɴɴɪɴɢ, {lazy['resolved']} ʀᴇsᴏʟᴠᴇᴅ, {lazy['dropped']} ᴅʀᴏᴘᴘᴇᴅ</code>\n\n"
+        "<b><u>sᴘᴇᴇᴅ :</u></b>\n\n"
+        f"<b>ʟɪᴠᴇ :</b> <code>{tempo['live']}</code>\n"
+        f"<b>ᴛʀᴀɴsᴄᴏᴅᴇs :</b> <code>{tempo['running']} / {tempo['workers']} ʀᴜɴɴɪɴɢ, {tempo['transcodes']} ᴅᴏɴᴇ</code>\n"
+        f"<b>ʀᴇᴜsᴇᴅ :</b> <code>{tempo['reused']}</code>\n"
+        f"<b>ғᴀɪʟᴜʀᴇs :</b> <code>{tempo['failures']}</code>\n\n"
+        "<b><u>ʏᴛ-ᴅʟᴘ ᴘᴏᴏʟ :</u></b>\n\n"
+        f"<b>ᴡᴏʀᴋᴇʀs :</b> <code>{pool['running']} / {pool['workers']}</code>\n"
+        f"<b>ǫᴜᴇᴜᴇᴅ :</b> <code>{pool['waiting']}</code>\n"
+        f"<b>ᴊᴏʙs :</b> <code>{pool['jobs']}</code>\n"
+        f"<b>ᴅᴏᴡɴʟᴏᴀᴅɪɴɢ :</b> <code>{pool['downloading']} / {pool['download_workers']} ({pool['downloads']} ᴛᴏᴛᴀʟ)</code>\n"
+        f"<b>ɪɴsᴛᴀɴᴄᴇs :</b> <code>{pool['instances']}</code>\n"
+        f"<b>ᴛɪᴍᴇᴏᴜᴛs :</b> <code>{pool['timeouts']}</code>\n"
+        f"<b>ғᴀɪʟᴜʀᴇs :</b> <code>{pool['failures']}</code>\n\n"
+        "<b><u>sᴇᴀʀᴄʜ ᴄᴀᴄʜᴇ :</u></b>\n\n"
+        f"<b>ᴇɴᴛʀɪᴇs :</b> <code>{meta['size']}</code>\n"
+        f"<b>ʜɪᴛs :</b> <code>{meta['hits']}</code>\n"
+        f"<b>ᴍɪssᴇs :</b> <code>{meta['misses']}</code>\n"
+        f"<b>ʜɪᴛ ʀᴀᴛɪᴏ :</b> <code>{meta['ratio']}%</code>\n\n"
+        "<b><u>ᴛʜᴜᴍʙɴᴀɪʟs :</u></b>\n\n"
+        f"<b>ғɪʟᴇs :</b> <code>{thumbs['files']}</code>\n"
+        f"<b>sɪᴢᴇ :</b> <code>{convert_bytes(thumbs['size']) or '0 B'} / {convert_bytes(thumbs['limit'])}</code>\n"
+        f"<b>ʜɪᴛ ʀᴀᴛɪᴏ :</b> <code>{thumbs['ratio']}% ({thumbs['hits']} / {thumbs['hits'] + thumbs['misses']})</code>\n"
+        f"<b>ʀᴇɴᴅᴇʀs :</b> <code>{thumbs['renders']} ᴏɴ {thumbs['workers']} ᴘʀᴏᴄᴇssᴇs</code>\n"
+        f"<b>ғᴀɪʟᴜʀᴇs :</b> <code>{thumbs['failures']}</code>\n"
+        f"<b>ᴇᴠɪᴄᴛɪᴏɴs :</b> <code>{thumbs['evictions']}</code>\n\n"
+        "<b><u>ᴀᴅᴍɪɴ ᴄᴀᴄʜᴇ :</u></b>\n\n"
+        f"<b>ᴄʜᴀᴛs :</b> <code>{admins['chats']}</code>\n"
+        f"<b>ʀᴇғʀᴇsʜᴇs :</b> <code>{admins['refreshes']}</code>\n"
+        f"<b>ʀᴜɴɴɪɴɢ :</b> <code>{admins['running']}</code>\n"
+        f"<b>ɪɴᴠᴀʟɪᴅᴀᴛɪᴏɴs :</b> <code>{admins['invalidations']}</code>\n\n"
+        "<b><u>sᴀᴠᴇᴅ ǫᴜᴇᴜᴇs :</u></b>\n\n"
+        f"<b>ᴇɴᴀʙʟᴇᴅ :</b> <code>{saved['enabled']}</code>\n"
+        f"<b>ᴄʜᴀᴛs :</b> <code>{saved['saved']}</code>\n"
+        f"<b>ᴀᴡᴀɪᴛɪɴɢ ʀᴇsᴜᴍᴇ :</b> <code>{saved['pending']}</code>\n"
+        f"<b>ᴡʀɪᴛᴇs :</b> <code>{saved['writes']}</code>\n"
+        f"<b>ᴅᴇғᴇʀʀᴇᴅ :</b> <code>{saved['deferred']}</code>\n"
+        f"<b>ғᴀɪʟᴜʀᴇs :</b> <code>{saved['failures']}</code>\n\n"
+        "<b><u>ғғᴘʀᴏʙᴇ :</u></b>\n\n"
+        f"<b>ᴘʀᴏʙᴇs :</b> <code>{probe['probes']}</code>\n"
+        f"<b>ᴄᴀᴄʜᴇᴅ :</b> <code>{probe['cached']}</code>\n"
+        f"<b>ʜɪᴛs :</b> <code>{probe['hits']}</code>\n"
+        f"<b>ᴛɪᴍᴇᴏᴜᴛs :</b> <code>{probe['timeouts']}</code>\n"
+        f"<b>ғᴀɪʟᴜʀᴇs :</b> <code>{probe['failures']}</code>\n\n"
+        "<b><u>ᴛɪᴍᴇ ᴛᴏ ғɪʀsᴛ ᴀᴜᴅɪᴏ :</u></b>\n\n"
+        f"<b>ᴘʟᴀʏs :</b> <code>{first['plays']}</code>\n"
+        f"<b>ᴀᴠᴇʀᴀɢᴇ :</b> <code>{first['avg']}s</code>\n"
+        f"<b>ᴍᴇᴅɪᴀɴ :</b> <code>{first['p50']}s</code>\n"
+        f"<b>ᴘ95 :</b> <code>{first['p95']}s</code>\n"
+    )
+    await message.reply_text(text)
@@ -0,0 +1,23 @@
+from pyrogram import filters
+from pyrogram.types import Message
+
+from SiriVcBot import app
+from SiriVcBot.misc import SUDOERS
+from SiriVcBot.utils.database import explain_queries
+
+
+@app.on_message(filters.command(["dbexplain", "explain"]) & SUDOERS)
+async def db_explain(_, message: Message):
+    mystic = await message.reply_text("» ᴇxᴘʟᴀɪɴɪɴɢ ᴅᴀᴛᴀʙᴀsᴇ ǫᴜᴇʀɪᴇs...")
+    results = await explain_queries()
+    scans = [
+        x for x in results if any(y == "COLLSCAN" or "ERROR" in y for y in x[2])
+    ]
+    text = (
+        "<b><u>ᴅᴀᴛᴀʙᴀsᴇ ǫᴜᴇʀʏ ᴘʟᴀɴs :</u></b>\n\n"
+        f"<b>ǫᴜᴇʀɪᴇs :</b> <code>{len(results)}</code>\n"
+        f"<b>ᴄᴏʟʟᴇᴄᴛɪᴏɴ sᴄᴀɴs :</b> <code>{len(scans)}</code>\n\n"
+    )
+    for name, query, stages in scans or results:
+        text += f"<b>{name}</b> <code>{query}</code>\n└ <code>{' > '.join(stages)}</code>\n"
+    await mystic.edit_text(text[:4096])
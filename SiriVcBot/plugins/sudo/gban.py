@@ -1,23 +1,210 @@
 import asyncio
+import time
 
 from pyrogram import filters
-from pyrogram.errors import FloodWait
+from pyrogram.errors import FloodWait, InternalServerError
 from pyrogram.types import Message
 
+import config
 from SiriVcBot import app
+from SiriVcBot.logging import LOGGER
 from SiriVcBot.misc import SUDOERS
 from SiriVcBot.utils import get_readable_time
 from SiriVcBot.utils.database import (
     add_banned_user,
+    delete_gban_job,
     get_banned_count,
-    get_banned_users,
-    get_served_chats,
+    get_gban_failures,
+    get_gban_jobs,
+    get_lang,
+    get_served_chats_count,
     is_banned_user,
+    iter_banned_users,
+    iter_served_chats,
     remove_banned_user,
+    save_gban_job,
 )
 from SiriVcBot.utils.decorators.language import language
 from SiriVcBot.utils.extraction import extract_user
+from SiriVcBot.utils.pastebin import VasudevKrishnaBin
+from SiriVcBot.utils.ratelimit import app_limiter
 from config import BANNED_USERS
+from strings import get_string
+
+BAN_ATTEMPTS = 5
+PAGE_SIZE = 100
+PROGRESS_INTERVAL = 10
+
+running = {}
+
+
+class GlobalBan:
+    def __init__(self, job: dict):
+        self.job = job
+        self.slots = asyncio.Semaphore(config.GBAN_WORKERS)
+        self.started = time.monotonic()
+        self.processed = 0
+        self.failures = []
+
+    async def _apply(self, chat_id):
+        job = self.job
+        if job["action"] == "ban":
+            action = app.ban_chat_member
+        else:
+            action = app.unban_chat_member
+        error = None
+        delay = 1
+        for _ in range(BAN_ATTEMPTS):
+            await app_limiter.acquire()
+            try:
+                await action(chat_id, job["user_id"])
+                return None
+            except FloodWait as fw:
+                error = "FLOOD_WAIT"
+                if not app_limiter.pause(int(fw.value)):
+                    return error
+            except (InternalServerError, OSError, asyncio.TimeoutError) as e:
+                # Telegram side and network errors are usually transient, so
+                # back off and try the same chat again.
+                error = getattr(e, "ID", None) or type(e).__name__
+                await asyncio.sleep(delay)
+                delay *= 2
+            except Exception as e:
+                return getattr(e, "ID", None) or type(e).__name__
+        return error
+
+    async def _chat(self, chat_id):
+        async with self.slots:
+            error = await self._apply(chat_id)
+        self.processed += 1
+        if error:
+            self.job["failed"] += 1
+            self.failures.append([chat_id, error])
+        else:
+            self.job["done"] += 1
+
+    async def _page(self, page):
+        await asyncio.gather(*[self._chat(x) for x in page])
+        self.job["cursor"] = page[-1]
+        await save_gban_job(self.job, self.failures)
+        self.failures = []
+
+    async def _report(self):
+        while not await asyncio.sleep(PROGRESS_INTERVAL):
+            try:
+                await app.edit_message_text(
+                    self.job["status_chat"], self.job["status_id"], self.progress()
+                )
+            except:
+                pass
+
+    def progress(self) -> str:
+        job = self.job
+        took = time.monotonic() - self.started
+        verb = "ɢʙᴀɴɴɪɴɢ" if job["action"] == "ban" else "ᴜɴɢʙᴀɴɴɪɴɢ"
+        text = (
+            f"» {verb} {job['user']}...\n\n"
+            f"<b>ᴄʜᴀᴛs :</b> <code>{job['done']} / {job['total']}</code>\n"
+            f"<b>ғᴀɪʟᴇᴅ :</b> <code>{job['failed']}</code>\n"
+            f"<b>sᴘᴇᴇᴅ :</b> <code>{self.processed / took if took else 0:.2f} ᴄʜᴀᴛs/s</code>\n"
+            f"<b>ᴇʟᴀᴘsᴇᴅ :</b> <code>{get_readable_time(int(took)) or '0s'}</code>\n"
+        )
+        wait = app_limiter.paused()
+        if wait:
+            text += f"\nғʟᴏᴏᴅᴡᴀɪᴛ, ʀᴇsᴜᴍɪɴɢ ɪɴ <code>{int(wait)}s</code>"
+        return text
+
+    async def run(self):
+        job = self.job
+        reporter = asyncio.create_task(self._report())
+        try:
+            page = []
+            async for chat_id in iter_served_chats(after=job["cursor"]):
+                page.append(chat_id)
+                if len(page) >= PAGE_SIZE:
+                    await self._page(page)
+                    page = []
+            if page:
+                await self._page(page)
+        finally:
+            reporter.cancel()
+        await self._finish()
+
+    async def _finish(self):
+        job = self.job
+        _ = get_string(job["lang"])
+        if job["action"] == "ban":
+            text = _["gban_6"].format(
+                app.mention,
+                job["origin"],
+                job["origin_id"],
+                job["user"],
+                job["user_id"],
+                job["by"],
+                job["done"],
+            )
+        else:
+            text = _["gban_9"].format(job["user"], job["done"])
+        failures = await get_gban_failures(job["user_id"])
+        if failures:
+            msg = "\n".join(f"{chat_id} : {error}" for chat_id, error in failures)
+            link = None
+            try:
+                link = await VasudevKrishnaBin(msg)
+            except:
+                pass
+            text += f"\n\n<b>ғᴀɪʟᴇᴅ ɪɴ :</b> <code>{len(failures)}</code> ᴄʜᴀᴛs"
+            if link:
+                text += f" [<a href={link}>ʟɪsᴛ</a>]"
+        await app.send_message(job["status_chat"], text, disable_web_page_preview=True)
+        await delete_gban_job(job["user_id"])
+        try:
+            await app.delete_messages(job["status_chat"], job["status_id"])
+        except:
+            pass
+
+
+async def start_gban(job: dict):
+    try:
+        await GlobalBan(job).run()
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        LOGGER(__name__).error(
+            f"Global {job['action']} of {job['user_id']} stopped, it will resume on restart: {e}"
+        )
+    finally:
+        if running.get(job["user_id"]) is asyncio.current_task():
+            running.pop(job["user_id"])
+
+
+async def queue_gban(message: Message, user, action: str, status: Message):
+    task = running.pop(user.id, None)
+    if task:
+        task.cancel()
+        await asyncio.wait([task])
+    job = {
+        "user_id": user.id,
+        "action": action,
+        "user": user.mention,
+        "by": message.from_user.mention,
+        "origin": message.chat.title,
+        "origin_id": message.chat.id,
+        "lang": await get_lang(message.chat.id),
+        "status_chat": status.chat.id,
+        "status_id": status.id,
+        "cursor": None,
+        "total": await get_served_chats_count(),
+        "done": 0,
+        "failed": 0,
+    }
+    await delete_gban_job(user.id)
+    await save_gban_job(job)
+    running[user.id] = asyncio.create_task(start_gban(job))
+
+
+def expected_time(total: int) -> str:
+    return get_readable_time(max(1, int(total / config.BOT_RATE_LIMIT)))
 
 
 @app.on_message(filters.command(["gban", "globalban"]) & SUDOERS)
@@ -38,34 +225,10 @@ async def global_ban(client, message: Message, _):
         return await message.reply_text(_["gban_4"].format(user.mention))
     if user.id not in BANNED_USERS:
         BANNED_USERS.add(user.id)
-    served_chats = []
-    chats = await get_served_chats()
-    for chat in chats:
-        served_chats.append(int(chat["chat_id"]))
-    time_expected = get_readable_time(len(served_chats))
-    mystic = await message.reply_text(_["gban_5"].format(user.mention, time_expected))
-    number_of_chats = 0
-    for chat_id in served_chats:
-        try:
-            await app.ban_chat_member(chat_id, user.id)
-            number_of_chats += 1
-        except FloodWait as fw:
-            await asyncio.sleep(int(fw.value))
-        except:
-            continue
     await add_banned_user(user.id)
-    await message.reply_text(
-        _["gban_6"].format(
-            app.mention,
-            message.chat.title,
-            message.chat.id,
-            user.mention,
-            user.id,
-            message.from_user.mention,
-            number_of_chats,
-        )
-    )
-    await mystic.delete()
+    time_expected = expected_time(await get_served_chats_count())
+    mystic = await message.reply_text(_["gban_5"].format(user.mention, time_expected))
+    await queue_gban(message, user, "ban", mystic)
 
 
 @app.on_message(filters.command(["ungban"]) & SUDOERS)
@@ -80,24 +243,10 @@ async def global_un(client, message: Message, _):
         return await message.reply_text(_["gban_7"].format(user.mention))
     if user.id in BANNED_USERS:
         BANNED_USERS.remove(user.id)
-    served_chats = []
-    chats = await get_served_chats()
-    for chat in chats:
-        served_chats.append(int(chat["chat_id"]))
-    time_expected = get_readable_time(len(served_chats))
-    mystic = await message.reply_text(_["gban_8"].format(user.mention, time_expected))
-    number_of_chats = 0
-    for chat_id in served_chats:
-        try:
-            await app.unban_chat_member(chat_id, user.id)
-            number_of_chats += 1
-        except FloodWait as fw:
-            await asyncio.sleep(int(fw.value))
-        except:
-            continue
     await remove_banned_user(user.id)
-    await message.reply_text(_["gban_9"].format(user.mention, number_of_chats))
-    await mystic.delete()
+    time_expected = expected_time(await get_served_chats_count())
+    mystic = await message.reply_text(_["gban_8"].format(user.mention, time_expected))
+    await queue_gban(message, user, "unban", mystic)
 
 
 @app.on_message(filters.command(["gbannedusers", "gbanlist"]) & SUDOERS)
@@ -109,8 +258,7 @@ async def gbanned_list(client, message: Message, _):
     mystic = await message.reply_text(_["gban_11"])
     msg = _["gban_12"]
     count = 0
-    users = await get_banned_users()
-    for user_id in users:
+    async for user_id in iter_banned_users():
         count += 1
         try:
             user = await app.get_users(user_id)
@@ -123,3 +271,14 @@ async def gbanned_list(client, message: Message, _):
         return await mystic.edit_text(_["gban_10"])
     else:
         return await mystic.edit_text(msg)
+
+
+async def resume_gbans():
+    for job in await get_gban_jobs():
+        LOGGER(__name__).info(
+            f"Resuming global {job['action']} of {job['user_id']} after {job['cursor']}."
+        )
+        running[job["user_id"]] = asyncio.create_task(start_gban(job))
+
+
+asyncio.create_task(resume_gbans())
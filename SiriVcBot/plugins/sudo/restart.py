@@ -13,12 +13,14 @@ import config
 from SiriVcBot import app
 from SiriVcBot.misc import HAPP, SUDOERS, XCB
 from SiriVcBot.utils.database import (
+    flush_writes,
     get_active_chats,
     remove_active_chat,
     remove_active_video_chat,
 )
 from SiriVcBot.utils.decorators.language import language
 from SiriVcBot.utils.pastebin import VasudevKrishnaBin
+from SiriVcBot.utils.stream.persist import queue_store
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -106,6 +108,8 @@ async def update_(client, message, _):
             )
     else:
         os.system("pip3 install -r requirements.txt")
+        await queue_store.flush()
+        await flush_writes()
         os.system(f"kill -9 {os.getpid()} && bash start")
         exit()
 
@@ -126,7 +130,6 @@ async def restart_(_, message):
             pass
 
     try:
-        shutil.rmtree("downloads")
         shutil.rmtree("raw_files")
         shutil.rmtree("cache")
     except:
@@ -134,4 +137,6 @@ async def restart_(_, message):
     await response.edit_text(
         "» ʀᴇsᴛᴀʀᴛ ᴘʀᴏᴄᴇss sᴛᴀʀᴛᴇᴅ, ᴘʟᴇᴀsᴇ ᴡᴀɪᴛ ғᴏʀ ғᴇᴡ sᴇᴄᴏɴᴅs ᴜɴᴛɪʟ ᴛʜᴇ ʙᴏᴛ sᴛᴀʀᴛs..."
     )
+    await queue_store.flush()
+    await flush_writes()
     os.system(f"kill -9 {os.getpid()} && bash start")
@@ -12,6 +12,7 @@ from SiriVcBot.utils import VasudevKrishnaBin, get_channeplayCB, seconds_to_min
 from SiriVcBot.utils.database import get_cmode, is_active_chat, is_music_playing
 from SiriVcBot.utils.decorators.language import language, languageCB
 from SiriVcBot.utils.inline import queue_back_markup, queue_markup
+from SiriVcBot.utils.stream.clock import get_played
 from config import BANNED_USERS
 
 basic = {}
@@ -25,10 +26,10 @@ def get_image(videoid):
 
 
 def get_duration(playing):
-    file_path = playing[0]["file"]
+    file_path = playing[0].file
     if "index_" in file_path or "live_" in file_path:
         return "Unknown"
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing[0].seconds)
     if duration_seconds == 0:
         return "Unknown"
     else:
@@ -59,11 +60,11 @@ async def get_queue(client, message: Message, _):
     got = db.get(chat_id)
     if not got:
         return await message.reply_text(_["queue_2"])
-    file = got[0]["file"]
-    videoid = got[0]["vidid"]
-    user = got[0]["by"]
-    title = (got[0]["title"]).title()
-    typo = (got[0]["streamtype"]).title()
+    file = got[0].file
+    videoid = got[0].vidid
+    user = got[0].by
+    title = got[0].title.title()
+    typo = got[0].streamtype.title()
     DUR = get_duration(got)
     if "live_" in file:
         IMAGE = get_image(videoid)
@@ -92,15 +93,15 @@ async def get_queue(client, message: Message, _):
             DUR,
             "c" if cplay else "g",
             videoid,
-            seconds_to_min(got[0]["played"]),
-            got[0]["dur"],
+            seconds_to_min(get_played(chat_id)),
+            got[0].dur,
         )
     )
     basic[videoid] = True
     mystic = await message.reply_photo(IMAGE, caption=cap, reply_markup=upl)
     if DUR != "Unknown":
         try:
-            while db[chat_id][0]["vidid"] == videoid:
+            while db[chat_id][0].vidid == videoid:
                 await asyncio.sleep(5)
                 if await is_active_chat(chat_id):
                     if basic[videoid]:
@@ -111,8 +112,8 @@ async def get_queue(client, message: Message, _):
                                     DUR,
                                     "c" if cplay else "g",
                                     videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
+                                    seconds_to_min(get_played(chat_id)),
+                                    db[chat_id][0].dur,
                                 )
                                 await mystic.edit_reply_markup(reply_markup=buttons)
                             except FloodWait:
@@ -165,11 +166,11 @@ async def queued_tracks(client, CallbackQuery: CallbackQuery, _):
     for x in got:
         j += 1
         if j == 1:
-            msg += f'Streaming :\n\n✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
+            msg += f'Streaming :\n\n✨ Title : {x.title}\nDuration : {x.dur}\nBy : {x.by}\n\n'
         elif j == 2:
-            msg += f'Queued :\n\n✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
+            msg += f'Queued :\n\n✨ Title : {x.title}\nDuration : {x.dur}\nBy : {x.by}\n\n'
         else:
-            msg += f'✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
+            msg += f'✨ Title : {x.title}\nDuration : {x.dur}\nBy : {x.by}\n\n'
     if "Queued" in msg:
         if len(msg) < 700:
             await asyncio.sleep(1)
@@ -199,11 +200,11 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
     if not got:
         return await CallbackQuery.answer(_["queue_2"], show_alert=True)
     await CallbackQuery.answer(_["set_cb_5"], show_alert=True)
-    file = got[0]["file"]
-    videoid = got[0]["vidid"]
-    user = got[0]["by"]
-    title = (got[0]["title"]).title()
-    typo = (got[0]["streamtype"]).title()
+    file = got[0].file
+    videoid = got[0].vidid
+    user = got[0].by
+    title = got[0].title.title()
+    typo = got[0].streamtype.title()
     DUR = get_duration(got)
     if "live_" in file:
         IMAGE = get_image(videoid)
@@ -232,8 +233,8 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
             DUR,
             cplay,
             videoid,
-            seconds_to_min(got[0]["played"]),
-            got[0]["dur"],
+            seconds_to_min(get_played(chat_id)),
+            got[0].dur,
         )
     )
     basic[videoid] = True
@@ -242,7 +243,7 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
     mystic = await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
     if DUR != "Unknown":
         try:
-            while db[chat_id][0]["vidid"] == videoid:
+            while db[chat_id][0].vidid == videoid:
                 await asyncio.sleep(5)
                 if await is_active_chat(chat_id):
                     if basic[videoid]:
@@ -253,8 +254,8 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
                                     DUR,
                                     cplay,
                                     videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
+                                    seconds_to_min(get_played(chat_id)),
+                                    db[chat_id][0].dur,
                                 )
                                 await mystic.edit_reply_markup(reply_markup=buttons)
                             except FloodWait:
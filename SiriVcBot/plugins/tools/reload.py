@@ -2,16 +2,17 @@ import asyncio
 import time
 import os
 from pyrogram import Client, filters
-from pyrogram.enums import ChatMembersFilter
 from pyrogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
 
 from SiriVcBot import app
 from SiriVcBot.core.call import VasudevKrishna
 from SiriVcBot.misc import db
-from SiriVcBot.utils.database import get_assistant, get_authuser_names, get_cmode
+from SiriVcBot.utils.admincache import admin_cache
+from SiriVcBot.utils.database import get_assistant, get_cmode
 from SiriVcBot.utils.decorators import ActualAdminCB, AdminActual, language
-from SiriVcBot.utils.formatters import alpha_to_int, get_readable_time
-from config import BANNED_USERS, adminlist, lyrical
+from SiriVcBot.utils.formatters import get_readable_time
+from SiriVcBot.utils.stream.queue import ChatQueue
+from config import BANNED_USERS, lyrical
 
 # Fetch environment variables
 BOT_TOKEN = os.getenv("BOT_TOKEN")
@@ -33,16 +34,7 @@ async def reload_admin_cache(client, message: Message, _):
             if saved > time.time():
                 left = get_readable_time((int(saved) - int(time.time())))
                 return await message.reply_text(_["reload_1"].format(left))
-        adminlist[message.chat.id] = []
-        async for user in app.get_chat_members(
-            message.chat.id, filter=ChatMembersFilter.ADMINISTRATORS
-        ):
-            if user.privileges.can_manage_video_chats:
-                adminlist[message.chat.id].append(user.user.id)
-        authusers = await get_authuser_names(message.chat.id)
-        for user in authusers:
-            user_id = await alpha_to_int(user)
-            adminlist[message.chat.id].append(user_id)
+        await admin_cache.refresh(message.chat.id)
         now = int(time.time()) + 180
         rel[message.chat.id] = now
         await message.reply_text(_["reload_2"])
@@ -55,7 +47,7 @@ async def restartbot(client, message: Message, _):
     mystic = await message.reply_text(_["reload_4"].format(app.mention))
     await asyncio.sleep(1)
     try:
-        db[message.chat.id] = []
+        db[message.chat.id] = ChatQueue()
         await VasudevKrishna.stop_stream_force(message.chat.id)
     except:
         pass
@@ -82,7 +74,7 @@ async def restartbot(client, message: Message, _):
         except:
             pass
         try:
-            db[chat_id] = []
+            db[chat_id] = ChatQueue()
             await VasudevKrishna.stop_stream_force(chat_id)
         except:
             pass
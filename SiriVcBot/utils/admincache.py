@@ -0,0 +1,77 @@
+import time
+
+from pyrogram.enums import ChatMembersFilter
+
+import config
+from SiriVcBot import app
+from SiriVcBot.logging import LOGGER
+from SiriVcBot.utils.database import get_authuser_names
+from SiriVcBot.utils.formatters import alpha_to_int
+from SiriVcBot.utils.singleflight import SingleFlight
+from config import adminlist
+
+
+class AdminCache:
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.expires = {}
+        self.flights = SingleFlight()
+        self.refreshes = 0
+        self.invalidations = 0
+
+    async def admins(self, chat_id: int) -> set:
+        admins = adminlist.get(chat_id)
+        if admins is None:
+            try:
+                return await self.refresh(chat_id)
+            except Exception:
+                return set()
+        if self.expires.get(chat_id, 0) < time.monotonic():
+            # Serve the current set while a single refresh runs behind it.
+            self.flights.start(chat_id, self._fetch, chat_id)
+        return admins
+
+    async def refresh(self, chat_id: int) -> set:
+        return await self.flights.do(chat_id, self._fetch, chat_id)
+
+    async def _fetch(self, chat_id: int) -> set:
+        self.refreshes += 1
+        admins = set()
+        try:
+            async for user in app.get_chat_members(
+                chat_id, filter=ChatMembersFilter.ADMINISTRATORS
+            ):
+                if user.privileges and user.privileges.can_manage_video_chats:
+                    admins.add(user.user.id)
+            for user in await get_authuser_names(chat_id):
+                admins.add(await alpha_to_int(user))
+        except Exception as e:
+            LOGGER(__name__).warning(f"Admin refresh of {chat_id} failed: {e}")
+            raise
+        adminlist[chat_id] = admins
+        self.expires[chat_id] = time.monotonic() + self.ttl
+        return admins
+
+    def invalidate(self, chat_id: int):
+        self.invalidations += 1
+        adminlist.pop(chat_id, None)
+        self.expires.pop(chat_id, None)
+
+    def add(self, chat_id: int, user_id: int):
+        if chat_id in adminlist:
+            adminlist[chat_id].add(user_id)
+
+    def discard(self, chat_id: int, user_id: int):
+        if chat_id in adminlist:
+            adminlist[chat_id].discard(user_id)
+
+    def stats(self) -> dict:
+        return {
+            "chats": len(adminlist),
+            "refreshes": self.refreshes,
+            "running": len(self.flights.calls),
+            "invalidations": self.invalidations,
+        }
+
+
+admin_cache = AdminCache(config.ADMIN_CACHE_TTL)
@@ -1,8 +1,18 @@
-import random
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from typing import Dict, List, Union
 
+from pymongo import DeleteOne, UpdateOne
+
 from SiriVcBot import userbot
 from SiriVcBot.core.mongo import mongodb
+from SiriVcBot.logging import LOGGER
+from SiriVcBot.utils.memberset import MemberSet
+from SiriVcBot.utils.scheduler import assistant_scheduler
+from SiriVcBot.utils.singleflight import SingleFlight
+from config import SETTINGS_CACHE_SIZE, YT_META_CACHE_TTL
 
 authdb = mongodb.adminauth
 authuserdb = mongodb.authuser
@@ -10,33 +20,239 @@ autoenddb = mongodb.autoend
 assdb = mongodb.assistants
 blacklist_chatdb = mongodb.blacklistChat
 blockeddb = mongodb.blockedusers
+broadcastdb = mongodb.broadcast
 chatsdb = mongodb.chats
 channeldb = mongodb.cplaymode
 countdb = mongodb.upcount
+gbanjobdb = mongodb.gbanjobs
 gbansdb = mongodb.gban
 langdb = mongodb.language
 onoffdb = mongodb.onoffper
 playmodedb = mongodb.playmode
 playtypedb = mongodb.playtypedb
+queuedb = mongodb.queues
 skipdb = mongodb.skipmode
 sudoersdb = mongodb.sudoers
 usersdb = mongodb.tgusersdb
+ytmetadb = mongodb.ytmeta
 
 # Shifting to memory [mongo sucks often]
 active = []
 activevideo = []
 assistantdict = {}
 autoend = {}
-count = {}
-channelconnect = {}
-langm = {}
 loop = {}
 maintenance = []
-nonadmin = {}
 pause = {}
-playmode = {}
-playtype = {}
-skipmode = {}
+
+# Per-chat settings, defaults are kept too so unset chats never query mongo
+# again, and changes reach mongo in batches every few seconds. At most
+# SETTINGS_CACHE_SIZE chats stay in memory, the least recently used ones are
+# read from mongo again when they come back.
+SETTINGS_FLUSH_INTERVAL = 5
+
+settings = OrderedDict()
+settings_flights = SingleFlight()
+dirty = {}
+flusher = []
+
+# field: (collection, key) for values, (collection, None, value) for flags
+# stored as the presence of a chat document
+SETTINGS_FIELDS = {
+    "lang": (langdb, "lang"),
+    "playmode": (playmodedb, "mode"),
+    "playtype": (playtypedb, "mode"),
+    "cmode": (channeldb, "mode"),
+    "upvotes": (countdb, "mode"),
+    "nonadmin": (authdb, None, True),
+    "skipmode": (skipdb, None, False),
+}
+
+
+# Served chats and users, inserts are batched with the settings writes
+served_chats = MemberSet()
+served_users = MemberSet()
+pending_served = {}
+
+
+class ChatSettings:
+    def __init__(self):
+        self.lang = "en"
+        self.playmode = "Direct"
+        self.playtype = "Everyone"
+        self.cmode = None
+        self.upvotes = 5
+        self.nonadmin = False
+        self.skipmode = True
+
+
+async def get_settings(chat_id: int) -> ChatSettings:
+    chat = settings.get(chat_id)
+    if chat is None:
+        chat = await settings_flights.do(chat_id, _load_settings, chat_id)
+    else:
+        settings.move_to_end(chat_id)
+    return chat
+
+
+def _remember(chat_id: int, chat: ChatSettings) -> ChatSettings:
+    if chat_id in settings:
+        return settings[chat_id]
+    settings[chat_id] = chat
+    if len(settings) > SETTINGS_CACHE_SIZE:
+        # Chats with unsaved changes stay until they have been flushed.
+        for old in list(settings):
+            if len(settings) <= SETTINGS_CACHE_SIZE:
+                break
+            if old != chat_id and not any(old in x for x in dirty.values()):
+                settings.pop(old)
+    return chat
+
+
+async def _load_settings(chat_id: int) -> ChatSettings:
+    found = await asyncio.gather(
+        *[x[0].find_one({"chat_id": chat_id}) for x in SETTINGS_FIELDS.values()]
+    )
+    chat = ChatSettings()
+    for (field, spec), doc in zip(SETTINGS_FIELDS.items(), found):
+        if not doc:
+            continue
+        if spec[1]:
+            if spec[1] not in doc:
+                continue
+            setattr(chat, field, doc[spec[1]])
+        else:
+            setattr(chat, field, spec[2])
+    return _remember(chat_id, chat)
+
+
+async def _preload(name: str, collection, key, apply):
+    started = time.monotonic()
+    loaded = 0
+    projection = {"_id": 0, "chat_id": 1}
+    if key:
+        projection[key] = 1
+    async for doc in collection.find({}, projection, batch_size=1000):
+        if "chat_id" in doc:
+            apply(doc)
+            loaded += 1
+    LOGGER(__name__).info(
+        f"Preloaded {loaded} {name} settings in {time.monotonic() - started:.2f}s."
+    )
+
+
+async def preload_settings(budget: int):
+    started = time.monotonic()
+    staged = {}
+
+    def stage(field, spec):
+        def apply(doc):
+            # Legacy or partial documents without the field keep the default
+            # instead of failing the whole preload.
+            if spec[1] and spec[1] not in doc:
+                return
+            chat = staged.setdefault(doc["chat_id"], ChatSettings())
+            setattr(chat, field, doc[spec[1]] if spec[1] else spec[2])
+
+        return apply
+
+    def assign(doc):
+        if "assistant" in doc:
+            assistantdict.setdefault(doc["chat_id"], doc["assistant"])
+
+    def serve(doc):
+        # Served chats with no stored settings at all are cached as defaults.
+        staged.setdefault(doc["chat_id"], ChatSettings())
+
+    names = ["assistant", "served chat"] + list(SETTINGS_FIELDS)
+    jobs = [
+        _preload("assistant", assdb, "assistant", assign),
+        _preload("served chat", chatsdb, None, serve),
+    ] + [
+        _preload(field, spec[0], spec[1], stage(field, spec))
+        for field, spec in SETTINGS_FIELDS.items()
+    ]
+    tasks = [asyncio.ensure_future(x) for x in jobs]
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for name, task in zip(names, tasks):
+        if task in pending:
+            task.cancel()
+            LOGGER(__name__).warning(f"Preloading {name} settings ran out of time.")
+        elif task.exception():
+            LOGGER(__name__).warning(
+                f"Preloading {name} settings failed: {task.exception()}"
+            )
+    # A chat is only complete once every settings collection has been read,
+    # otherwise the missing fields would be cached as defaults.
+    if all(x in done and not x.exception() for x in tasks[1:]):
+        for chat_id, chat in staged.items():
+            _remember(chat_id, chat)
+    LOGGER(__name__).info(
+        f"Settings Preloaded ({len(settings)} chats, {len(assistantdict)} assistants)"
+        f" in {time.monotonic() - started:.2f}s."
+    )
+
+
+async def _set_setting(chat_id: int, field: str, value):
+    chat = await get_settings(chat_id)
+    setattr(chat, field, value)
+    dirty.setdefault(field, set()).add(chat_id)
+    _schedule_flush()
+
+
+def _schedule_flush():
+    if not flusher:
+        flusher.append(asyncio.create_task(_flusher()))
+
+
+async def flush_writes():
+    if dirty:
+        await _flush_settings()
+    if pending_served:
+        await _flush_served()
+
+
+async def _flush_settings():
+    batch = dict(dirty)
+    dirty.clear()
+    # Values are read before the first await, chats are no longer protected
+    # from eviction once they left dirty.
+    writes = []
+    for field, chats in batch.items():
+        spec = SETTINGS_FIELDS[field]
+        ops = []
+        for chat_id in chats:
+            value = getattr(settings[chat_id], field)
+            if spec[1]:
+                ops.append(
+                    UpdateOne(
+                        {"chat_id": chat_id}, {"$set": {spec[1]: value}}, upsert=True
+                    )
+                )
+            elif value == spec[2]:
+                ops.append(
+                    UpdateOne(
+                        {"chat_id": chat_id},
+                        {"$setOnInsert": {"chat_id": chat_id}},
+                        upsert=True,
+                    )
+                )
+            else:
+                ops.append(DeleteOne({"chat_id": chat_id}))
+        writes.append((field, spec, ops, {x: settings[x] for x in chats}))
+    for field, spec, ops, chats in writes:
+        try:
+            await spec[0].bulk_write(ops, ordered=False)
+        except Exception as e:
+            dirty.setdefault(field, set()).update(chats)
+            for chat_id, chat in chats.items():
+                _remember(chat_id, chat)
+            LOGGER(__name__).warning(f"Failed to save {field} settings: {e}")
+
+
+async def _flusher():
+    while not await asyncio.sleep(SETTINGS_FLUSH_INTERVAL):
+        await flush_writes()
 
 
 async def get_assistant_number(chat_id: int) -> str:
@@ -45,16 +261,14 @@ async def get_assistant_number(chat_id: int) -> str:
 
 
 async def get_client(assistant: int):
-    if int(assistant) == 1:
-        return userbot.one
-    elif int(assistant) == 2:
-        return userbot.two
-    elif int(assistant) == 3:
-        return userbot.three
-    elif int(assistant) == 4:
-        return userbot.four
-    elif int(assistant) == 5:
-        return userbot.five
+    return userbot.get(assistant)
+
+
+def forget_assistant(number: int):
+    # Chats on an assistant that went out of service look up their stored
+    # one again on the next play, find it gone and get a new one.
+    for chat_id in [x for x, y in assistantdict.items() if y == number]:
+        assistantdict.pop(chat_id)
 
 
 async def set_assistant_new(chat_id, number):
@@ -69,7 +283,7 @@ async def set_assistant_new(chat_id, number):
 async def set_assistant(chat_id):
     from SiriVcBot.core.userbot import assistants
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = assistant_scheduler.assign(chat_id, assistants)
     assistantdict[chat_id] = ran_assistant
     await assdb.update_one(
         {"chat_id": chat_id},
@@ -110,7 +324,7 @@ async def get_assistant(chat_id: int) -> str:
 async def set_calls_assistant(chat_id):
     from SiriVcBot.core.userbot import assistants
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = assistant_scheduler.assign(chat_id, assistants)
     assistantdict[chat_id] = ran_assistant
     await assdb.update_one(
         {"chat_id": chat_id},
@@ -140,60 +354,27 @@ async def group_assistant(self, chat_id: int) -> int:
             assis = assistant
         else:
             assis = await set_calls_assistant(chat_id)
-    if int(assis) == 1:
-        return self.one
-    elif int(assis) == 2:
-        return self.two
-    elif int(assis) == 3:
-        return self.three
-    elif int(assis) == 4:
-        return self.four
-    elif int(assis) == 5:
-        return self.five
+    return self.clients[int(assis)]
 
 
 async def is_skipmode(chat_id: int) -> bool:
-    mode = skipmode.get(chat_id)
-    if not mode:
-        user = await skipdb.find_one({"chat_id": chat_id})
-        if not user:
-            skipmode[chat_id] = True
-            return True
-        skipmode[chat_id] = False
-        return False
-    return mode
+    return (await get_settings(chat_id)).skipmode
 
 
 async def skip_on(chat_id: int):
-    skipmode[chat_id] = True
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if user:
-        return await skipdb.delete_one({"chat_id": chat_id})
+    await _set_setting(chat_id, "skipmode", True)
 
 
 async def skip_off(chat_id: int):
-    skipmode[chat_id] = False
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if not user:
-        return await skipdb.insert_one({"chat_id": chat_id})
+    await _set_setting(chat_id, "skipmode", False)
 
 
 async def get_upvote_count(chat_id: int) -> int:
-    mode = count.get(chat_id)
-    if not mode:
-        mode = await countdb.find_one({"chat_id": chat_id})
-        if not mode:
-            return 5
-        count[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await get_settings(chat_id)).upvotes
 
 
 async def set_upvotes(chat_id: int, mode: int):
-    count[chat_id] = mode
-    await countdb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await _set_setting(chat_id, "upvotes", mode)
 
 
 async def is_autoend() -> bool:
@@ -226,76 +407,35 @@ async def set_loop(chat_id: int, mode: int):
 
 
 async def get_cmode(chat_id: int) -> int:
-    mode = channelconnect.get(chat_id)
-    if not mode:
-        mode = await channeldb.find_one({"chat_id": chat_id})
-        if not mode:
-            return None
-        channelconnect[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await get_settings(chat_id)).cmode
 
 
 async def set_cmode(chat_id: int, mode: int):
-    channelconnect[chat_id] = mode
-    await channeldb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await _set_setting(chat_id, "cmode", mode)
 
 
 async def get_playtype(chat_id: int) -> str:
-    mode = playtype.get(chat_id)
-    if not mode:
-        mode = await playtypedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playtype[chat_id] = "Everyone"
-            return "Everyone"
-        playtype[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await get_settings(chat_id)).playtype
 
 
 async def set_playtype(chat_id: int, mode: str):
-    playtype[chat_id] = mode
-    await playtypedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await _set_setting(chat_id, "playtype", mode)
 
 
 async def get_playmode(chat_id: int) -> str:
-    mode = playmode.get(chat_id)
-    if not mode:
-        mode = await playmodedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playmode[chat_id] = "Direct"
-            return "Direct"
-        playmode[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await get_settings(chat_id)).playmode
 
 
 async def set_playmode(chat_id: int, mode: str):
-    playmode[chat_id] = mode
-    await playmodedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await _set_setting(chat_id, "playmode", mode)
 
 
 async def get_lang(chat_id: int) -> str:
-    mode = langm.get(chat_id)
-    if not mode:
-        lang = await langdb.find_one({"chat_id": chat_id})
-        if not lang:
-            langm[chat_id] = "en"
-            return "en"
-        langm[chat_id] = lang["lang"]
-        return lang["lang"]
-    return mode
+    return (await get_settings(chat_id)).lang
 
 
 async def set_lang(chat_id: int, lang: str):
-    langm[chat_id] = lang
-    await langdb.update_one({"chat_id": chat_id}, {"$set": {"lang": lang}}, upsert=True)
+    await _set_setting(chat_id, "lang", lang)
 
 
 async def is_music_playing(chat_id: int) -> bool:
@@ -355,39 +495,16 @@ async def remove_active_video_chat(chat_id: int):
         activevideo.remove(chat_id)
 
 
-async def check_nonadmin_chat(chat_id: int) -> bool:
-    user = await authdb.find_one({"chat_id": chat_id})
-    if not user:
-        return False
-    return True
-
-
 async def is_nonadmin_chat(chat_id: int) -> bool:
-    mode = nonadmin.get(chat_id)
-    if not mode:
-        user = await authdb.find_one({"chat_id": chat_id})
-        if not user:
-            nonadmin[chat_id] = False
-            return False
-        nonadmin[chat_id] = True
-        return True
-    return mode
+    return (await get_settings(chat_id)).nonadmin
 
 
 async def add_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = True
-    is_admin = await check_nonadmin_chat(chat_id)
-    if is_admin:
-        return
-    return await authdb.insert_one({"chat_id": chat_id})
+    await _set_setting(chat_id, "nonadmin", True)
 
 
 async def remove_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = False
-    is_admin = await check_nonadmin_chat(chat_id)
-    if not is_admin:
-        return
-    return await authdb.delete_one({"chat_id": chat_id})
+    await _set_setting(chat_id, "nonadmin", False)
 
 
 async def is_on_off(on_off: int) -> bool:
@@ -447,10 +564,34 @@ async def maintenance_on():
     return await onoffdb.insert_one({"on_off": 1})
 
 
+async def _iter_ids(collection, key: str, query: dict, batch_size: int, after=None):
+    # Pages are fetched by key range instead of one long lived cursor, so slow
+    # consumers (broadcasts, gbans) can't outlive the server's cursor timeout.
+    last = after
+    while True:
+        page = query if last is None else {"$and": [query, {key: {"$gt": last}}]}
+        docs = (
+            await collection.find(page, {"_id": 0, key: 1})
+            .sort(key, 1)
+            .limit(batch_size)
+            .to_list(length=batch_size)
+        )
+        for doc in docs:
+            yield doc[key]
+        if len(docs) < batch_size:
+            return
+        last = docs[-1][key]
+
+
 async def is_served_user(user_id: int) -> bool:
+    if user_id in served_users:
+        return True
+    if served_users.loaded:
+        return False
     user = await usersdb.find_one({"user_id": user_id})
     if not user:
         return False
+    served_users.add(user_id)
     return True
 
 
@@ -461,11 +602,18 @@ async def get_served_users() -> list:
     return users_list
 
 
+def iter_served_users(batch_size: int = 1000, after: int = None):
+    return _iter_ids(usersdb, "user_id", {"user_id": {"$gt": 0}}, batch_size, after)
+
+
+async def get_served_users_count() -> int:
+    if served_users.loaded:
+        return len(served_users)
+    return await usersdb.count_documents({"user_id": {"$gt": 0}})
+
+
 async def add_served_user(user_id: int):
-    is_served = await is_served_user(user_id)
-    if is_served:
-        return
-    return await usersdb.insert_one({"user_id": user_id})
+    _add_served(served_users, usersdb, "user_id", user_id)
 
 
 async def get_served_chats() -> list:
@@ -475,18 +623,71 @@ async def get_served_chats() -> list:
     return chats_list
 
 
+def iter_served_chats(batch_size: int = 1000, after: int = None):
+    return _iter_ids(chatsdb, "chat_id", {"chat_id": {"$lt": 0}}, batch_size, after)
+
+
+async def get_served_chats_count() -> int:
+    if served_chats.loaded:
+        return len(served_chats)
+    return await chatsdb.count_documents({"chat_id": {"$lt": 0}})
+
+
 async def is_served_chat(chat_id: int) -> bool:
+    if chat_id in served_chats:
+        return True
+    if served_chats.loaded:
+        return False
     chat = await chatsdb.find_one({"chat_id": chat_id})
     if not chat:
         return False
+    served_chats.add(chat_id)
     return True
 
 
 async def add_served_chat(chat_id: int):
-    is_served = await is_served_chat(chat_id)
-    if is_served:
+    _add_served(served_chats, chatsdb, "chat_id", chat_id)
+
+
+def _add_served(members: MemberSet, collection, key: str, value: int):
+    if value in members:
         return
-    return await chatsdb.insert_one({"chat_id": chat_id})
+    members.add(value)
+    pending_served.setdefault((collection, key), set()).add(value)
+    _schedule_flush()
+
+
+async def _flush_served():
+    batch = dict(pending_served)
+    pending_served.clear()
+    for (collection, key), values in batch.items():
+        ops = [
+            UpdateOne({key: x}, {"$setOnInsert": {key: x}}, upsert=True)
+            for x in values
+        ]
+        try:
+            await collection.bulk_write(ops, ordered=False)
+        except Exception as e:
+            pending_served.setdefault((collection, key), set()).update(values)
+            LOGGER(__name__).warning(f"Failed to save served {key}s: {e}")
+
+
+async def load_served(budget: int):
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                served_chats.load(iter_served_chats()),
+                served_users.load(iter_served_users()),
+            ),
+            budget,
+        )
+    except Exception as e:
+        LOGGER(__name__).warning(f"Loading served members stopped early: {e!r}")
+    LOGGER(__name__).info(
+        f"Served Members Loaded ({len(served_chats)} chats, {len(served_users)} users)"
+        f" in {time.monotonic() - started:.2f}s."
+    )
 
 
 async def blacklisted_chats() -> list:
@@ -565,6 +766,10 @@ async def get_gbanned() -> list:
     return results
 
 
+def iter_gbanned(batch_size: int = 1000):
+    return _iter_ids(gbansdb, "user_id", {"user_id": {"$gt": 0}}, batch_size)
+
+
 async def is_gbanned_user(user_id: int) -> bool:
     user = await gbansdb.find_one({"user_id": user_id})
     if not user:
@@ -619,10 +824,12 @@ async def get_banned_users() -> list:
     return results
 
 
+def iter_banned_users(batch_size: int = 1000):
+    return _iter_ids(blockeddb, "user_id", {"user_id": {"$gt": 0}}, batch_size)
+
+
 async def get_banned_count() -> int:
-    users = blockeddb.find({"user_id": {"$gt": 0}})
-    users = await users.to_list(length=100000)
-    return len(users)
+    return await blockeddb.count_documents({"user_id": {"$gt": 0}})
 
 
 async def is_banned_user(user_id: int) -> bool:
@@ -644,3 +851,166 @@ async def remove_banned_user(user_id: int):
     if not is_gbanned:
         return
     return await blockeddb.delete_one({"user_id": user_id})
+
+
+async def get_yt_meta(link: str) -> Union[dict, None]:
+    meta = await ytmetadb.find_one({"link": link})
+    if not meta:
+        return None
+    # Mongo's TTL monitor only runs every minute, and rows saved before the
+    # TTL index existed have no date at all, so stale rows are removed here too.
+    saved = meta.get("saved")
+    if not saved or saved + timedelta(seconds=YT_META_CACHE_TTL) < datetime.utcnow():
+        await ytmetadb.delete_one({"link": link})
+        return None
+    return meta["result"]
+
+
+async def save_yt_meta(link: str, result: dict):
+    await ytmetadb.update_one(
+        {"link": link},
+        {"$set": {"result": result, "saved": datetime.utcnow()}, "$unset": {"time": ""}},
+        upsert=True,
+    )
+
+
+async def get_broadcast_job() -> Union[dict, None]:
+    return await broadcastdb.find_one({"job": "broadcast"}, {"_id": 0})
+
+
+async def save_broadcast_job(job: dict):
+    await broadcastdb.update_one({"job": "broadcast"}, {"$set": job}, upsert=True)
+
+
+async def delete_broadcast_job():
+    await broadcastdb.delete_one({"job": "broadcast"})
+
+
+async def get_gban_jobs() -> list:
+    results = []
+    async for job in gbanjobdb.find({}, {"_id": 0, "failures": 0}):
+        results.append(job)
+    return results
+
+
+async def get_gban_failures(user_id: int) -> list:
+    job = await gbanjobdb.find_one({"user_id": user_id}, {"_id": 0, "failures": 1})
+    if not job:
+        return []
+    return job.get("failures", [])
+
+
+async def save_gban_job(job: dict, failures: list = None):
+    update = {"$set": job}
+    if failures:
+        update["$push"] = {"failures": {"$each": failures}}
+    await gbanjobdb.update_one({"user_id": job["user_id"]}, update, upsert=True)
+
+
+async def delete_gban_job(user_id: int):
+    await gbanjobdb.delete_one({"user_id": user_id})
+
+
+async def get_saved_queues() -> list:
+    results = []
+    async for queue in queuedb.find({}, {"_id": 0}):
+        results.append(queue)
+    return results
+
+
+async def save_queues(queues: dict):
+    ops = [
+        UpdateOne({"chat_id": chat_id}, {"$set": queue}, upsert=True)
+        if queue
+        else DeleteOne({"chat_id": chat_id})
+        for chat_id, queue in queues.items()
+    ]
+    if ops:
+        await queuedb.bulk_write(ops, ordered=False)
+
+
+async def delete_saved_queue(chat_id: int):
+    await queuedb.delete_one({"chat_id": chat_id})
+
+
+INDEXES = [
+    (authdb, "chat_id"),
+    (authuserdb, "chat_id"),
+    (autoenddb, "chat_id"),
+    (assdb, "chat_id"),
+    (blacklist_chatdb, "chat_id"),
+    (blockeddb, "user_id"),
+    (chatsdb, "chat_id"),
+    (channeldb, "chat_id"),
+    (countdb, "chat_id"),
+    (gbanjobdb, "user_id"),
+    (gbansdb, "user_id"),
+    (langdb, "chat_id"),
+    (onoffdb, "on_off"),
+    (playmodedb, "chat_id"),
+    (playtypedb, "chat_id"),
+    (queuedb, "chat_id"),
+    (skipdb, "chat_id"),
+    (sudoersdb, "sudo"),
+    (usersdb, "user_id"),
+    (ytmetadb, "link"),
+]
+
+HOT_QUERIES = [(collection, {key: 0}) for collection, key in INDEXES] + [
+    (blacklist_chatdb, {"chat_id": {"$lt": 0}}),
+    (blockeddb, {"user_id": {"$gt": 0}}),
+    (chatsdb, {"chat_id": {"$lt": 0}}),
+    (gbansdb, {"user_id": {"$gt": 0}}),
+    (usersdb, {"user_id": {"$gt": 0}}),
+]
+
+
+async def ensure_indexes():
+    for collection, key in INDEXES:
+        try:
+            await collection.create_index(key, unique=True)
+        except Exception as e:
+            # Old duplicates or a previous plain index keep the key indexed
+            # even if it can't be made unique.
+            LOGGER(__name__).warning(
+                f"Unique index on {collection.name}.{key} not created: {e}"
+            )
+            try:
+                await collection.create_index(key)
+            except Exception:
+                pass
+    try:
+        await ytmetadb.create_index("saved", expireAfterSeconds=YT_META_CACHE_TTL)
+    except Exception:
+        # YT_META_CACHE_TTL changed since the index was made.
+        try:
+            await mongodb.command(
+                "collMod",
+                ytmetadb.name,
+                index={"keyPattern": {"saved": 1}, "expireAfterSeconds": YT_META_CACHE_TTL},
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"TTL index on {ytmetadb.name}.saved not created: {e}")
+    LOGGER(__name__).info(f"Database Indexes Ensured ({len(INDEXES)} collections).")
+
+
+def _plan_stages(plan: dict) -> list:
+    stages = [plan.get("stage")]
+    for child in ("inputStage", "queryPlan"):
+        if child in plan:
+            stages += _plan_stages(plan[child])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return stages
+
+
+async def explain_queries() -> list:
+    results = []
+    for collection, query in HOT_QUERIES:
+        try:
+            plan = await collection.find(query).explain()
+            stages = _plan_stages(plan["queryPlanner"]["winningPlan"])
+        except Exception as e:
+            stages = [f"ERROR {e}"]
+        results.append((collection.name, query, [x for x in stages if x]))
+    return results
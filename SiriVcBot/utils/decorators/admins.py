@@ -3,6 +3,7 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from SiriVcBot import app
 from SiriVcBot.misc import SUDOERS, db
+from SiriVcBot.utils.admincache import admin_cache
 from SiriVcBot.utils.database import (
     get_authuser_names,
     get_cmode,
@@ -13,7 +14,7 @@ from SiriVcBot.utils.database import (
     is_nonadmin_chat,
     is_skipmode,
 )
-from config import SUPPORT_CHAT, adminlist, confirmer
+from config import SUPPORT_CHAT, confirmer
 from strings import get_string
 
 from ..formatters import int_to_alpha
@@ -65,7 +66,7 @@ def AdminRightsCheck(mystic):
         is_non_admin = await is_nonadmin_chat(message.chat.id)
         if not is_non_admin:
             if message.from_user.id not in SUDOERS:
-                admins = adminlist.get(message.chat.id)
+                admins = await admin_cache.admins(message.chat.id)
                 if not admins:
                     return await message.reply_text(_["admin_13"])
                 else:
@@ -97,8 +98,8 @@ def AdminRightsCheck(mystic):
                             if chat_id not in confirmer:
                                 confirmer[chat_id] = {}
                             try:
-                                vidid = db[chat_id][0]["vidid"]
-                                file = db[chat_id][0]["file"]
+                                vidid = db[chat_id][0].vidid
+                                file = db[chat_id][0].file
                             except:
                                 return await message.reply_text(_["admin_14"])
                             senn = await message.reply_text(text, reply_markup=upl)
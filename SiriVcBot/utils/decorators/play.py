@@ -11,8 +11,10 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from SiriVcBot import YouTube, app
 from SiriVcBot.misc import SUDOERS
+from SiriVcBot.utils.admincache import admin_cache
 from SiriVcBot.utils.database import (
     get_assistant,
+    get_assistant_number,
     get_cmode,
     get_lang,
     get_playmode,
@@ -20,13 +22,86 @@ from SiriVcBot.utils.database import (
     is_active_chat,
     is_maintenance,
 )
+from SiriVcBot.utils.exceptions import AssistantErr
 from SiriVcBot.utils.inline import botplaylist_markup
-from config import PLAYLIST_IMG_URL, SUPPORT_CHAT, adminlist
+from SiriVcBot.utils.scheduler import assistant_scheduler
+from config import PLAYLIST_IMG_URL, SUPPORT_CHAT
 from strings import get_string
 
 links = {}
 
 
+async def join_assistant(chat_id: int, _, reply, username: str = None):
+    # Makes sure the chat's assistant is a member before a stream starts,
+    # inviting it when needed. Failures raise AssistantErr with the text to
+    # show, progress goes through `reply`.
+    userbot = await get_assistant(chat_id)
+    try:
+        try:
+            try:
+                get = await app.get_chat_member(chat_id, int(userbot.id))
+            except:
+                get = await app.get_chat_member(chat_id, userbot.username)
+        except ChatAdminRequired:
+            raise AssistantErr(_["call_1"])
+        if (
+            get.status == ChatMemberStatus.BANNED
+            or get.status == ChatMemberStatus.RESTRICTED
+        ):
+            raise AssistantErr(
+                _["call_2"].format(
+                    app.mention, userbot.id, userbot.name, userbot.username
+                )
+            )
+    except UserNotParticipant:
+        if chat_id in links:
+            invitelink = links[chat_id]
+        else:
+            if username:
+                invitelink = username
+                try:
+                    await userbot.resolve_peer(invitelink)
+                except:
+                    pass
+            else:
+                try:
+                    invitelink = await app.export_chat_invite_link(chat_id)
+                except ChatAdminRequired:
+                    raise AssistantErr(_["call_1"])
+                except Exception as e:
+                    raise AssistantErr(
+                        _["call_3"].format(app.mention, type(e).__name__)
+                    )
+
+        if invitelink.startswith("https://t.me/+"):
+            invitelink = invitelink.replace(
+                "https://t.me/+", "https://t.me/joinchat/"
+            )
+        myu = await reply(_["call_4"].format(app.mention))
+        try:
+            await asyncio.sleep(1)
+            await userbot.join_chat(invitelink)
+        except InviteRequestSent:
+            try:
+                await app.approve_chat_join_request(chat_id, userbot.id)
+            except Exception as e:
+                raise AssistantErr(_["call_3"].format(app.mention, type(e).__name__))
+            await asyncio.sleep(3)
+            await myu.edit(_["call_5"].format(app.mention))
+        except UserAlreadyParticipant:
+            pass
+        except Exception as e:
+            assistant_scheduler.failed(await get_assistant_number(chat_id), e)
+            raise AssistantErr(_["call_3"].format(app.mention, type(e).__name__))
+
+        links[chat_id] = invitelink
+
+        try:
+            await userbot.resolve_peer(chat_id)
+        except:
+            pass
+
+
 def PlayWrapper(command):
     async def wrapper(client, message):
         language = await get_lang(message.chat.id)
@@ -93,7 +168,7 @@ def PlayWrapper(command):
         playty = await get_playtype(message.chat.id)
         if playty != "Everyone":
             if message.from_user.id not in SUDOERS:
-                admins = adminlist.get(message.chat.id)
+                admins = await admin_cache.admins(message.chat.id)
                 if not admins:
                     return await message.reply_text(_["admin_13"])
                 else:
@@ -114,74 +189,12 @@ def PlayWrapper(command):
             fplay = None
 
         if not await is_active_chat(chat_id):
-            userbot = await get_assistant(chat_id)
             try:
-                try:
-                    try:
-                        get = await app.get_chat_member(chat_id, int(userbot.id))
-                    except:
-                        get = await app.get_chat_member(chat_id, userbot.username)
-                except ChatAdminRequired:
-                    return await message.reply_text(_["call_1"])
-                if (
-                    get.status == ChatMemberStatus.BANNED
-                    or get.status == ChatMemberStatus.RESTRICTED
-                ):
-                    return await message.reply_text(
-                        _["call_2"].format(
-                            app.mention, userbot.id, userbot.name, userbot.username
-                        )
-                    )
-            except UserNotParticipant:
-                if chat_id in links:
-                    invitelink = links[chat_id]
-                else:
-                    if message.chat.username:
-                        invitelink = message.chat.username
-                        try:
-                            await userbot.resolve_peer(invitelink)
-                        except:
-                            pass
-                    else:
-                        try:
-                            invitelink = await app.export_chat_invite_link(chat_id)
-                        except ChatAdminRequired:
-                            return await message.reply_text(_["call_1"])
-                        except Exception as e:
-                            return await message.reply_text(
-                                _["call_3"].format(app.mention, type(e).__name__)
-                            )
-
-                if invitelink.startswith("https://t.me/+"):
-                    invitelink = invitelink.replace(
-                        "https://t.me/+", "https://t.me/joinchat/"
-                    )
-                myu = await message.reply_text(_["call_4"].format(app.mention))
-                try:
-                    await asyncio.sleep(1)
-                    await userbot.join_chat(invitelink)
-                except InviteRequestSent:
-                    try:
-                        await app.approve_chat_join_request(chat_id, userbot.id)
-                    except Exception as e:
-                        return await message.reply_text(
-                            _["call_3"].format(app.mention, type(e).__name__)
-                        )
-                    await asyncio.sleep(3)
-                    await myu.edit(_["call_5"].format(app.mention))
-                except UserAlreadyParticipant:
-                    pass
-                except Exception as e:
-                    return await message.reply_text(
-                        _["call_3"].format(app.mention, type(e).__name__)
-                    )
-
-                links[chat_id] = invitelink
-
-                try:
-                    await userbot.resolve_peer(chat_id)
-                except:
-                    pass
+                await join_assistant(
+                    chat_id, _, message.reply_text, message.chat.username
+                )
+            except AssistantErr as e:
+                return await message.reply_text(str(e))
 
         return await command(
             client,
@@ -1,7 +1,3 @@
-import json
-import subprocess
-
-
 def get_readable_time(seconds: int) -> str:
     count = 0
     ping_time = ""
@@ -83,67 +79,6 @@ def seconds_to_min(seconds):
     return "-"
 
 
-def speed_converter(seconds, speed):
-    if str(speed) == str("0.5"):
-        seconds = seconds * 2
-    if str(speed) == str("0.75"):
-        seconds = seconds + ((50 * seconds) // 100)
-    if str(speed) == str("1.5"):
-        seconds = seconds - ((25 * seconds) // 100)
-    if str(speed) == str("2.0"):
-        seconds = seconds - ((50 * seconds) // 100)
-    collect = seconds
-    if seconds is not None:
-        seconds = int(seconds)
-        d, h, m, s = (
-            seconds // (3600 * 24),
-            seconds // 3600 % 24,
-            seconds % 3600 // 60,
-            seconds % 3600 % 60,
-        )
-        if d > 0:
-            convert = "{:02d}:{:02d}:{:02d}:{:02d}".format(d, h, m, s)
-            return convert, collect
-        elif h > 0:
-            convert = "{:02d}:{:02d}:{:02d}".format(h, m, s)
-            return convert, collect
-        elif m > 0:
-            convert = "{:02d}:{:02d}".format(m, s)
-            return convert, collect
-        elif s > 0:
-            convert = "00:{:02d}".format(s)
-            return convert, collect
-    return "-"
-
-
-def check_duration(file_path):
-    command = [
-        "ffprobe",
-        "-loglevel",
-        "quiet",
-        "-print_format",
-        "json",
-        "-show_format",
-        "-show_streams",
-        file_path,
-    ]
-
-    pipe = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    out, err = pipe.communicate()
-    _json = json.loads(out)
-
-    if "format" in _json:
-        if "duration" in _json["format"]:
-            return float(_json["format"]["duration"])
-
-    if "streams" in _json:
-        for s in _json["streams"]:
-            if "duration" in s:
-                return float(s["duration"])
-
-    return "Unknown"
-
-
 formats = [
     "webm",
     "mkv",
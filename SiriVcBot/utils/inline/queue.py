@@ -63,6 +63,24 @@ def queue_back_markup(_, CPLAY):
     return upl
 
 
+def saved_queue_markup(_, chat_id):
+    upl = InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(
+                    text=_["QU_B_3"],
+                    callback_data=f"SavedQueue Resume|{chat_id}",
+                ),
+                InlineKeyboardButton(
+                    text=_["QU_B_4"],
+                    callback_data=f"SavedQueue Dismiss|{chat_id}",
+                ),
+            ]
+        ]
+    )
+    return upl
+
+
 def aq_markup(_, chat_id):
     buttons = [
         [
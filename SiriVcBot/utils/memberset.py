@@ -0,0 +1,34 @@
+from array import array
+from bisect import bisect_left
+
+
+class MemberSet:
+    def __init__(self):
+        self.base = array("q")
+        self.extra = set()
+        self.loaded = False
+
+    def __contains__(self, item: int) -> bool:
+        return item in self.extra or self._in_base(item)
+
+    def _in_base(self, item: int) -> bool:
+        i = bisect_left(self.base, item)
+        return i < len(self.base) and self.base[i] == item
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def add(self, item: int):
+        if item not in self:
+            self.extra.add(item)
+
+    async def load(self, items):
+        # Ids arrive in ascending order, so they can be packed into a sorted
+        # array of 8 byte ints instead of a set of python ints.
+        base = array("q")
+        async for item in items:
+            if not base or item > base[-1]:
+                base.append(item)
+        self.base = base
+        self.extra = {x for x in self.extra if not self._in_base(x)}
+        self.loaded = True
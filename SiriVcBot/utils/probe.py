@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+
+from SiriVcBot.utils.singleflight import SingleFlight
+from SiriVcBot.utils.ttlcache import TTLCache
+
+PROBE_WORKERS = 4
+PROBE_TIMEOUT = 30
+PROBE_CACHE_TTL = 86400
+
+
+class MediaProbe:
+    def __init__(self, workers: int, timeout: int):
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = None
+        self.cache = TTLCache(PROBE_CACHE_TTL)
+        self.flights = SingleFlight()
+        self.probes = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _key(self, path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path
+        return (path, stat.st_mtime, stat.st_size)
+
+    async def probe(self, path: str) -> dict:
+        key = self._key(path)
+        info = self.cache.get(key)
+        if info is None:
+            info = await self.flights.do(key, self._probe, key, path)
+        return info
+
+    async def _probe(self, key, path: str) -> dict:
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.workers)
+        async with self.slots:
+            self.probes += 1
+            proc = await asyncio.create_subprocess_exec(
+                "ffprobe",
+                "-loglevel",
+                "quiet",
+                "-print_format",
+                "json",
+                "-show_format",
+                "-show_streams",
+                path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            try:
+                out, _ = await asyncio.wait_for(proc.communicate(), self.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                proc.kill()
+                await proc.wait()
+                raise
+        try:
+            info = parse_probe(json.loads(out))
+        except Exception:
+            self.failures += 1
+            raise
+        self.cache.set(key, info)
+        return info
+
+    async def duration(self, path: str):
+        try:
+            return (await self.probe(path))["duration"] or "Unknown"
+        except Exception:
+            return "Unknown"
+
+    def stats(self) -> dict:
+        cache = self.cache.stats()
+        return {
+            "probes": self.probes,
+            "running": len(self.flights.calls),
+            "cached": cache["size"],
+            "hits": cache["hits"],
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+        }
+
+
+def parse_probe(data: dict) -> dict:
+    fmt = data.get("format") or {}
+    streams = data.get("streams") or []
+    duration = fmt.get("duration")
+    if duration is None:
+        for stream in streams:
+            if "duration" in stream:
+                duration = stream["duration"]
+                break
+    codecs = {}
+    for stream in streams:
+        kind = stream.get("codec_type")
+        if kind in ("audio", "video") and kind not in codecs:
+            codecs[kind] = stream.get("codec_name")
+    bitrate = fmt.get("bit_rate")
+    return {
+        "duration": float(duration) if duration is not None else None,
+        "format": fmt.get("format_name"),
+        "audio": codecs.get("audio"),
+        "video": codecs.get("video"),
+        "bitrate": int(bitrate) if bitrate else None,
+    }
+
+
+media_probe = MediaProbe(PROBE_WORKERS, PROBE_TIMEOUT)
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import config
+
+# FloodWaits longer than this skip the request instead of stalling every bulk
+# job, the same cutoff the old broadcast used.
+MAX_FLOOD_WAIT = 200
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self.floodwaits = 0
+        self.skipped = 0
+        self.lock = None
+
+    def pause(self, seconds: float) -> bool:
+        # A FloodWait applies to the whole bot, so every waiter backs off
+        # together instead of each one sleeping on its own retry. Returns
+        # False for waits too long to be worth it, the caller gives up on
+        # that request instead.
+        self.floodwaits += 1
+        if seconds > MAX_FLOOD_WAIT:
+            self.skipped += 1
+            return False
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        return True
+
+    def paused(self) -> float:
+        return max(0, self.paused_until - time.monotonic())
+
+    async def acquire(self):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            while True:
+                wait = self.paused()
+                if wait:
+                    await asyncio.sleep(wait)
+                    continue
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+app_limiter = TokenBucket(config.BOT_RATE_LIMIT)
@@ -0,0 +1,95 @@
+import random
+import time
+from collections import deque
+
+from pyrogram.errors import FloodWait
+
+ERROR_WINDOW = 600
+ERROR_LIMIT = 3
+RESERVE_TIME = 60
+
+
+class AssistantScheduler:
+    def __init__(self, window: int, limit: int):
+        self.window = window
+        self.limit = limit
+        self.calls = {}
+        self.reserved = {}
+        self.errors = {}
+        self.flooded = {}
+        self.floodwaits = {}
+
+    def _recent(self, num) -> int:
+        errors = self.errors.get(num)
+        if not errors:
+            return 0
+        cutoff = time.monotonic() - self.window
+        while errors and errors[0] < cutoff:
+            errors.popleft()
+        return len(errors)
+
+    def load(self, num) -> int:
+        # Chats that were just assigned but haven't joined yet still count, so
+        # a burst of new chats doesn't all land on the same idle assistant.
+        live = sum(1 for x in self.calls.values() if x == num)
+        return live + sum(1 for x, _ in self.reserved.values() if x == num)
+
+    def healthy(self, num) -> bool:
+        if self.flooded.get(num, 0) > time.monotonic():
+            return False
+        return self._recent(num) < self.limit
+
+    def assign(self, chat_id: int, assistants: list) -> int:
+        now = time.monotonic()
+        for key in [x for x, (_, until) in self.reserved.items() if until <= now]:
+            self.reserved.pop(key)
+        candidates = [x for x in assistants if self.healthy(x)] or assistants
+        num = min(
+            candidates,
+            key=lambda x: (self.load(x), self._recent(x), random.random()),
+        )
+        self.reserved[chat_id] = (num, time.monotonic() + RESERVE_TIME)
+        return num
+
+    def joined(self, chat_id: int, num: int):
+        self.reserved.pop(chat_id, None)
+        self.calls[chat_id] = num
+
+    def left(self, chat_id: int):
+        self.reserved.pop(chat_id, None)
+        self.calls.pop(chat_id, None)
+
+    def failed(self, num, error=None):
+        if num is None:
+            return
+        if isinstance(error, FloodWait):
+            self.floodwaits[num] = self.floodwaits.get(num, 0) + 1
+            self.flooded[num] = max(
+                self.flooded.get(num, 0), time.monotonic() + int(error.value)
+            )
+            return
+        self.errors.setdefault(num, deque()).append(time.monotonic())
+
+    def stats(self, assistants: list, assigned: dict) -> list:
+        now = time.monotonic()
+        chats = {}
+        for num in assigned.values():
+            chats[num] = chats.get(num, 0) + 1
+        results = []
+        for num in assistants:
+            results.append(
+                {
+                    "assistant": num,
+                    "calls": sum(1 for x in self.calls.values() if x == num),
+                    "load": self.load(num),
+                    "chats": chats.get(num, 0),
+                    "errors": self._recent(num),
+                    "floodwaits": self.floodwaits.get(num, 0),
+                    "flooded": max(0, int(self.flooded.get(num, 0) - now)),
+                    "healthy": self.healthy(num),
+                }
+            )
+        return results
+
+
+assistant_scheduler = AssistantScheduler(ERROR_WINDOW, ERROR_LIMIT)
@@ -0,0 +1,38 @@
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self.calls = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __contains__(self, key):
+        return key in self.calls
+
+    def start(self, key, func, *args, **kwargs):
+        future = self.calls.get(key)
+        if future is None:
+            self.started += 1
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            self.calls[key] = future
+            future.add_done_callback(lambda fut: self._done(key, fut))
+        else:
+            self.coalesced += 1
+        return future
+
+    async def do(self, key, func, *args, **kwargs):
+        return await asyncio.shield(self.start(key, func, *args, **kwargs))
+
+    def _done(self, key, future):
+        if self.calls.get(key) is future:
+            self.calls.pop(key)
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self.calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
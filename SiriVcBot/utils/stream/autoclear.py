@@ -1,18 +1,19 @@
-import os
-
-from config import autoclean
+from SiriVcBot.utils.stream.cache import media_cache
 
 
 async def auto_clean(popped):
     try:
-        rem = popped["file"]
-        autoclean.remove(rem)
-        count = autoclean.count(rem)
-        if count == 0:
-            if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
-                try:
-                    os.remove(rem)
-                except:
-                    pass
+        rem = popped.file
+        if media_cache.release(rem):
+            return
+        if rem in media_cache:
+            return media_cache.evict()
+        if (
+            "vid_" not in rem
+            and "live_" not in rem
+            and "index_" not in rem
+            and "lazy_" not in rem
+        ):
+            media_cache.discard(rem)
     except:
         pass
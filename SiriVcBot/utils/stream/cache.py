@@ -0,0 +1,157 @@
+import os
+import re
+import time
+from collections import OrderedDict
+
+import config
+from SiriVcBot.logging import LOGGER
+
+VIDEO_EXTS = ("mp4", "mkv", "webm")
+PARTIAL_EXTS = ("part", "ytdl", "temp")
+# Only youtube downloads are named after their id (outtmpl %(id)s.%(ext)s).
+YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+class MediaCache:
+    def __init__(self, path: str, limit: int):
+        self.path = path
+        self.limit = limit
+        self.entries = OrderedDict()
+        self.paths = {}
+        self.refs = {}
+        self.variants = {}
+        self.strays = []
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, path):
+        return path in self.paths
+
+    def load(self):
+        if not os.path.isdir(self.path):
+            return
+        found = []
+        for name in os.listdir(self.path):
+            file = os.path.join(self.path, name)
+            if "." not in name or not os.path.isfile(file):
+                continue
+            vidid, ext = name.rsplit(".", 1)
+            if ext in PARTIAL_EXTS or not YOUTUBE_ID.match(vidid):
+                # Telegram, soundcloud and song downloads can't be looked up
+                # by id, they're removed by sweep() once nothing needs them.
+                self.strays.append(file)
+                continue
+            found.append((os.path.getmtime(file), vidid, ext, file))
+        for _, vidid, ext, file in sorted(found):
+            self.add(vidid, "video" if ext in VIDEO_EXTS else "audio", file)
+        LOGGER(__name__).info(
+            f"Media Cache Loaded ({len(self.entries)} files, {self.size} bytes)."
+        )
+
+    def sweep(self, keep=()):
+        keep = set(keep)
+        removed = 0
+        for file in self.strays:
+            if file in keep:
+                continue
+            try:
+                os.remove(file)
+                removed += 1
+            except OSError:
+                pass
+        self.strays = []
+        if removed:
+            LOGGER(__name__).info(f"Removed {removed} stray files from {self.path}.")
+
+    def get(self, vidid: str, mode: str):
+        key = (vidid, mode)
+        entry = self.entries.get(key)
+        if entry and os.path.isfile(entry["path"]):
+            self.entries.move_to_end(key)
+            entry["used"] = time.time()
+            entry["hits"] += 1
+            self.hits += 1
+            return entry["path"]
+        if entry:
+            self._drop(key)
+        self.misses += 1
+        return None
+
+    def add(self, vidid: str, mode: str, path: str):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        key = (vidid, mode)
+        if key in self.entries:
+            self._drop(key)
+        self.entries[key] = {"path": path, "size": size, "used": time.time(), "hits": 0}
+        self.paths[path] = key
+        self.size += size
+        # The new file isn't acquired by its queue entry yet.
+        self.evict(key)
+
+    def add_variant(self, source: str, path: str):
+        self.variants.setdefault(source, []).append(path)
+        key = self.paths.get(source)
+        if key is None:
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self.entries[key]["size"] += size
+        self.size += size
+        self.evict(key)
+
+    def discard(self, path: str):
+        for file in [path] + self.variants.pop(path, []):
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+
+    def acquire(self, path: str):
+        self.refs[path] = self.refs.get(path, 0) + 1
+
+    def release(self, path: str) -> int:
+        count = self.refs.get(path, 0) - 1
+        if count > 0:
+            self.refs[path] = count
+            return count
+        self.refs.pop(path, None)
+        return 0
+
+    def evict(self, keep=None):
+        for key in list(self.entries):
+            if self.size <= self.limit:
+                break
+            entry = self.entries[key]
+            if key == keep or self.refs.get(entry["path"]):
+                continue
+            self.discard(entry["path"])
+            self._drop(key)
+            self.evictions += 1
+
+    def _drop(self, key):
+        entry = self.entries.pop(key)
+        self.paths.pop(entry["path"], None)
+        self.size -= entry["size"]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self.entries),
+            "size": self.size,
+            "limit": self.limit,
+            "pinned": sum(1 for x in self.paths if self.refs.get(x)),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ratio": round(self.hits * 100 / lookups, 2) if lookups else 0,
+            "evictions": self.evictions,
+        }
+
+
+media_cache = MediaCache("downloads", config.CACHE_SIZE_LIMIT)
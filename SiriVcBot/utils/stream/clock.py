@@ -0,0 +1,56 @@
+import time
+
+from SiriVcBot.misc import db
+
+clocks = {}
+
+
+class PlaybackClock:
+    def __init__(self, offset: float = 0, paused: bool = False):
+        now = time.monotonic()
+        self.started = now - offset
+        self.paused = now if paused else None
+
+    def position(self) -> float:
+        now = self.paused if self.paused is not None else time.monotonic()
+        return now - self.started
+
+    def pause(self):
+        if self.paused is None:
+            self.paused = time.monotonic()
+
+    def resume(self):
+        if self.paused is not None:
+            self.started += time.monotonic() - self.paused
+            self.paused = None
+
+
+def start_clock(chat_id: int, offset: float = 0):
+    clock = clocks.get(chat_id)
+    clocks[chat_id] = PlaybackClock(offset, bool(clock and clock.paused is not None))
+
+
+def pause_clock(chat_id: int):
+    clock = clocks.get(chat_id)
+    if clock:
+        clock.pause()
+
+
+def resume_clock(chat_id: int):
+    clock = clocks.get(chat_id)
+    if clock:
+        clock.resume()
+
+
+def stop_clock(chat_id: int):
+    clocks.pop(chat_id, None)
+
+
+def get_played(chat_id: int) -> int:
+    clock = clocks.get(chat_id)
+    playing = db.get(chat_id)
+    if not clock or not playing:
+        return 0
+    played = int(clock.position())
+    seconds = int(playing[0].seconds)
+    return min(played, seconds) if seconds else played
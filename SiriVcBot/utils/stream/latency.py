@@ -0,0 +1,27 @@
+import time
+from collections import deque
+
+from SiriVcBot.logging import LOGGER
+
+first_audio = deque(maxlen=500)
+
+
+def report_first_audio(chat_id: int, started: float, direct) -> float:
+    took = time.monotonic() - started
+    first_audio.append(took)
+    LOGGER(__name__).info(
+        f"First audio in {chat_id} after {took:.2f}s ({'file' if direct else 'stream'})."
+    )
+    return took
+
+
+def first_audio_stats() -> dict:
+    if not first_audio:
+        return {"plays": 0, "avg": 0, "p50": 0, "p95": 0}
+    timings = sorted(first_audio)
+    return {
+        "plays": len(timings),
+        "avg": round(sum(timings) / len(timings), 2),
+        "p50": round(timings[len(timings) // 2], 2),
+        "p95": round(timings[int(len(timings) * 0.95)], 2),
+    }
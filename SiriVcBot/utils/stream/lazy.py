@@ -0,0 +1,71 @@
+import asyncio
+
+import config
+from SiriVcBot import YouTube
+from SiriVcBot.logging import LOGGER
+from SiriVcBot.utils.singleflight import SingleFlight
+from SiriVcBot.utils.stream.cache import media_cache
+from SiriVcBot.utils.stream.queue import ChatQueue, QueueEntry
+
+
+class LazyResolver:
+    def __init__(self):
+        self.flights = SingleFlight()
+        self.resolved = 0
+        self.dropped = 0
+
+    async def resolve(self, entry: QueueEntry) -> bool:
+        if entry.query is None:
+            return True
+        search, videoid = entry.query
+        # Lookups go through YouTube.search, so a track that was resolved
+        # once is served from the search cache the next time it's queued.
+        try:
+            title, duration_min, duration_sec, _, vidid = await self.flights.do(
+                (search, bool(videoid)), YouTube.details, search, videoid
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"Couldn't resolve queued track {search}: {e}")
+            return False
+        if entry.query is None:
+            return True
+        if str(duration_min) == "None" or duration_sec > config.DURATION_LIMIT:
+            return False
+        entry.title = title.title()
+        entry.dur = duration_min
+        entry.seconds = max(0, duration_sec - 3)
+        entry.vidid = vidid
+        entry.file = f"vid_{vidid}"
+        entry.query = None
+        media_cache.acquire(entry.file)
+        self.resolved += 1
+        return True
+
+    async def settle(self, queue: ChatQueue, entry: QueueEntry) -> bool:
+        if await self.resolve(entry):
+            return True
+        # Tracks that can't be found or played leave the queue, the same as
+        # they used to be skipped while the playlist was added.
+        if queue.remove(entry):
+            self.dropped += 1
+        return False
+
+    async def settle_all(self, queue: ChatQueue, entries: list):
+        lazy = [x for x in entries if x.query is not None]
+        if lazy:
+            await asyncio.gather(*[self.settle(queue, x) for x in lazy])
+
+    async def ready(self, queue: ChatQueue) -> bool:
+        while queue and queue[0].query is not None:
+            await self.settle(queue, queue[0])
+        return bool(queue)
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self.flights.calls),
+            "resolved": self.resolved,
+            "dropped": self.dropped,
+        }
+
+
+lazy_resolver = LazyResolver()
@@ -0,0 +1,148 @@
+import time
+
+import config
+from SiriVcBot.logging import LOGGER
+from SiriVcBot.misc import db
+from SiriVcBot.utils.database import delete_saved_queue, get_saved_queues, save_queues
+from SiriVcBot.utils.stream.autoclear import auto_clean
+from SiriVcBot.utils.stream.cache import media_cache
+from SiriVcBot.utils.stream.clock import get_played
+from SiriVcBot.utils.stream.queue import ChatQueue, QueueEntry
+
+SNAPSHOT_INTERVAL = 1
+
+# Same order as the arguments of QueueEntry, so a saved entry can be passed
+# straight back in.
+SAVED_FIELDS = (
+    "title",
+    "dur",
+    "streamtype",
+    "by",
+    "chat_id",
+    "file",
+    "vidid",
+    "seconds",
+    "user_id",
+    "query",
+)
+
+
+def dump_entry(entry: QueueEntry) -> dict:
+    saved = {x: getattr(entry, x) for x in SAVED_FIELDS}
+    # Sped up tracks come back at normal speed.
+    if entry.old_dur:
+        saved["dur"] = entry.old_dur
+        saved["seconds"] = entry.old_second
+    return saved
+
+
+def load_entry(saved: dict) -> QueueEntry:
+    return QueueEntry(*(saved.get(x) for x in SAVED_FIELDS))
+
+
+class QueueStore:
+    def __init__(self, enabled: bool, rate: int):
+        self.enabled = enabled
+        self.rate = rate
+        self.saved = {}
+        self.pending = {}
+        self.writes = 0
+        self.deferred = 0
+        self.failures = 0
+
+    def dirty(self) -> list:
+        changed = []
+        for chat_id, queue in list(db.items()):
+            seen = self.saved.get(chat_id)
+            if seen is None:
+                if queue:
+                    changed.append(chat_id)
+            elif seen[0] is not queue or seen[1] != queue.version:
+                changed.append(chat_id)
+        changed += [x for x in self.saved if x not in db]
+        # Chats that waited longest go first, so a busy chat can't starve the
+        # rest when there are more changes than the rate allows.
+        changed.sort(key=lambda x: self.saved.get(x, (None, 0, 0))[2])
+        return changed
+
+    async def snapshot(self, limit: int = None) -> int:
+        changed = self.dirty()
+        if limit is not None and len(changed) > limit:
+            self.deferred += len(changed) - limit
+            changed = changed[:limit]
+        if not changed:
+            return 0
+        now = time.monotonic()
+        docs = {}
+        for chat_id in changed:
+            queue = db.get(chat_id)
+            if queue:
+                docs[chat_id] = {
+                    "chat_id": chat_id,
+                    "position": get_played(chat_id),
+                    "entries": [dump_entry(x) for x in queue],
+                }
+                self.saved[chat_id] = (queue, queue.version, now)
+            else:
+                docs[chat_id] = None
+                self.saved.pop(chat_id, None)
+        try:
+            await save_queues(docs)
+        except Exception as e:
+            self.failures += 1
+            for chat_id in changed:
+                self.saved[chat_id] = (None, -1, 0)
+            LOGGER(__name__).warning(f"Failed to save {len(changed)} queues: {e}")
+            return 0
+        self.writes += len(changed)
+        return len(changed)
+
+    async def flush(self):
+        if not self.enabled:
+            return
+        # The playback position isn't part of the version, so every saved
+        # chat is written once more on the way down.
+        for chat_id in list(self.saved):
+            self.saved[chat_id] = (None, -1, 0)
+        await self.snapshot()
+
+    async def load(self) -> list:
+        for saved in await get_saved_queues():
+            queue = ChatQueue(load_entry(x) for x in saved.get("entries", []))
+            if not queue:
+                continue
+            # Keep the cached files of saved tracks until the chat decides.
+            for entry in queue:
+                media_cache.acquire(entry.file)
+            self.pending[saved["chat_id"]] = (queue, saved.get("position", 0))
+        return list(self.pending)
+
+    def take(self, chat_id: int):
+        # The resumed stream builds a new queue in db, which is saved in place
+        # of this one by the next snapshot.
+        return self.pending.pop(chat_id)
+
+    def restore(self, chat_id: int, queue: ChatQueue, position: int):
+        self.saved.pop(chat_id, None)
+        self.pending[chat_id] = (queue, position)
+
+    async def drop(self, chat_id: int):
+        queue, _ = self.pending.pop(chat_id)
+        for entry in queue:
+            await auto_clean(entry)
+        # Once the chat played something new its document holds that queue.
+        if chat_id not in self.saved:
+            await delete_saved_queue(chat_id)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "saved": len(self.saved),
+            "pending": len(self.pending),
+            "writes": self.writes,
+            "deferred": self.deferred,
+            "failures": self.failures,
+        }
+
+
+queue_store = QueueStore(config.PERSIST_QUEUES, config.QUEUE_SNAPSHOT_RATE)
@@ -0,0 +1,54 @@
+import asyncio
+from collections import deque
+
+from SiriVcBot import YouTube
+
+
+class PlaylistResolver:
+    # Hands the details of playlist entries back in playlist order, None for
+    # entries that failed. Only one entry is looked up at a time until entries
+    # turn out unusable, then up to `workers` are looked up ahead.
+    def __init__(self, searches, videoid: bool, workers: int):
+        self.searches = iter(searches)
+        self.videoid = videoid
+        self.workers = max(1, workers)
+        self.ahead = 1
+        self.window = deque()
+        self._fill()
+
+    def widen(self):
+        self.ahead = min(self.workers, self.ahead * 2)
+        self._fill()
+
+    def _fill(self):
+        while len(self.window) < self.ahead:
+            search = next(self.searches, None)
+            if search is None:
+                return
+            self.window.append(
+                (search, asyncio.create_task(YouTube.details(search, self.videoid)))
+            )
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.window:
+            raise StopAsyncIteration
+        _, task = self.window[0]
+        try:
+            return await task
+        except Exception:
+            self.ahead = min(self.workers, self.ahead * 2)
+            return None
+        finally:
+            self.window.popleft()
+            self._fill()
+
+    def close(self) -> list:
+        # Returns the entries that were never handed out, in order.
+        rest = [x for x, _ in self.window]
+        for _, task in self.window:
+            task.cancel()
+        self.window.clear()
+        return rest + list(self.searches)
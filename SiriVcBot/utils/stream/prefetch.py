@@ -0,0 +1,116 @@
+import asyncio
+
+import config
+from SiriVcBot import YouTube
+from SiriVcBot.logging import LOGGER
+from SiriVcBot.misc import db
+from SiriVcBot.utils.database import is_on_off
+from SiriVcBot.utils.stream.cache import media_cache
+from SiriVcBot.utils.stream.lazy import lazy_resolver
+from SiriVcBot.utils.stream.queue import localize
+
+
+class Prefetcher:
+    def __init__(self, depth: int, workers: int, limit: int):
+        self.depth = depth
+        self.workers = workers
+        self.limit = limit
+        self.slots = None
+        self.tasks = {}
+        self.scans = {}
+        self.again = set()
+        self.files = {}
+        self.fetched = 0
+        self.failures = 0
+
+    def used(self) -> int:
+        # Prefetched files stop counting once their queue entry has been
+        # played and released.
+        for path in list(self.files):
+            if not media_cache.refs.get(path):
+                self.files.pop(path)
+        return sum(self.files.values())
+
+    def kick(self, chat_id: int):
+        # Called whenever a chat's upcoming tracks change. Kicks that arrive
+        # while a scan is running are folded into one more pass.
+        if not self.depth:
+            return
+        if chat_id in self.scans:
+            self.again.add(chat_id)
+            return
+        self.scans[chat_id] = asyncio.create_task(self._scan(chat_id))
+
+    async def _scan(self, chat_id: int):
+        try:
+            while True:
+                self.again.discard(chat_id)
+                try:
+                    await self.scan(chat_id)
+                except Exception as e:
+                    LOGGER(__name__).warning(f"Prefetch scan of {chat_id} failed: {e}")
+                if chat_id not in self.again:
+                    return
+        finally:
+            self.scans.pop(chat_id, None)
+
+    async def scan(self, chat_id: int):
+        queue = db.get(chat_id)
+        if not queue:
+            return
+        # Lazy playlist tracks are looked up once they come this close.
+        await lazy_resolver.settle_all(queue, queue.upcoming(self.depth))
+        for entry in queue.upcoming(self.depth):
+            if "vid_" not in entry.file:
+                continue
+            video = entry.streamtype == "video"
+            key = (entry.vidid, "video" if video else "audio")
+            if key in self.tasks:
+                continue
+            if key in media_cache.entries:
+                localize(entry)
+                continue
+            if video and not await is_on_off(1):
+                continue
+            if self.used() >= self.limit:
+                return
+            self.tasks[key] = asyncio.create_task(self._fetch(key, video))
+
+    async def _fetch(self, key, video):
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.workers)
+        vidid, mode = key
+        try:
+            async with self.slots:
+                file_path, _ = await YouTube.download(
+                    vidid, None, videoid=True, video=video
+                )
+        except Exception as e:
+            self.failures += 1
+            LOGGER(__name__).warning(f"Prefetch of {vidid} failed: {e}")
+            return
+        finally:
+            self.tasks.pop(key, None)
+        self.fetched += 1
+        for queue in list(db.values()):
+            for entry in queue.upcoming(self.depth):
+                if entry.vidid == vidid and "vid_" in entry.file:
+                    if localize(entry) == file_path:
+                        self.files[file_path] = media_cache.entries.get(
+                            (vidid, mode), {}
+                        ).get("size", 0)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "running": len(self.tasks),
+            "fetched": self.fetched,
+            "failures": self.failures,
+            "used": self.used(),
+            "limit": self.limit,
+        }
+
+
+prefetcher = Prefetcher(
+    config.PREFETCH_DEPTH, config.PREFETCH_WORKERS, config.PREFETCH_SIZE_LIMIT
+)
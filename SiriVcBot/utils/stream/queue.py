@@ -1,9 +1,136 @@
-import asyncio
+import random
+from collections import deque
+from itertools import islice
 from typing import Union
 
 from SiriVcBot.misc import db
-from SiriVcBot.utils.formatters import check_duration, seconds_to_min
-from config import autoclean, time_to_seconds
+from SiriVcBot.utils.formatters import seconds_to_min
+from SiriVcBot.utils.probe import media_probe
+from SiriVcBot.utils.stream.cache import media_cache
+from config import time_to_seconds
+
+
+class QueueEntry:
+    __slots__ = (
+        "title",
+        "dur",
+        "streamtype",
+        "by",
+        "user_id",
+        "chat_id",
+        "file",
+        "vidid",
+        "seconds",
+        "old_dur",
+        "old_second",
+        "speed_path",
+        "speed",
+        "mystic",
+        "markup",
+        "query",
+    )
+
+    def __init__(
+        self,
+        title,
+        dur,
+        streamtype,
+        by,
+        chat_id,
+        file,
+        vidid,
+        seconds,
+        user_id=None,
+        query=None,
+    ):
+        self.title = title
+        self.dur = dur
+        self.streamtype = streamtype
+        self.by = by
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.file = file
+        self.vidid = vidid
+        self.seconds = seconds
+        self.old_dur = None
+        self.old_second = None
+        self.speed_path = None
+        self.speed = None
+        self.mystic = None
+        self.markup = None
+        # (search, videoid) of a playlist track that hasn't been looked up
+        # yet, cleared once the entry is resolved.
+        self.query = query
+
+
+class ChatQueue:
+    # version goes up on every change to the order of the queue, so the
+    # snapshotter can tell which chats need saving without comparing entries.
+    __slots__ = ("entries", "version")
+
+    def __init__(self, entries=()):
+        self.entries = deque(entries)
+        self.version = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, index: int) -> QueueEntry:
+        return self.entries[index]
+
+    def enqueue(self, entry: QueueEntry) -> int:
+        self.entries.append(entry)
+        self.version += 1
+        return len(self.entries) - 1
+
+    def force(self, entry: QueueEntry):
+        self.entries.appendleft(entry)
+        self.version += 1
+
+    def pop(self) -> Union[QueueEntry, None]:
+        if self.entries:
+            self.version += 1
+            return self.entries.popleft()
+
+    def upcoming(self, count: int = None) -> list:
+        stop = None if count is None else count + 1
+        return list(islice(self.entries, 1, stop))
+
+    def shuffle(self) -> bool:
+        # The playing track stays on top, only what comes after it moves.
+        if len(self.entries) < 2:
+            return False
+        current = self.entries.popleft()
+        rest = list(self.entries)
+        random.shuffle(rest)
+        self.entries = deque(rest)
+        self.entries.appendleft(current)
+        self.version += 1
+        return True
+
+    def remove(self, entry: QueueEntry) -> bool:
+        try:
+            self.entries.remove(entry)
+        except ValueError:
+            return False
+        self.version += 1
+        return True
+
+    def move(self, source: int, target: int):
+        entry = self.entries[source]
+        del self.entries[source]
+        self.entries.insert(target, entry)
+        self.version += 1
+
+
+def get_queue(chat_id: int) -> ChatQueue:
+    queue = db.get(chat_id)
+    if queue is None:
+        queue = db[chat_id] = ChatQueue()
+    return queue
 
 
 async def put_queue(
@@ -23,28 +150,23 @@ async def put_queue(
         duration_in_seconds = time_to_seconds(duration) - 3
     except:
         duration_in_seconds = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "user_id": user_id,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": duration_in_seconds,
-        "played": 0,
-    }
+    put = QueueEntry(
+        title,
+        duration,
+        stream,
+        user,
+        original_chat_id,
+        file,
+        vidid,
+        duration_in_seconds,
+        user_id,
+    )
     if forceplay:
-        check = db.get(chat_id)
-        if check:
-            check.insert(0, put)
-        else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+        get_queue(chat_id).force(put)
     else:
-        db[chat_id].append(put)
-    autoclean.append(file)
+        get_queue(chat_id).enqueue(put)
+    media_cache.acquire(file)
+    prefetch(chat_id)
 
 
 async def put_queue_index(
@@ -60,32 +182,69 @@ async def put_queue_index(
 ):
     if "20.212.146.162" in vidid:
         try:
-            dur = await asyncio.get_event_loop().run_in_executor(
-                None, check_duration, vidid
-            )
+            dur = int((await media_probe.probe(vidid))["duration"])
             duration = seconds_to_min(dur)
         except:
             duration = "ᴜʀʟ sᴛʀᴇᴀᴍ"
             dur = 0
     else:
         dur = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": dur,
-        "played": 0,
-    }
+    put = QueueEntry(title, duration, stream, user, original_chat_id, file, vidid, dur)
     if forceplay:
-        check = db.get(chat_id)
-        if check:
-            check.insert(0, put)
-        else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+        get_queue(chat_id).force(put)
     else:
-        db[chat_id].append(put)
+        get_queue(chat_id).enqueue(put)
+
+
+async def put_queue_lazy(
+    chat_id,
+    original_chat_id,
+    search,
+    videoid,
+    title,
+    user,
+    user_id,
+    stream,
+):
+    put = QueueEntry(
+        title,
+        "Unknown",
+        stream,
+        user,
+        original_chat_id,
+        f"lazy_{search}",
+        None,
+        0,
+        user_id,
+        (search, videoid),
+    )
+    position = get_queue(chat_id).enqueue(put)
+    prefetch(chat_id)
+    return position
+
+
+def prefetch(chat_id: int):
+    from SiriVcBot.utils.stream.prefetch import prefetcher
+
+    prefetcher.kick(chat_id)
+
+
+def localize(entry: QueueEntry) -> str:
+    file = entry.file
+    if "vid_" in file:
+        mode = "video" if entry.streamtype == "video" else "audio"
+        cached = media_cache.get(entry.vidid, mode)
+        if cached:
+            media_cache.release(file)
+            media_cache.acquire(cached)
+            entry.file = file = cached
+    return file
+
+
+def localize_queued(vidid: str):
+    # Tracks that started from the media url switch over to the downloaded
+    # file once it's in the cache, so it's pinned and seeks read it locally.
+    for queue in list(db.values()):
+        for entry in queue:
+            if entry.vidid == vidid and "vid_" in entry.file:
+                localize(entry)
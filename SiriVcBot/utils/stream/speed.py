@@ -0,0 +1,90 @@
+import asyncio
+import os
+import shutil
+
+import config
+from SiriVcBot.logging import LOGGER
+from SiriVcBot.utils.singleflight import SingleFlight
+from SiriVcBot.utils.stream.cache import media_cache
+
+
+class SpeedEngine:
+    def __init__(self, path: str, workers: int):
+        self.path = path
+        self.workers = workers
+        self.slots = None
+        self.flights = SingleFlight()
+        self.live = 0
+        self.transcodes = 0
+        self.reused = 0
+        self.failures = 0
+
+    def load(self):
+        # Variants are only tracked for the lifetime of their source in the
+        # media cache, so anything left over from a previous run is stale.
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def output(self, file_path: str, speed) -> str:
+        return os.path.join(self.path, str(speed), os.path.basename(file_path))
+
+    async def transcode(self, file_path: str, speed) -> str:
+        out = self.output(file_path, speed)
+        if os.path.isfile(out):
+            self.reused += 1
+            return out
+        return await self.flights.do(out, self._transcode, file_path, speed, out)
+
+    async def _transcode(self, file_path: str, speed, out: str) -> str:
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.workers)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        temp = os.path.join(os.path.dirname(out), f".{os.path.basename(out)}")
+        async with self.slots:
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                "-y",
+                "-i",
+                file_path,
+                "-filter:v",
+                f"setpts={1 / float(speed)}*PTS",
+                "-filter:a",
+                f"atempo={speed}",
+                temp,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            _, stderr = await proc.communicate()
+        if proc.returncode != 0 or not os.path.isfile(temp):
+            self.failures += 1
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            LOGGER(__name__).warning(
+                f"Speed transcode of {file_path} failed: {stderr.decode()[-300:]}"
+            )
+            raise Exception("Transcode failed")
+        os.replace(temp, out)
+        self.transcodes += 1
+        media_cache.add_variant(file_path, out)
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": len(self.flights.calls),
+            "live": self.live,
+            "transcodes": self.transcodes,
+            "reused": self.reused,
+            "failures": self.failures,
+        }
+
+
+def tempo_params(position, duration, speed=None) -> str:
+    params = f"-ss {position} -to {duration}"
+    if speed and float(speed) != 1.0:
+        params += f" -atmid -filter:a atempo={speed}"
+    return params
+
+
+speed_engine = SpeedEngine("playback", config.SPEED_WORKERS)
@@ -1,4 +1,5 @@
 import os
+import time
 from random import randint
 from typing import Union
 
@@ -12,7 +13,15 @@ from SiriVcBot.utils.database import add_active_video_chat, is_active_chat
 from SiriVcBot.utils.exceptions import AssistantErr
 from SiriVcBot.utils.inline import aq_markup, close_markup, stream_markup
 from SiriVcBot.utils.pastebin import VasudevKrishnaBin
-from SiriVcBot.utils.stream.queue import put_queue, put_queue_index
+from SiriVcBot.utils.stream.latency import report_first_audio
+from SiriVcBot.utils.stream.lazy import lazy_resolver
+from SiriVcBot.utils.stream.playlist import PlaylistResolver
+from SiriVcBot.utils.stream.queue import (
+    ChatQueue,
+    put_queue,
+    put_queue_index,
+    put_queue_lazy,
+)
 from SiriVcBot.utils.thumbnails import get_thumb
 
 
@@ -31,88 +40,115 @@ async def stream(
 ):
     if not result:
         return
+    started = time.monotonic()
     if forceplay:
         await VasudevKrishna.force_stop_stream(chat_id)
     if streamtype == "playlist":
         msg = f"{_['play_19']}\n\n"
         count = 0
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
+        videoid = False if spotify else True
+        rest = result
+        if not await is_active_chat(chat_id):
+            # Only the track that starts the stream is looked up now, the
+            # rest is queued as it is and resolved once it gets close.
+            resolver = PlaylistResolver(result, videoid, config.PLAYLIST_WORKERS)
             try:
-                (
-                    title,
-                    duration_min,
-                    duration_sec,
-                    thumbnail,
-                    vidid,
-                ) = await YouTube.details(search, False if spotify else True)
-            except:
-                continue
-            if str(duration_min) == "None":
-                continue
-            if duration_sec > config.DURATION_LIMIT:
-                continue
-            if await is_active_chat(chat_id):
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                )
-                position = len(db.get(chat_id)) - 1
-                count += 1
-                msg += f"{count}. {title[:70]}\n"
-                msg += f"{_['play_20']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                status = True if video else None
-                try:
-                    file_path, direct = await YouTube.download(
-                        vidid, mystic, video=status, videoid=True
+                async for details in resolver:
+                    if not details:
+                        continue
+                    title, duration_min, duration_sec, thumbnail, vidid = details
+                    if str(duration_min) == "None":
+                        resolver.widen()
+                        continue
+                    if duration_sec > config.DURATION_LIMIT:
+                        resolver.widen()
+                        continue
+                    if not forceplay:
+                        db[chat_id] = ChatQueue()
+                    status = True if video else None
+                    try:
+                        file_path, direct = await YouTube.download(
+                            vidid, mystic, video=status, videoid=True, progressive=True
+                        )
+                    except:
+                        raise AssistantErr(_["play_14"])
+                    await VasudevKrishna.join_call(
+                        chat_id,
+                        original_chat_id,
+                        file_path,
+                        video=status,
+                        image=thumbnail,
                     )
-                except:
-                    raise AssistantErr(_["play_14"])
-                await VasudevKrishna.join_call(
-                    chat_id,
-                    original_chat_id,
-                    file_path,
-                    video=status,
-                    image=thumbnail,
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await get_thumb(vidid,user_id)
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    original_chat_id,
-                    photo=img,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{vidid}",
-                        title[:23],
+                    report_first_audio(chat_id, started, direct)
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        file_path if direct else f"vid_{vidid}",
+                        title,
                         duration_min,
                         user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
+                        forceplay=forceplay,
+                    )
+                    img = await get_thumb(vidid,user_id)
+                    button = stream_markup(_, chat_id)
+                    run = await app.send_photo(
+                        original_chat_id,
+                        photo=img,
+                        caption=_["stream_1"].format(
+                            f"https://t.me/{app.username}?start=info_{vidid}",
+                            title[:23],
+                            duration_min,
+                            user_name,
+                        ),
+                        reply_markup=InlineKeyboardMarkup(button),
+                    )
+                    db[chat_id][0].mystic = run
+                    db[chat_id][0].markup = "stream"
+                    break
+            finally:
+                rest = resolver.close()
+        added = []
+        for search in rest:
+            if len(added) == config.PLAYLIST_FETCH_LIMIT:
+                break
+            # Youtube playlists only give video ids, their titles are known
+            # once the tracks are looked up.
+            title = _["play_23"].format(len(added) + 1) if videoid else search
+            position = await put_queue_lazy(
+                chat_id,
+                original_chat_id,
+                search,
+                videoid,
+                title,
+                user_name,
+                user_id,
+                "video" if video else "audio",
+            )
+            added.append((search, db[chat_id][position]))
+        # The next few tracks are looked up together right away, the same
+        # window the first track was picked from, so they show up with their
+        # titles and anything unplayable is dropped before it is listed.
+        queue = db.get(chat_id)
+        if queue is not None:
+            await lazy_resolver.settle_all(
+                queue, [entry for search, entry in added[: config.PLAYLIST_WORKERS]]
+            )
+        entries = list(queue) if queue is not None else []
+        for search, entry in added:
+            if entry not in entries:
+                continue
+            count += 1
+            position = entries.index(entry)
+            if entry.query is None:
+                msg += f"{count}. {entry.title[:70]}\n"
+            elif videoid:
+                msg += f"{count}. {entry.title} - {YouTube.base}{search}\n"
+            else:
+                msg += f"{count}. {search[:70]}\n"
+            msg += f"{_['play_20']} {position}\n\n"
         if count == 0:
             return
         else:
@@ -139,7 +175,7 @@ async def stream(
         status = True if video else None
         try:
             file_path, direct = await YouTube.download(
-                vidid, mystic, videoid=True, video=status
+                vidid, mystic, videoid=True, video=status, progressive=True
             )
         except:
             raise AssistantErr(_["play_14"])
@@ -164,7 +200,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await VasudevKrishna.join_call(
                 chat_id,
                 original_chat_id,
@@ -172,6 +208,7 @@ async def stream(
                 video=status,
                 image=thumbnail,
             )
+            report_first_audio(chat_id, started, direct)
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -197,8 +234,8 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "stream"
     elif streamtype == "soundcloud":
         file_path = result["filepath"]
         title = result["title"]
@@ -224,7 +261,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await VasudevKrishna.join_call(chat_id, original_chat_id, file_path, video=None)
             await put_queue(
                 chat_id,
@@ -247,8 +284,8 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "tg"
     elif streamtype == "telegram":
         file_path = result["path"]
         link = result["link"]
@@ -276,7 +313,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await VasudevKrishna.join_call(chat_id, original_chat_id, file_path, video=status)
             await put_queue(
                 chat_id,
@@ -299,8 +336,8 @@ async def stream(
                 caption=_["stream_1"].format(link, title[:23], duration_min, user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "tg"
     elif streamtype == "live":
         link = result["link"]
         vidid = result["vidid"]
@@ -329,7 +366,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             n, file_path = await YouTube.video(link)
             if n == 0:
                 raise AssistantErr(_["str_3"])
@@ -365,8 +402,8 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "tg"
     elif streamtype == "index":
         link = result
         title = "ɪɴᴅᴇx ᴏʀ ᴍ3ᴜ8 ʟɪɴᴋ"
@@ -390,7 +427,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await VasudevKrishna.join_call(
                 chat_id,
                 original_chat_id,
@@ -415,6 +452,6 @@ async def stream(
                 caption=_["stream_2"].format(user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].mystic = run
+            db[chat_id][0].markup = "tg"
             await mystic.delete()
@@ -1,143 +1,238 @@
+import asyncio
+import multiprocessing
 import os
 import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Union
 
 import aiofiles
 import aiohttp
-import numpy as np
-from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
 from unidecode import unidecode
-from youtubesearchpython.__future__ import VideosSearch
 
-from SiriVcBot import app
+import config
+from SiriVcBot import YouTube, app
+from SiriVcBot.logging import LOGGER
+from SiriVcBot.utils.singleflight import SingleFlight
 from config import YOUTUBE_IMG_URL
+from thumbrender import compose, render_avatar, render_background
 
+AVATAR_TTL = 86400
 
-def changeImageSize(maxWidth, maxHeight, image):
-    widthRatio = maxWidth / image.size[0]
-    heightRatio = maxHeight / image.size[1]
-    newWidth = int(widthRatio * image.size[0])
-    newHeight = int(heightRatio * image.size[1])
-    newImage = image.resize((newWidth, newHeight))
-    return newImage
 
-def circle(img): 
-     h,w=img.size 
-     a = Image.new('L', [h,w], 0) 
-     b = ImageDraw.Draw(a) 
-     b.pieslice([(0, 0), (h,w)], 0, 360, fill = 255,outline = "white") 
-     c = np.array(img) 
-     d = np.array(a) 
-     e = np.dstack((c, d)) 
-     return Image.fromarray(e)
+class ThumbCache:
+    def __init__(self, path: str, workers: int, limit: int):
+        self.path = path
+        self.workers = workers
+        self.limit = limit
+        self.executor = None
+        self.flights = SingleFlight()
+        self.files = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.failures = 0
+        self.evictions = 0
 
+    def file(self, name: str) -> str:
+        return os.path.join(self.path, name)
 
-def clear(text):
-    list = text.split(" ")
-    title = ""
-    for i in list:
-        if len(title) + len(i) < 60:
-            title += " " + i
-    return title.strip()
+    def load(self):
+        os.makedirs(self.path, exist_ok=True)
+        found = []
+        for name in os.listdir(self.path):
+            file = self.file(name)
+            if name.startswith("src_") or not os.path.isfile(file):
+                try:
+                    os.remove(file)
+                except OSError:
+                    pass
+                continue
+            found.append((os.path.getmtime(file), name))
+        for _, name in sorted(found):
+            self.add(name)
+        LOGGER(__name__).info(
+            f"Thumbnail Cache Loaded ({len(self.files)} files, {self.size} bytes)."
+        )
 
+    def get(self, name: str) -> Union[str, None]:
+        if name not in self.files:
+            return None
+        file = self.file(name)
+        if not os.path.isfile(file):
+            self.size -= self.files.pop(name)
+            return None
+        self.files.move_to_end(name)
+        return file
+
+    def add(self, name: str):
+        try:
+            size = os.path.getsize(self.file(name))
+        except OSError:
+            return
+        self.size += size - self.files.pop(name, 0)
+        self.files[name] = size
+        self.evict()
+
+    def evict(self):
+        # The newest file always stays, it's about to be sent.
+        while self.size > self.limit and len(self.files) > 1:
+            name, size = self.files.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.remove(self.file(name))
+            except OSError:
+                pass
+
+    async def render(self, func, *args):
+        if self.executor is None:
+            # Forking the threaded bot can hand a worker locks that are never
+            # released, so workers come from a fresh forkserver that has only
+            # imported thumbrender.
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["thumbrender"])
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, func, *args)
+        except BrokenProcessPool:
+            self.failures += 1
+            self.executor = None
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        self.renders += 1
+        return result
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self.files),
+            "size": self.size,
+            "limit": self.limit,
+            "workers": self.workers,
+            "hits": self.hits,
+            "misses": self.misses,
+            "ratio": round(self.hits * 100 / lookups, 2) if lookups else 0,
+            "renders": self.renders,
+            "failures": self.failures,
+            "evictions": self.evictions,
+        }
 
-async def get_thumb(videoid,user_id):
-    if os.path.isfile(f"cache/{videoid}_{user_id}.png"):
-        return f"cache/{videoid}_{user_id}.png"
 
+thumb_cache = ThumbCache("cache/thumbs", config.THUMB_WORKERS, config.THUMB_CACHE_LIMIT)
+
+
+async def get_background(videoid) -> str:
+    name = f"bg_{videoid}.png"
+    cached = thumb_cache.get(name)
+    if cached:
+        return cached
     url = f"https://www.youtube.com/watch?v={videoid}"
+    result = await YouTube.search(url)
     try:
-        results = VideosSearch(url, limit=1)
-        for result in (await results.next())["result"]:
-            try:
-                title = result["title"]
-                title = re.sub("\W+", " ", title)
-                title = title.title()
-            except:
-                title = "Unsupported Title"
-            try:
-                duration = result["duration"]
-            except:
-                duration = "Unknown Mins"
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-            try:
-                views = result["viewCount"]["short"]
-            except:
-                views = "Unknown Views"
-            try:
-                channel = result["channel"]["name"]
-            except:
-                channel = "Unknown Channel"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(thumbnail) as resp:
-                if resp.status == 200:
-                    f = await aiofiles.open(f"cache/thumb{videoid}.png", mode="wb")
-                    await f.write(await resp.read())
-                    await f.close()
+        title = result["title"]
+        title = re.sub("\W+", " ", title)
+        title = title.title()
+    except:
+        title = "Unsupported Title"
+    try:
+        duration = result["duration"]
+    except:
+        duration = "Unknown Mins"
+    thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+    try:
+        views = result["viewCount"]["short"]
+    except:
+        views = "Unknown Views"
+    try:
+        channel = result["channel"]["name"]
+    except:
+        channel = "Unknown Channel"
+    source = thumb_cache.file(f"src_{videoid}.jpg")
+    async with aiohttp.ClientSession() as session:
+        async with session.get(thumbnail) as resp:
+            if resp.status != 200:
+                raise Exception(f"thumbnail returned {resp.status}")
+            f = await aiofiles.open(source, mode="wb")
+            await f.write(await resp.read())
+            await f.close()
+    try:
+        await thumb_cache.render(
+            render_background,
+            source,
+            thumb_cache.file(name),
+            title,
+            channel,
+            views,
+            str(duration),
+            unidecode(app.name),
+        )
+    finally:
         try:
-            async for photo in app.get_chat_photos(user_id,1):
-                sp=await app.download_media(photo.file_id, file_name=f'{user_id}.jpg')
-        except:
-            async for photo in app.get_chat_photos(app.id,1):
-                sp=await app.download_media(photo.file_id, file_name=f'{app.id}.jpg')
-
-        xp=Image.open(sp)
-
-        youtube = Image.open(f"cache/thumb{videoid}.png")
-        image1 = changeImageSize(1280, 720, youtube)
-        image2 = image1.convert("RGBA")
-        background = image2.filter(filter=ImageFilter.BoxBlur(10))
-        enhancer = ImageEnhance.Brightness(background)
-        background = enhancer.enhance(0.5)
-        y=changeImageSize(200,200,circle(youtube)) 
-        background.paste(y,(45,225),mask=y)
-        a=changeImageSize(200,200,circle(xp)) 
-        background.paste(a,(1045,225),mask=a)
-        draw = ImageDraw.Draw(background)
-        arial = ImageFont.truetype("AnonXMusic/assets/font2.ttf", 30)
-        font = ImageFont.truetype("AnonXMusic/assets/font.ttf", 30)
-        draw.text((1110, 8), unidecode(app.name), fill="white", font=arial)
-        draw.text(
-                (55, 560),
-                f"{channel} | {views[:23]}",
-                (255, 255, 255),
-                font=arial,
-            )
-        draw.text(
-                (57, 600),
-                clear(title),
-                (255, 255, 255),
-                font=font,
-            )
-        draw.line(
-                [(55, 660), (1220, 660)],
-                fill="white",
-                width=5,
-                joint="curve",
-            )
-        draw.ellipse(
-                [(918, 648), (942, 672)],
-                outline="white",
-                fill="white",
-                width=15,
-            )
-        draw.text(
-                (36, 685),
-                "00:00",
-                (255, 255, 255),
-                font=arial,
-            )
-        draw.text(
-                (1185, 685),
-                f"{duration[:23]}",
-                (255, 255, 255),
-                font=arial,
-            )
+            os.remove(source)
+        except OSError:
+            pass
+    thumb_cache.add(name)
+    return thumb_cache.file(name)
+
+
+async def get_avatar(user_id) -> str:
+    name = f"avatar_{user_id}.png"
+    cached = thumb_cache.get(name)
+    if cached and time.time() - os.path.getmtime(cached) < AVATAR_TTL:
+        return cached
+    source = None
+    # Users without a profile photo get the bot's one, as before.
+    for chat_id in (user_id, app.id):
         try:
-            os.remove(f"cache/thumb{videoid}.png")
+            async for photo in app.get_chat_photos(chat_id, 1):
+                source = await app.download_media(
+                    photo.file_id,
+                    file_name=os.path.abspath(thumb_cache.file(f"src_{user_id}.jpg")),
+                )
         except:
+            continue
+        if source:
+            break
+    if not source:
+        raise Exception(f"no profile photo for {user_id}")
+    try:
+        await thumb_cache.render(render_avatar, source, thumb_cache.file(name))
+    finally:
+        try:
+            os.remove(source)
+        except OSError:
             pass
-        background.save(f"cache/{videoid}_{user_id}.png")
-        return f"cache/{videoid}_{user_id}.png"
+    thumb_cache.add(name)
+    return thumb_cache.file(name)
+
+
+async def get_thumb(videoid,user_id):
+    name = f"{videoid}_{user_id}.jpg"
+    cached = thumb_cache.get(name)
+    if cached:
+        thumb_cache.hits += 1
+        return cached
+    thumb_cache.misses += 1
+    try:
+        # The blurred track artwork is shared by everyone who plays the
+        # track, only the small avatar overlay differs between users.
+        background, avatar = await asyncio.gather(
+            thumb_cache.flights.do(("bg", videoid), get_background, videoid),
+            thumb_cache.flights.do(("avatar", user_id), get_avatar, user_id),
+        )
+        await thumb_cache.flights.do(
+            name, thumb_cache.render, compose, background, avatar, thumb_cache.file(name)
+        )
+        thumb_cache.add(name)
+        return thumb_cache.file(name)
     except Exception:
         return YOUTUBE_IMG_URL
@@ -0,0 +1,53 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, ttl: float, maxsize: int = 10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not None
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, default=None, count: bool = True):
+        item = self.data.get(key)
+        if item is not None:
+            expires, value = item
+            if expires > time.monotonic():
+                self.data.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return value
+            del self.data[key]
+        if count:
+            self.misses += 1
+        return default
+
+    def set(self, key, value, ttl: float = None):
+        self.data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        item = self.data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        self.data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ratio": round(self.hits * 100 / lookups, 2) if lookups else 0,
+        }
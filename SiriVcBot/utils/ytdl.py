@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import yt_dlp
+
+import config
+
+INSTANCES_PER_WORKER = 8
+
+
+class ExtractorPool:
+    def __init__(self, workers: int, timeout: int, download_workers: int):
+        self.workers = workers
+        self.timeout = timeout
+        self.download_workers = download_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ytdl"
+        )
+        # Downloads take as long as the file does, so they get threads of
+        # their own and never hold up url extraction.
+        self.downloader = ThreadPoolExecutor(
+            max_workers=download_workers, thread_name_prefix="ytdl-download"
+        )
+        self.local = threading.local()
+        self.slots = None
+        self.waiting = 0
+        self.running = 0
+        self.jobs = 0
+        self.created = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.downloading = 0
+        self.downloads = 0
+
+    def _instance(self, opts: dict):
+        instances = getattr(self.local, "instances", None)
+        if instances is None:
+            instances = self.local.instances = OrderedDict()
+        key = repr(sorted(opts.items()))
+        ydl = instances.get(key)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL(opts)
+            instances[key] = ydl
+            self.created += 1
+            if len(instances) > INSTANCES_PER_WORKER:
+                instances.popitem(last=False)[1].close()
+        else:
+            instances.move_to_end(key)
+        return ydl
+
+    def _work(self, opts, job):
+        return job(self._instance(opts))
+
+    async def run(self, opts: dict, job, timeout: int = None):
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.workers)
+        loop = asyncio.get_running_loop()
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        self.jobs += 1
+        future = loop.run_in_executor(self.executor, self._work, opts, job)
+        # A timed out job keeps its worker until yt-dlp returns, so its slot is
+        # only handed back once the thread is actually free.
+        future.add_done_callback(lambda _: self._free())
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(future), timeout or self.timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+
+    async def download(self, opts: dict, job):
+        loop = asyncio.get_running_loop()
+        self.downloading += 1
+        self.downloads += 1
+        try:
+            return await loop.run_in_executor(self.downloader, self._work, opts, job)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.downloading -= 1
+
+    def _free(self):
+        self.running -= 1
+        self.slots.release()
+
+    async def extract(self, opts: dict, link: str, timeout: int = None) -> dict:
+        return await self.run(
+            opts, lambda ydl: ydl.extract_info(link, download=False), timeout
+        )
+
+    async def stream_url(self, opts: dict, link: str, timeout: int = None) -> str:
+        info = await self.extract(opts, link, timeout)
+        if info.get("url"):
+            return info["url"]
+        return info["requested_formats"][0]["url"]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "jobs": self.jobs,
+            "downloading": self.downloading,
+            "download_workers": self.download_workers,
+            "downloads": self.downloads,
+            "instances": self.created,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+        }
+
+
+extractors = ExtractorPool(
+    config.YTDL_WORKERS, config.YTDL_TIMEOUT, config.YTDL_DOWNLOAD_WORKERS
+)
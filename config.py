@@ -1,5 +1,5 @@
 import re
-from os import getenv
+from os import environ, getenv
 
 from dotenv import load_dotenv
 from pyrogram import filters
@@ -54,12 +54,63 @@ SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", None)
 # Maximum limit for fetching playlist's track from youtube, spotify, apple links.
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", 25))
 
+# Number of playlist tracks looked up at once while searching for the first playable one
+PLAYLIST_WORKERS = int(getenv("PLAYLIST_WORKERS", 5))
+
 
 # Telegram audio and video file size limit (in bytes)
 TG_AUDIO_FILESIZE_LIMIT = int(getenv("TG_AUDIO_FILESIZE_LIMIT", 204857600))
 TG_VIDEO_FILESIZE_LIMIT = int(getenv("TG_VIDEO_FILESIZE_LIMIT", 2073741824))
 # Checkout https://www.gbmb.org/mb-to-bytes for converting mb to bytes
 
+# Maximum disk space used by downloaded tracks before the least recently played are removed (in bytes)
+CACHE_SIZE_LIMIT = int(getenv("CACHE_SIZE_LIMIT", 5368709120))
+
+
+# Number of warm yt-dlp workers and the time limit (in seconds) for each url extraction, downloads have their own pool below
+YTDL_WORKERS = int(getenv("YTDL_WORKERS", 4))
+YTDL_TIMEOUT = int(getenv("YTDL_TIMEOUT", 300))
+
+# Number of yt-dlp downloads that may run at once, further ones wait for a free thread
+YTDL_DOWNLOAD_WORKERS = int(getenv("YTDL_DOWNLOAD_WORKERS", 4))
+
+# How long (in seconds) youtube search results are reused, set YT_META_PERSIST to also keep them in mongo across restarts
+YT_META_CACHE_TTL = int(getenv("YT_META_CACHE_TTL", 21600))
+YT_META_PERSIST = getenv("YT_META_PERSIST", "False") == "True"
+
+# Start youtube tracks from the media url while they are still downloading into the cache
+PROGRESSIVE_PLAYBACK = getenv("PROGRESSIVE_PLAYBACK", "True") == "True"
+
+# Number of upcoming youtube tracks per chat downloaded ahead of time, how many downloads run at once and how much disk they may hold (in bytes)
+PREFETCH_DEPTH = int(getenv("PREFETCH_DEPTH", 2))
+PREFETCH_WORKERS = int(getenv("PREFETCH_WORKERS", 2))
+PREFETCH_SIZE_LIMIT = int(getenv("PREFETCH_SIZE_LIMIT", 1073741824))
+
+# Processes used to draw thumbnails and how much disk (in bytes) the drawn thumbnails may take
+THUMB_WORKERS = int(getenv("THUMB_WORKERS", 2))
+THUMB_CACHE_LIMIT = int(getenv("THUMB_CACHE_LIMIT", 209715200))
+
+# Number of ffmpeg re-encodes allowed at once for video speed changes, audio speed changes are applied live
+SPEED_WORKERS = int(getenv("SPEED_WORKERS", 1))
+
+# Time limit (in seconds) for loading every chat's settings from mongo at startup
+SETTINGS_PRELOAD_TIME = int(getenv("SETTINGS_PRELOAD_TIME", 60))
+
+# Maximum number of chats whose settings are kept in memory
+SETTINGS_CACHE_SIZE = int(getenv("SETTINGS_CACHE_SIZE", 50000))
+
+# Save queues to mongo so they can be resumed after a restart, and how many chats' queues may be written per second
+PERSIST_QUEUES = getenv("PERSIST_QUEUES", "False") == "True"
+QUEUE_SNAPSHOT_RATE = int(getenv("QUEUE_SNAPSHOT_RATE", 20))
+
+# Seconds a chat's admin list is trusted before it is refreshed in the background
+ADMIN_CACHE_TTL = int(getenv("ADMIN_CACHE_TTL", 3600))
+
+# Messages per second the bot may send in bulk jobs (broadcasts, gbans) and how many requests each of them keeps in flight
+BOT_RATE_LIMIT = float(getenv("BOT_RATE_LIMIT", 25))
+BROADCAST_WORKERS = int(getenv("BROADCAST_WORKERS", 10))
+GBAN_WORKERS = int(getenv("GBAN_WORKERS", 10))
+
 
 # Get your pyrogram v2 session from @StringFatherBot on Telegram
 STRING1 = getenv("STRING_SESSION", None)
@@ -68,12 +119,23 @@ STRING3 = getenv("STRING_SESSION3", None)
 STRING4 = getenv("STRING_SESSION4", None)
 STRING5 = getenv("STRING_SESSION5", None)
 
+# Any number of further sessions can be added as STRING_SESSION6, STRING_SESSION7 and so on
+STRING_SESSIONS = {
+    int(key[14:]): value
+    for key, value in environ.items()
+    if key.startswith("STRING_SESSION") and key[14:].isdigit() and value
+}
+if STRING1:
+    STRING_SESSIONS[1] = STRING1
+
+# Seconds each assistant gets to log in at startup before it is skipped
+ASSISTANT_START_TIMEOUT = int(getenv("ASSISTANT_START_TIMEOUT", 60))
+
 
 BANNED_USERS = filters.user()
 adminlist = {}
 lyrical = {}
 votemode = {}
-autoclean = []
 confirmer = {}
 
 
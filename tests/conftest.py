@@ -0,0 +1,22 @@
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# config.py reads this at import time.
+os.environ.setdefault("API_ID", "0")
+
+# The package __init__ files start the bot (clients, git, database), the tests
+# only need the modules underneath them.
+for name in ("SiriVcBot", "SiriVcBot.utils"):
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [os.path.join(ROOT, *name.split("."))]
+        sys.modules[name] = package
+
+from SiriVcBot.misc import dbb  # noqa: E402
+
+# The in-memory queue the stream modules import, set up the way boot does.
+dbb()
@@ -0,0 +1,125 @@
+import os
+
+from SiriVcBot.utils.stream.cache import YOUTUBE_ID, MediaCache
+
+
+def write(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return str(path)
+
+
+def test_youtube_id():
+    assert YOUTUBE_ID.match("dQw4w9WgXcQ")
+    assert YOUTUBE_ID.match("a-b_c-d_e-f")
+    assert not YOUTUBE_ID.match("dQw4w9WgXc")
+    assert not YOUTUBE_ID.match("dQw4w9WgXcQQ")
+    assert not YOUTUBE_ID.match("my song.mp")
+
+
+def test_get_hit_and_miss(tmp_path):
+    cache = MediaCache(str(tmp_path), 100)
+    path = write(tmp_path / "aaaaaaaaaaa.m4a", 10)
+    cache.add("aaaaaaaaaaa", "audio", path)
+    assert cache.get("aaaaaaaaaaa", "audio") == path
+    assert cache.get("aaaaaaaaaaa", "video") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_get_drops_missing_file(tmp_path):
+    cache = MediaCache(str(tmp_path), 100)
+    path = write(tmp_path / "aaaaaaaaaaa.m4a", 10)
+    cache.add("aaaaaaaaaaa", "audio", path)
+    os.remove(path)
+    assert cache.get("aaaaaaaaaaa", "audio") is None
+    assert path not in cache
+    assert cache.size == 0
+
+
+def test_readd_replaces_entry(tmp_path):
+    cache = MediaCache(str(tmp_path), 100)
+    path = write(tmp_path / "aaaaaaaaaaa.m4a", 10)
+    cache.add("aaaaaaaaaaa", "audio", path)
+    write(path, 20)
+    cache.add("aaaaaaaaaaa", "audio", path)
+    assert len(cache.entries) == 1
+    assert cache.size == 20
+
+
+def test_add_missing_file_is_ignored(tmp_path):
+    cache = MediaCache(str(tmp_path), 100)
+    cache.add("aaaaaaaaaaa", "audio", str(tmp_path / "aaaaaaaaaaa.m4a"))
+    assert not cache.entries
+
+
+def test_evict_keeps_new_file(tmp_path):
+    cache = MediaCache(str(tmp_path), 5)
+    first = write(tmp_path / "aaaaaaaaaaa.m4a", 10)
+    cache.add("aaaaaaaaaaa", "audio", first)
+    # Over the limit on its own, but it was just downloaded for a play.
+    assert first in cache
+    second = write(tmp_path / "bbbbbbbbbbb.m4a", 10)
+    cache.add("bbbbbbbbbbb", "audio", second)
+    assert first not in cache
+    assert not os.path.exists(first)
+    assert second in cache
+    assert cache.evictions == 1
+
+
+def test_evict_skips_pinned(tmp_path):
+    cache = MediaCache(str(tmp_path), 15)
+    first = write(tmp_path / "aaaaaaaaaaa.m4a", 10)
+    cache.add("aaaaaaaaaaa", "audio", first)
+    cache.acquire(first)
+    second = write(tmp_path / "bbbbbbbbbbb.m4a", 10)
+    cache.add("bbbbbbbbbbb", "audio", second)
+    assert first in cache and second in cache
+    assert cache.stats()["pinned"] == 1
+    assert cache.release(first) == 0
+    cache.evict()
+    assert first not in cache
+    assert os.path.exists(second)
+
+
+def test_release_counts_down(tmp_path):
+    cache = MediaCache(str(tmp_path), 100)
+    cache.acquire("file")
+    cache.acquire("file")
+    assert cache.release("file") == 1
+    assert cache.release("file") == 0
+    assert cache.release("file") == 0
+    assert "file" not in cache.refs
+
+
+def test_variants_count_and_go_with_source(tmp_path):
+    cache = MediaCache(str(tmp_path), 100)
+    source = write(tmp_path / "aaaaaaaaaaa.m4a", 10)
+    cache.add("aaaaaaaaaaa", "audio", source)
+    variant = write(tmp_path / "aaaaaaaaaaa-1.5.m4a", 5)
+    cache.add_variant(source, variant)
+    assert cache.size == 15
+    cache.discard(source)
+    assert not os.path.exists(source)
+    assert not os.path.exists(variant)
+
+
+def test_load_indexes_youtube_ids_only(tmp_path):
+    audio = write(tmp_path / "aaaaaaaaaaa.m4a", 10)
+    video = write(tmp_path / "bbbbbbbbbbb.mp4", 10)
+    song = write(tmp_path / "Some Song.mp3", 10)
+    partial = write(tmp_path / "ccccccccccc.m4a.part", 10)
+    cache = MediaCache(str(tmp_path), 100)
+    cache.load()
+    assert cache.get("aaaaaaaaaaa", "audio") == audio
+    assert cache.get("bbbbbbbbbbb", "video") == video
+    assert sorted(cache.strays) == sorted([song, partial])
+    cache.sweep(keep=[song])
+    assert os.path.exists(song)
+    assert not os.path.exists(partial)
+    assert cache.strays == []
+
+
+def test_load_missing_directory(tmp_path):
+    cache = MediaCache(str(tmp_path / "missing"), 100)
+    cache.load()
+    assert not cache.entries
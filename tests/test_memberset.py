@@ -0,0 +1,39 @@
+import asyncio
+
+from SiriVcBot.utils.memberset import MemberSet
+
+
+async def ids(*items):
+    for item in items:
+        yield item
+
+
+def test_add_before_load():
+    members = MemberSet()
+    members.add(5)
+    members.add(5)
+    assert 5 in members
+    assert len(members) == 1
+    assert not members.loaded
+
+
+def test_load_packs_sorted_ids():
+    members = MemberSet()
+    asyncio.run(members.load(ids(-100, 1, 3, 3, 2, 7)))
+    assert members.loaded
+    assert list(members.base) == [-100, 1, 3, 7]
+    for item in (-100, 1, 3, 7):
+        assert item in members
+    assert 4 not in members
+    assert 100 not in members
+
+
+def test_load_keeps_new_ids():
+    members = MemberSet()
+    members.add(2)
+    members.add(9)
+    asyncio.run(members.load(ids(1, 2, 3)))
+    assert members.extra == {9}
+    assert len(members) == 4
+    members.add(3)
+    assert len(members) == 4
@@ -0,0 +1,50 @@
+from SiriVcBot.utils.probe import parse_probe
+
+
+def test_parse_probe():
+    info = parse_probe(
+        {
+            "format": {
+                "duration": "212.5",
+                "format_name": "mov,mp4,m4a",
+                "bit_rate": "128000",
+            },
+            "streams": [
+                {"codec_type": "video", "codec_name": "h264"},
+                {"codec_type": "audio", "codec_name": "aac"},
+                {"codec_type": "audio", "codec_name": "opus"},
+            ],
+        }
+    )
+    assert info == {
+        "duration": 212.5,
+        "format": "mov,mp4,m4a",
+        "audio": "aac",
+        "video": "h264",
+        "bitrate": 128000,
+    }
+
+
+def test_parse_probe_stream_duration():
+    info = parse_probe(
+        {
+            "format": {"format_name": "webm"},
+            "streams": [
+                {"codec_type": "data"},
+                {"codec_type": "audio", "codec_name": "opus", "duration": "30"},
+            ],
+        }
+    )
+    assert info["duration"] == 30.0
+    assert info["video"] is None
+    assert info["bitrate"] is None
+
+
+def test_parse_probe_empty():
+    assert parse_probe({}) == {
+        "duration": None,
+        "format": None,
+        "audio": None,
+        "video": None,
+        "bitrate": None,
+    }
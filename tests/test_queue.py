@@ -0,0 +1,68 @@
+from SiriVcBot.utils.stream.queue import ChatQueue, QueueEntry
+
+
+def entry(title):
+    return QueueEntry(title, "0:10", "audio", "user", -1, f"{title}.m4a", title, 10)
+
+
+def make(*titles):
+    return ChatQueue([entry(x) for x in titles])
+
+
+def titles(queue):
+    return [x.title for x in queue]
+
+
+def test_enqueue_and_pop():
+    queue = ChatQueue()
+    assert queue.pop() is None
+    assert queue.version == 0
+    assert queue.enqueue(entry("a")) == 0
+    assert queue.enqueue(entry("b")) == 1
+    assert queue.pop().title == "a"
+    assert titles(queue) == ["b"]
+    assert queue.version == 3
+
+
+def test_force_goes_first():
+    queue = make("a", "b")
+    queue.force(entry("c"))
+    assert titles(queue) == ["c", "a", "b"]
+    assert queue.version == 1
+
+
+def test_upcoming():
+    queue = make("a", "b", "c", "d")
+    assert titles(queue.upcoming()) == ["b", "c", "d"]
+    assert titles(queue.upcoming(2)) == ["b", "c"]
+    assert make("a").upcoming() == []
+
+
+def test_shuffle_keeps_current():
+    queue = make(*"abcdefgh")
+    assert queue.shuffle()
+    assert queue[0].title == "a"
+    assert sorted(titles(queue)) == list("abcdefgh")
+    assert queue.version == 1
+
+
+def test_shuffle_short_queue():
+    queue = make("a")
+    assert not queue.shuffle()
+    assert queue.version == 0
+
+
+def test_remove():
+    queue = make("a", "b")
+    queued = queue[1]
+    assert queue.remove(queued)
+    assert not queue.remove(queued)
+    assert titles(queue) == ["a"]
+    assert queue.version == 1
+
+
+def test_move():
+    queue = make("a", "b", "c", "d")
+    queue.move(3, 1)
+    assert titles(queue) == ["a", "d", "b", "c"]
+    assert queue.version == 1
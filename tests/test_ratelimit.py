@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from SiriVcBot.utils.ratelimit import MAX_FLOOD_WAIT, TokenBucket
+
+
+def test_default_burst():
+    assert TokenBucket(30).burst == 30
+    assert TokenBucket(0.5).burst == 1
+    assert TokenBucket(30, 5).burst == 5
+
+
+def test_pause():
+    bucket = TokenBucket(30)
+    assert bucket.paused() == 0
+    assert bucket.pause(10)
+    assert 9 < bucket.paused() <= 10
+    # A shorter wait doesn't cut an earlier one short.
+    assert bucket.pause(1)
+    assert bucket.paused() > 9
+    assert bucket.floodwaits == 2
+
+
+def test_pause_over_cap():
+    bucket = TokenBucket(30)
+    assert not bucket.pause(MAX_FLOOD_WAIT + 1)
+    assert bucket.paused() == 0
+    assert (bucket.floodwaits, bucket.skipped) == (1, 1)
+
+
+def test_acquire_burst_then_rate():
+    bucket = TokenBucket(20, 2)
+
+    async def run():
+        started = time.monotonic()
+        await bucket.acquire()
+        await bucket.acquire()
+        burst = time.monotonic() - started
+        await bucket.acquire()
+        return burst, time.monotonic() - started
+
+    burst, total = asyncio.run(run())
+    assert burst < 0.04
+    assert total >= 0.04
+
+
+def test_acquire_waits_out_pause():
+    bucket = TokenBucket(100)
+    bucket.pause(0.1)
+
+    async def run():
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.09
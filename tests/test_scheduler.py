@@ -0,0 +1,80 @@
+import time
+
+from pyrogram.errors import FloodWait
+
+from SiriVcBot.utils.scheduler import AssistantScheduler
+
+
+def test_assign_spreads_reserved_chats():
+    scheduler = AssistantScheduler(600, 3)
+    first = scheduler.assign(-1, [1, 2])
+    second = scheduler.assign(-2, [1, 2])
+    assert {first, second} == {1, 2}
+    assert scheduler.load(first) == 1
+
+
+def test_joined_and_left():
+    scheduler = AssistantScheduler(600, 3)
+    num = scheduler.assign(-1, [1])
+    scheduler.joined(-1, num)
+    assert -1 not in scheduler.reserved
+    assert scheduler.load(1) == 1
+    scheduler.left(-1)
+    assert scheduler.load(1) == 0
+
+
+def test_assign_prefers_least_loaded():
+    scheduler = AssistantScheduler(600, 3)
+    scheduler.joined(-1, 1)
+    scheduler.joined(-2, 1)
+    scheduler.joined(-3, 2)
+    assert scheduler.assign(-4, [1, 2]) == 2
+
+
+def test_errors_make_assistant_unhealthy():
+    scheduler = AssistantScheduler(600, 2)
+    scheduler.failed(1)
+    assert scheduler.healthy(1)
+    scheduler.failed(1)
+    assert not scheduler.healthy(1)
+    scheduler.joined(-1, 2)
+    assert scheduler.assign(-2, [1, 2]) == 2
+
+
+def test_errors_expire():
+    scheduler = AssistantScheduler(-1, 1)
+    scheduler.failed(1)
+    assert scheduler.healthy(1)
+    assert not scheduler.errors[1]
+
+
+def test_floodwait_skips_assistant_until_it_ends():
+    scheduler = AssistantScheduler(600, 3)
+    scheduler.failed(1, FloodWait(value=60))
+    assert not scheduler.healthy(1)
+    assert scheduler.floodwaits[1] == 1
+    assert scheduler.flooded[1] > time.monotonic()
+    assert scheduler.assign(-1, [1, 2]) == 2
+
+
+def test_all_unhealthy_still_assigns():
+    scheduler = AssistantScheduler(600, 1)
+    scheduler.failed(1)
+    assert scheduler.assign(-1, [1]) == 1
+
+
+def test_failed_without_assistant():
+    scheduler = AssistantScheduler(600, 1)
+    scheduler.failed(None)
+    assert not scheduler.errors
+
+
+def test_stats():
+    scheduler = AssistantScheduler(600, 3)
+    scheduler.joined(-1, 1)
+    scheduler.failed(2)
+    stats = scheduler.stats([1, 2], {-1: 1, -2: 1})
+    assert stats[0]["calls"] == 1
+    assert stats[0]["chats"] == 2
+    assert stats[1]["errors"] == 1
+    assert stats[1]["healthy"]
@@ -0,0 +1,62 @@
+from SiriVcBot.utils.ttlcache import TTLCache
+
+
+def test_get_and_set():
+    cache = TTLCache(60)
+    assert cache.get("a") is None
+    assert cache.get("a", 0) == 0
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert "a" in cache
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_contains_doesnt_count():
+    cache = TTLCache(60)
+    cache.set("a", 1)
+    assert "a" in cache
+    assert "b" not in cache
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_expired_entry_is_dropped():
+    cache = TTLCache(60)
+    cache.set("a", 1, ttl=-1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_maxsize_evicts_least_recent():
+    cache = TTLCache(60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+
+
+def test_falsy_values_are_cached():
+    cache = TTLCache(60)
+    cache.set("a", 0)
+    assert cache.get("a") == 0
+    assert cache.hits == 1
+
+
+def test_pop_and_clear():
+    cache = TTLCache(60)
+    cache.set("a", 1)
+    assert cache.pop("a") == 1
+    assert cache.pop("a", 2) == 2
+    cache.set("b", 1)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_stats():
+    cache = TTLCache(60)
+    assert cache.stats()["ratio"] == 0
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "ratio": 50.0}
@@ -0,0 +1,109 @@
+# Drawing for the thumbnail processes. They only import this module, so it
+# stays outside the SiriVcBot package (whose __init__ creates the clients)
+# and only deals with files and plain values.
+import numpy as np
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
+
+FONTS = {}
+
+
+def changeImageSize(maxWidth, maxHeight, image):
+    widthRatio = maxWidth / image.size[0]
+    heightRatio = maxHeight / image.size[1]
+    newWidth = int(widthRatio * image.size[0])
+    newHeight = int(heightRatio * image.size[1])
+    newImage = image.resize((newWidth, newHeight))
+    return newImage
+
+def circle(img):
+     h,w=img.size
+     a = Image.new('L', [h,w], 0)
+     b = ImageDraw.Draw(a)
+     b.pieslice([(0, 0), (h,w)], 0, 360, fill = 255,outline = "white")
+     c = np.array(img.convert("RGB"))
+     d = np.array(a)
+     e = np.dstack((c, d))
+     return Image.fromarray(e)
+
+
+def clear(text):
+    list = text.split(" ")
+    title = ""
+    for i in list:
+        if len(title) + len(i) < 60:
+            title += " " + i
+    return title.strip()
+
+
+def font(name: str, size: int):
+    key = (name, size)
+    if key not in FONTS:
+        FONTS[key] = ImageFont.truetype(f"SiriVcBot/assets/{name}", size)
+    return FONTS[key]
+
+
+def render_background(source, dest, title, channel, views, duration, name):
+    youtube = Image.open(source)
+    image1 = changeImageSize(1280, 720, youtube)
+    image2 = image1.convert("RGBA")
+    background = image2.filter(filter=ImageFilter.BoxBlur(10))
+    enhancer = ImageEnhance.Brightness(background)
+    background = enhancer.enhance(0.5)
+    y=changeImageSize(200,200,circle(youtube))
+    background.paste(y,(45,225),mask=y)
+    draw = ImageDraw.Draw(background)
+    arial = font("font2.ttf", 30)
+    font1 = font("font.ttf", 30)
+    draw.text((1110, 8), name, fill="white", font=arial)
+    draw.text(
+            (55, 560),
+            f"{channel} | {views[:23]}",
+            (255, 255, 255),
+            font=arial,
+        )
+    draw.text(
+            (57, 600),
+            clear(title),
+            (255, 255, 255),
+            font=font1,
+        )
+    draw.line(
+            [(55, 660), (1220, 660)],
+            fill="white",
+            width=5,
+            joint="curve",
+        )
+    draw.ellipse(
+            [(918, 648), (942, 672)],
+            outline="white",
+            fill="white",
+            width=15,
+        )
+    draw.text(
+            (36, 685),
+            "00:00",
+            (255, 255, 255),
+            font=arial,
+        )
+    draw.text(
+            (1185, 685),
+            f"{duration[:23]}",
+            (255, 255, 255),
+            font=arial,
+        )
+    background.convert("RGB").save(dest, "PNG", compress_level=1)
+    return dest
+
+
+def render_avatar(source, dest):
+    a=changeImageSize(200,200,circle(Image.open(source)))
+    a.save(dest, "PNG", compress_level=1)
+    return dest
+
+
+def compose(background, avatar, dest):
+    image = Image.open(background)
+    a = Image.open(avatar)
+    image.paste(a,(1045,225),mask=a)
+    image.save(dest, "JPEG", quality=90)
+    return dest